@@ -0,0 +1,192 @@
+"""
+Micro-benchmark harness shared by the handler benchmarks in textApi, ragApi and imageApi.
+Each <project>/benchmarks/handler_benchmark.py puts its services folder on sys.path before
+importing this module, so bootstrap below is that project's.
+
+A case is a zero-argument callable, usually one handler invocation against stubbed clients, run
+thousands of times in-process. Timing and allocations are measured in separate passes because
+tracemalloc slows down every allocation:
+
+- p50Us / p99Us: per-call wall time in microseconds; the calls run in ROUNDS rounds and p50 is the
+  lowest round median, so a burst of noise from the rest of the machine does not move it
+- peakKB: memory allocated at the high-water mark of one call, from tracemalloc
+- retainedBytes: memory still held per call afterwards, which only grows when something leaks or caches
+
+Results are compared with a stored baseline; a case regresses when its p50 or its peak allocation
+grows beyond the tolerance. Timings are only comparable on the machine that wrote the baseline,
+so refresh it with --update-baseline when the benchmark moves to another machine.
+
+Clients from stub_client are real botocore clients whose HTTP requests are answered in process,
+so parameter validation, serialization, signing and response parsing stay in the measurement.
+"""
+
+import bootstrap
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+DEFAULT_ITERATIONS = 2000
+ROUNDS = 5
+WARMUP = 50
+ALLOCATION_ITERATIONS = 200
+# Absolute slack on top of the tolerances, so cases of a few microseconds or bytes do not fail on noise
+TIME_SLACK_US = 5
+ALLOCATION_SLACK_KB = 1
+
+
+def stub_client(service_name: str, respond, region_name: str = "us-west-2"):
+    """
+    Client for the service whose requests never leave the process: respond(request) returns the
+    (status, headers, body) of the HTTP response.
+    """
+    # Signing needs credentials, any will do
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    client = boto3.client(service_name=service_name, region_name=region_name, config=bootstrap.CLIENT_CONFIG)
+
+    def send(request, **kwargs):
+        status, headers, body = respond(request)
+        return AWSResponse(request.url, status, headers, _ResponseBody(body))
+
+    client.meta.events.register("before-send", send)
+    return client
+
+
+def json_response(payload):
+    return 200, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8")
+
+
+class _ResponseBody(io.BytesIO):
+
+    def stream(self, **kwargs):
+        yield self.read()
+
+
+def measure(case, iterations=DEFAULT_ITERATIONS, allocation_iterations=ALLOCATION_ITERATIONS):
+    for _ in range(WARMUP):
+        case()
+    gc.collect()
+
+    timings, medians = [], []
+    for _ in range(ROUNDS):
+        round_timings = [0] * max(1, iterations // ROUNDS)
+        for index in range(len(round_timings)):
+            started = time.perf_counter_ns()
+            case()
+            round_timings[index] = time.perf_counter_ns() - started
+        round_timings.sort()
+        medians.append(percentile(round_timings, 0.5))
+        timings += round_timings
+    timings.sort()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        peaks = []
+        held_before = tracemalloc.get_traced_memory()[0]
+        for _ in range(allocation_iterations):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            case()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        gc.collect()
+        retained = (tracemalloc.get_traced_memory()[0] - held_before) / allocation_iterations
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+
+    return {
+        "p50Us": round(min(medians) / 1000, 1),
+        "p99Us": round(percentile(timings, 0.99) / 1000, 1),
+        "peakKB": round(percentile(peaks, 0.5) / 1024, 1),
+        "retainedBytes": round(max(retained, 0))
+    }
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def regressions(name, result, baseline, tolerance, allocation_tolerance):
+    """
+    Descriptions of the ways result is worse than its baseline entry.
+    """
+    found = []
+    if result["p50Us"] > baseline["p50Us"] * (1 + tolerance) + TIME_SLACK_US:
+        found.append(f"{name}: p50 {baseline['p50Us']}us -> {result['p50Us']}us")
+    if result["peakKB"] > baseline["peakKB"] * (1 + allocation_tolerance) + ALLOCATION_SLACK_KB:
+        found.append(f"{name}: peak {baseline['peakKB']}KB -> {result['peakKB']}KB")
+    return found
+
+
+def run(cases, baseline_path, description, iterations=DEFAULT_ITERATIONS):
+    """
+    Command line entry point: measure the cases, print a report and compare with or update the baseline.
+    Exits with status 1 when a case regressed.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--iterations", type=int, default=iterations)
+    parser.add_argument("--case", action="append", choices=list(cases), help="repeatable; defaults to every case")
+    parser.add_argument("--baseline", default=baseline_path)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed p50 growth, 0.3 = 30%%")
+    parser.add_argument("--allocation-tolerance", type=float, default=0.1, help="allowed peak allocation growth")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    baseline = {"cases": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    # Handlers log a JSON line per call; writing it is part of the cost but would flood the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name in args.case or cases:
+            results[name] = measure(cases[name], args.iterations)
+
+    found = []
+    for name, result in results.items():
+        if name in baseline["cases"]:
+            found += regressions(name, result, baseline["cases"][name], args.tolerance, args.allocation_tolerance)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'case':<28}{'p50 us':>10}{'p99 us':>10}{'peak KB':>10}{'retained B':>12}{'p50 vs base':>13}")
+        for name, result in results.items():
+            base = baseline["cases"].get(name)
+            change = f"{result['p50Us'] / base['p50Us'] - 1:+.0%}" if base and base["p50Us"] else "-"
+            print(f"{name:<28}{result['p50Us']:>10}{result['p99Us']:>10}{result['peakKB']:>10}"
+                  f"{result['retainedBytes']:>12}{change:>13}")
+
+    if args.update_baseline:
+        baseline = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+            "cases": {**baseline["cases"], **results}
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if baseline.get("python") and baseline["python"] != platform.python_version():
+        print(f"baseline was recorded on Python {baseline['python']}, running {platform.python_version()}",
+              file=sys.stderr)
+    if found:
+        print("regressions:\n  " + "\n  ".join(found), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,111 @@
+"""
+Per-invocation overhead of the image handler, with Bedrock and S3 answering in process.
+
+    python benchmarks/handler_benchmark.py [--iterations 1000] [--case handler_stream] [--update-baseline]
+
+Covers the request path stage by stage (event JSON parse, model request build, base64 decode,
+response parse, S3 put) and end to end (streamed and buffered uploads, one and several images,
+cached generation). Results are compared with handler_baseline.json next to this
+file; see benchmarks/microbench.py at the repository root for the metrics and tolerances.
+"""
+
+import base64
+import io
+import json
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# The handlers import their neighbours as top-level modules, as in the deployed asset. The shared
+# harness lives in the top-level benchmarks folder, so neither ships in a Lambda zip.
+sys.path[:0] = [os.path.join(HERE, "..", "services"), os.path.join(HERE, "..", "..", "benchmarks")]
+import microbench  # noqa: E402
+
+# image.py reads the bucket name at import time
+os.environ.setdefault("BUCKET_NAME", "benchmark-bucket")
+import image  # noqa: E402
+from image_stream import ImageStream  # noqa: E402
+
+BASELINE = os.path.join(HERE, "handler_baseline.json")
+# About the size of a 512x512 Titan PNG; each call moves a few of them, so fewer iterations than the other suites
+IMAGE_BYTES = 256 * 1024
+ITERATIONS = 1000
+
+
+class TitanImageEndpoint:
+
+    def __init__(self, images):
+        self.payloads = {
+            count: json.dumps({"images": images[:count], "error": None}).encode("utf-8")
+            for count in range(1, len(images) + 1)
+        }
+
+    def __call__(self, request):
+        count = json.loads(request.body)["imageGenerationConfig"]["numberOfImages"]
+        payload = self.payloads[count]
+        return 200, {"Content-Type": "application/json", "Content-Length": str(len(payload))}, payload
+
+
+class S3Endpoint:
+
+    def __init__(self, stored=False):
+        self.stored = stored
+
+    def __call__(self, request):
+        if request.method == "HEAD":
+            return (200, {"Content-Length": "0", "ETag": '"benchmark"'}, b"") if self.stored else (404, {}, b"")
+        # Consume the upload the way sending it would
+        body = request.body
+        if hasattr(body, "read"):
+            while body.read(1024 * 1024):
+                pass
+        return 200, {"ETag": '"benchmark"'}, b""
+
+
+def event(count: int = 1):
+    return {"body": json.dumps({"description": "a cat sitting on a red chair", "count": count, "seed": 42})}
+
+
+def with_settings(s3_client, stream_uploads, call):
+    def case():
+        image.s3_client = s3_client
+        image.STREAM_THRESHOLD_BYTES = 0 if stream_uploads else sys.maxsize
+        return call()
+    return case
+
+
+def cases():
+    rng = random.Random(0)
+    images = [base64.b64encode(rng.randbytes(IMAGE_BYTES)).decode("ascii") for _ in range(3)]
+    titan = TitanImageEndpoint(images)
+    image.bedrock_client = microbench.stub_client("bedrock-runtime", titan)
+    s3 = microbench.stub_client("s3", S3Endpoint())
+    cached_s3 = microbench.stub_client("s3", S3Endpoint(stored=True))
+
+    request = event()
+    body = json.loads(request["body"])
+    generation_config = image.get_generation_config(body)
+    payload = titan.payloads[1]
+    decoded = base64.b64decode(images[0])
+
+    return {
+        "json_parse": lambda: image.get_generation_config(json.loads(request["body"])),
+        "prompt_build": lambda: image.get_model_config(body["description"], generation_config),
+        "response_parse": lambda: json.loads(payload)["images"],
+        "response_parse_stream": lambda: [image_file.read() for image_file in ImageStream(io.BytesIO(payload))],
+        "base64_decode": lambda: base64.b64decode(images[0]),
+        "s3_put": lambda: s3.put_object(Bucket=image.S3_BUCKET, Key="images/benchmark/0.png", Body=decoded),
+        "s3_upload_stream": lambda: s3.upload_fileobj(
+            io.BytesIO(decoded), image.S3_BUCKET, "images/benchmark/0.png", Config=image.STREAM_TRANSFER_CONFIG
+        ),
+        "handler_stream": with_settings(s3, True, lambda: image.handler(request, None)),
+        "handler_buffered": with_settings(s3, False, lambda: image.handler(request, None)),
+        "handler_stream_3": with_settings(s3, True, lambda: image.handler(event(3), None)),
+        "handler_buffered_3": with_settings(s3, False, lambda: image.handler(event(3), None)),
+        "handler_cached": with_settings(cached_s3, True, lambda: image.handler(request, None))
+    }
+
+
+if __name__ == "__main__":
+    microbench.run(cases(), BASELINE, "Measure per-invocation overhead of the image handler", ITERATIONS)
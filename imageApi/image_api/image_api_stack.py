@@ -1,9 +1,13 @@
 from aws_cdk import (
     Duration,
+    RemovalPolicy,
     Stack,
     aws_lambda,
+    aws_lambda_event_sources,
     aws_apigateway,
+    aws_dynamodb,
     aws_s3,
+    aws_sqs,
     aws_iam
 )
 from constructs import Construct
@@ -36,8 +40,113 @@ class ImageApiStack(Stack):
             )
         )
 
+        # Inpainting keeps a bounded cache of encoded source images, so it gets more memory
+        inpaint_lambda = aws_lambda.Function(
+            self,
+            "Py-InpaintLambda",
+            runtime=aws_lambda.Runtime.PYTHON_3_13,
+            code=aws_lambda.Code.from_asset("services"),
+            handler="inpaint.handler",
+            timeout=Duration.seconds(30),
+            memory_size=512,
+            environment={
+                "BUCKET_NAME": images_bucket.bucket_name,
+                "SOURCE_CACHE_BYTES": str(64 * 1024 * 1024)
+            }
+        )
+        images_bucket.grant_read_write(inpaint_lambda)
+        inpaint_lambda.add_to_role_policy(
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                resources=["*"],
+                actions=["bedrock:InvokeModel"]
+            )
+        )
+
+        # Asynchronous jobs: POST enqueues, a queue-triggered worker generates, GET reports status
+        jobs_table = aws_dynamodb.Table(
+            self,
+            "Py-ImageJobsTable",
+            partition_key=aws_dynamodb.Attribute(name="job_id", type=aws_dynamodb.AttributeType.STRING),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+        # Throttled jobs are retried until their last receive, then moved to the dead-letter queue
+        max_receive_count = 3
+        worker_timeout = Duration.minutes(5)
+        visibility_timeout = Duration.seconds(900)
+        jobs_dead_letter_queue = aws_sqs.Queue(self, "Py-ImageJobsDeadLetterQueue")
+        jobs_queue = aws_sqs.Queue(
+            self,
+            "Py-ImageJobsQueue",
+            visibility_timeout=visibility_timeout,
+            dead_letter_queue=aws_sqs.DeadLetterQueue(max_receive_count=max_receive_count, queue=jobs_dead_letter_queue)
+        )
+        jobs_environment = {
+            "BUCKET_NAME": images_bucket.bucket_name,
+            "JOBS_TABLE_NAME": jobs_table.table_name,
+            "JOBS_QUEUE_URL": jobs_queue.queue_url,
+            "MAX_RECEIVE_COUNT": str(max_receive_count),
+            "RUNNING_TIMEOUT_SECONDS": str(visibility_timeout.to_seconds() + worker_timeout.to_seconds())
+        }
+
+        submit_lambda = aws_lambda.Function(
+            self,
+            "Py-ImageJobSubmitLambda",
+            runtime=aws_lambda.Runtime.PYTHON_3_13,
+            code=aws_lambda.Code.from_asset("services"),
+            handler="jobs.submit_handler",
+            timeout=Duration.seconds(10),
+            environment=jobs_environment
+        )
+        jobs_table.grant_write_data(submit_lambda)
+        jobs_queue.grant_send_messages(submit_lambda)
+
+        worker_lambda = aws_lambda.Function(
+            self,
+            "Py-ImageJobWorkerLambda",
+            runtime=aws_lambda.Runtime.PYTHON_3_13,
+            code=aws_lambda.Code.from_asset("services"),
+            handler="jobs.worker_handler",
+            timeout=worker_timeout,
+            # Every Bedrock attempt and its backoff must end before the worker times out
+            environment={**jobs_environment, "BOTO_MAX_ATTEMPTS": "3", "BOTO_READ_TIMEOUT": "60"}
+        )
+        worker_lambda.add_event_source(
+            aws_lambda_event_sources.SqsEventSource(jobs_queue, batch_size=1, report_batch_item_failures=True)
+        )
+        jobs_table.grant_read_write_data(worker_lambda)
+        images_bucket.grant_read_write(worker_lambda)
+        worker_lambda.add_to_role_policy(
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                resources=["*"],
+                actions=["bedrock:InvokeModel"]
+            )
+        )
+
+        status_lambda = aws_lambda.Function(
+            self,
+            "Py-ImageJobStatusLambda",
+            runtime=aws_lambda.Runtime.PYTHON_3_13,
+            code=aws_lambda.Code.from_asset("services"),
+            handler="jobs.status_handler",
+            timeout=Duration.seconds(10),
+            environment=jobs_environment
+        )
+        jobs_table.grant_read_data(status_lambda)
+        images_bucket.grant_read(status_lambda)
+
         api = aws_apigateway.RestApi(self, "Py-ImageApi")
         image_resource = api.root.add_resource("image")
         image_integration = aws_apigateway.LambdaIntegration(image_lambda)
         image_resource.add_method("POST", image_integration)
 
+        inpaint_resource = image_resource.add_resource("inpaint")
+        inpaint_resource.add_method("POST", aws_apigateway.LambdaIntegration(inpaint_lambda))
+
+        jobs_resource = image_resource.add_resource("jobs")
+        jobs_resource.add_method("POST", aws_apigateway.LambdaIntegration(submit_lambda))
+        job_resource = jobs_resource.add_resource("{job_id}")
+        job_resource.add_method("GET", aws_apigateway.LambdaIntegration(status_lambda))
@@ -1,67 +1,242 @@
-import boto3
+import bootstrap
 import json
 import base64
-import random
-from time import time
+import hashlib
+import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from image_stream import ImageStream
 
 AWS_REGION = 'us-west-2'
 S3_BUCKET = os.environ.get("BUCKET_NAME")
 
-bedrock_client = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION)
-s3_client = boto3.client("s3")
+# Titan Image Generator accepts between 1 and 5 images per request
+MAX_IMAGES = 5
+QUALITIES = ("standard", "premium")
+# (width, height) pairs Titan Image Generator v1 accepts
+IMAGE_SIZES = {
+    (1024, 1024), (768, 768), (512, 512), (768, 1152), (384, 576), (1152, 768), (576, 384),
+    (768, 1280), (384, 640), (1280, 768), (640, 384), (896, 1152), (448, 576), (1152, 896),
+    (576, 448), (768, 1408), (384, 704), (1408, 768), (704, 384), (640, 1408), (320, 704),
+    (1408, 640), (704, 320), (1152, 640), (1173, 640)
+}
+MAX_SEED = 2147483646
+
+# Streaming decodes each image straight from the response body into S3, keeping peak memory
+# at about multipart_chunksize * max_concurrency regardless of image size or count. Below that
+# the buffered path uses less memory and uploads the images concurrently, so streaming only
+# starts with responses of at least STREAM_THRESHOLD_BYTES.
+STREAM_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=5 * 1024 * 1024,
+    multipart_chunksize=5 * 1024 * 1024,
+    max_concurrency=2
+)
+STREAM_THRESHOLD_BYTES = int(os.environ.get(
+    "STREAM_THRESHOLD_BYTES",
+    str(STREAM_TRANSFER_CONFIG.multipart_chunksize * STREAM_TRANSFER_CONFIG.max_concurrency)
+))
+
+bedrock_client = bootstrap.client("bedrock-runtime", AWS_REGION)
+s3_client = bootstrap.client("s3")
 
-seed = random.randint(0, 858993460)
+# Requests without a seed use this one, so identical requests map to the same stored images in every container
+DEFAULT_SEED = int(os.environ.get("DEFAULT_SEED", "0"))
 
+# Requests served from earlier generations versus generated ones, used to report hit rate and saved latency
+cache_stats = {"hits": 0, "misses": 0, "hitMs": 0.0, "generationMs": 0.0}
+
+@bootstrap.instrument
 def handler(event, context):
     body = json.loads(event["body"])
     description = body.get("description")
     if description:
-        model_config = get_model_config(description)
+        try:
+            generation_config = get_generation_config(body)
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "body": json.dumps({"error": str(e)})
+            }
+        image_names, cached = generate_images(description, generation_config)
+        signed_urls = [get_signed_url(image_name) for image_name in image_names]
+        return {
+            "statusCode": 200,
+            "body": json.dumps({"url": signed_urls[0], "urls": signed_urls, "cached": cached})
+        }
+    return {
+        "statusCode": 400,
+        "body": json.dumps({"error": "description needed"})
+    }
+
+
+def generate_images(description, generation_config):
+    """
+    Generate and store the images for a request, reusing an identical earlier generation.
+    Returns the S3 keys in generation order and whether they came from the cache.
+    """
+    started = time.perf_counter()
+    prefix = get_image_prefix(description, generation_config)
+    count = generation_config["numberOfImages"]
+    cached = has_cached_images(prefix, count)
+    if cached:
+        image_names = [f"{prefix}{index}.png" for index in range(count)]
+    else:
+        model_config = get_model_config(description, generation_config)
         response = bedrock_client.invoke_model(
             modelId="amazon.titan-image-generator-v1",
             body=model_config,
             contentType="application/json",
             accept="application/json"
         )
-        response_body = json.loads(response.get("body").read())
-        base64_image = response_body.get("images")[0]
-        signed_url = save_image_to_s3(base64_image)
-        return {
-            "statusCode": 200,
-            "body": json.dumps({"url": signed_url})
-        }
-    
+        if should_stream(response):
+            image_names = stream_images_to_s3(response.get("body"), prefix)
+        else:
+            response_body = json.loads(response.get("body").read())
+            image_names = save_images_to_s3(response_body.get("images"), prefix)
+    record_cache_metric(cached, (time.perf_counter() - started) * 1000)
+    return image_names, cached
+
+
+def should_stream(response):
+    """
+    Whether the response body is large enough for streaming to lower peak memory.
+    """
+    length = response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("content-length")
+    return length is not None and int(length) >= STREAM_THRESHOLD_BYTES
+
+
+def get_image_prefix(description, generation_config):
+    """
+    Content-addressed S3 prefix: identical prompt, seed and generation config share it,
+    any other request gets a different one, so objects never overwrite each other.
+    """
+    key = json.dumps({"description": description, "config": generation_config}, sort_keys=True)
+    return f"images/{hashlib.sha256(key.encode('utf-8')).hexdigest()}/"
+
 
-def save_image_to_s3(base64_image):
+def has_cached_images(prefix, count):
+    """
+    Whether a complete earlier generation is stored under prefix: every image key exists.
+    """
+    return all(object_exists(f"{prefix}{index}.png") for index in range(count))
+
+
+def object_exists(image_name):
+    try:
+        s3_client.head_object(Bucket=S3_BUCKET, Key=image_name)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+    return True
+
+
+def record_cache_metric(cached, elapsed_ms):
+    if cached:
+        cache_stats["hits"] += 1
+        cache_stats["hitMs"] += elapsed_ms
+    else:
+        cache_stats["misses"] += 1
+        cache_stats["generationMs"] += elapsed_ms
+    requests = cache_stats["hits"] + cache_stats["misses"]
+    average_generation_ms = cache_stats["generationMs"] / cache_stats["misses"] if cache_stats["misses"] else 0.0
+    print(json.dumps({
+        "metric": "image_cache",
+        "hit": cached,
+        "latencyMs": round(elapsed_ms, 1),
+        "hitRate": round(cache_stats["hits"] / requests, 3),
+        "savedMs": round(cache_stats["hits"] * average_generation_ms - cache_stats["hitMs"], 1)
+    }))
+
+
+def save_images_to_s3(base64_images, prefix):
+    """
+    Decode and upload every image concurrently, returning the S3 keys in generation order.
+    """
+    image_names = [f"{prefix}{index}.png" for index in range(len(base64_images))]
+    if len(base64_images) == 1:
+        return [save_image_to_s3(base64_images[0], image_names[0])]
+    with ThreadPoolExecutor(max_workers=len(base64_images)) as executor:
+        return list(executor.map(save_image_to_s3, base64_images, image_names))
+
+
+def stream_images_to_s3(response_body, prefix):
+    """
+    Upload each image as it is parsed and decoded from the response body, one after another.
+    """
+    image_names = []
+    for index, image_file in enumerate(ImageStream(response_body)):
+        image_name = f"{prefix}{index}.png"
+        s3_client.upload_fileobj(image_file, S3_BUCKET, image_name, Config=STREAM_TRANSFER_CONFIG)
+        image_names.append(image_name)
+    return image_names
+
+
+def save_image_to_s3(base64_image, image_name):
     image_file = base64.b64decode(base64_image)
-    timestamp = int(time())
-    image_name = str(timestamp) + ".png"
 
     s3_client.put_object(
         Bucket=S3_BUCKET,
         Key=image_name,
         Body=image_file,
     )
-    signed_url = s3_client.generate_presigned_url(
+    return image_name
+
+
+def get_signed_url(image_name):
+    return s3_client.generate_presigned_url(
         'get_object',
         Params={'Bucket': S3_BUCKET, 'Key': image_name},
         ExpiresIn=3600
     )
-    return signed_url
 
 
-def get_model_config(description):
+def get_generation_config(body):
+    """
+    Titan generation config from the request body. Raises ValueError with a message for the
+    caller when a field has the wrong type or a value the model does not accept.
+    """
+    count = int_field(body, "count", 1)
+    image_seed = int_field(body, "seed", DEFAULT_SEED)
+    width = int_field(body, "width", 512)
+    height = int_field(body, "height", 512)
+    quality = body.get("quality", "standard")
+    if not 1 <= count <= MAX_IMAGES:
+        raise ValueError(f"count must be between 1 and {MAX_IMAGES}")
+    if quality not in QUALITIES:
+        raise ValueError(f"quality must be one of {', '.join(QUALITIES)}")
+    if (width, height) not in IMAGE_SIZES:
+        raise ValueError(f"{width}x{height} is not a supported image size")
+    if not 0 <= image_seed <= MAX_SEED:
+        raise ValueError(f"seed must be between 0 and {MAX_SEED}")
+    return {
+        "numberOfImages": count,
+        "height": height,
+        "width": width,
+        "quality": quality,
+        "seed": image_seed
+    }
+
+
+def int_field(body, name, default):
+    value = body.get(name, default)
+    # bool is an int subclass, and floats would be silently truncated
+    if isinstance(value, (bool, float)) or not isinstance(value, (int, str)):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def get_model_config(description, generation_config):
     return json.dumps({
         "taskType": "TEXT_IMAGE",
         "textToImageParams": {
             "text": description
         },
-        "imageGenerationConfig": {
-            "numberOfImages": 1,
-            "height": 512,
-            "width": 512,
-            "quality": "standard",
-            "seed": seed
-        }
-    })
\ No newline at end of file
+        "imageGenerationConfig": generation_config
+    })
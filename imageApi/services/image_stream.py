@@ -0,0 +1,129 @@
+"""
+Incremental reader for the "images" array of a Titan Image Generator response.
+
+Each base64 string is decoded chunk by chunk while it is read from the response body,
+so an image never has to exist in memory as a whole JSON document, base64 string and
+decoded copy at the same time.
+"""
+
+import binascii
+import io
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = b" \t\r\n"
+
+
+class ImageStream:
+
+    def __init__(self, body, chunk_size=CHUNK_SIZE):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.buffer = b""
+        self.position = 0
+
+    def __iter__(self):
+        """
+        Yield one binary file-like object per image. Each must be read before the next is requested.
+        """
+        self._seek_images_array()
+        while True:
+            token = self._next_token()
+            if token == ord("]"):
+                return
+            if token == ord(","):
+                continue
+            if token != ord('"'):
+                raise ValueError(f"unexpected character {chr(token)!r} in images array")
+            raw = _Base64ImageReader(self)
+            yield io.BufferedReader(raw, buffer_size=self.chunk_size)
+            raw.drain()
+
+    def _fill(self):
+        data = self.body.read(self.chunk_size)
+        if not data:
+            return False
+        self.buffer = self.buffer[self.position:] + data
+        self.position = 0
+        return True
+
+    def _seek_images_array(self):
+        key = b'"images"'
+        while True:
+            found = self.buffer.find(key, self.position)
+            if found == -1:
+                # Keep a possible partial match at the end of the buffer
+                self.position = max(self.position, len(self.buffer) - len(key) + 1)
+                if not self._fill():
+                    raise ValueError("response body has no images field")
+                continue
+            self.position = found + len(key)
+            # Only a key is followed by a colon; "images" may also appear as a plain string value
+            if self._next_token() == ord(":"):
+                break
+        if self._next_token() != ord("["):
+            raise ValueError("images field is not an array")
+
+    def _next_token(self):
+        while True:
+            if self.position >= len(self.buffer) and not self._fill():
+                raise ValueError("unexpected end of response body")
+            byte = self.buffer[self.position]
+            self.position += 1
+            if byte not in WHITESPACE:
+                return byte
+
+    def _read_string_chunk(self):
+        """
+        Return (characters, closed): the next run of string characters and whether the closing quote was reached.
+        """
+        if self.position >= len(self.buffer) and not self._fill():
+            raise ValueError("unexpected end of response body")
+        end = self.buffer.find(b'"', self.position)
+        if end == -1:
+            chunk = self.buffer[self.position:]
+            self.position = len(self.buffer)
+            return chunk, False
+        chunk = self.buffer[self.position:end]
+        self.position = end + 1
+        return chunk, True
+
+
+class _Base64ImageReader(io.RawIOBase):
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.pending = b""
+        self.decoded = memoryview(b"")
+        self.closed_string = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.decoded and not self.closed_string:
+            self._decode_more()
+        size = min(len(buffer), len(self.decoded))
+        buffer[:size] = self.decoded[:size]
+        self.decoded = self.decoded[size:]
+        return size
+
+    def drain(self):
+        while not self.closed_string:
+            self._decode_more()
+        self.decoded = memoryview(b"")
+
+    def _decode_more(self):
+        chunk, self.closed_string = self.stream._read_string_chunk()
+        data = self.pending + chunk
+        tail = b""
+        # An escape sequence may be split across reads
+        if not self.closed_string and data.endswith(b"\\"):
+            data, tail = data[:-1], b"\\"
+        if b"\\" in data:
+            data = data.replace(b"\\/", b"/").replace(b"\\n", b"").replace(b"\\r", b"")
+        if self.closed_string:
+            usable, self.pending = data, b""
+        else:
+            cut = len(data) - len(data) % 4
+            usable, self.pending = data[:cut], data[cut:] + tail
+        self.decoded = memoryview(binascii.a2b_base64(usable))
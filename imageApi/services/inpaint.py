@@ -0,0 +1,176 @@
+import bootstrap
+import json
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+import image
+
+MAX_EDITS = int(os.environ.get("MAX_EDITS", "10"))
+MAX_CONCURRENT_EDITS = int(os.environ.get("MAX_CONCURRENT_EDITS", "4"))
+SOURCE_CACHE_BYTES = int(os.environ.get("SOURCE_CACHE_BYTES", str(64 * 1024 * 1024)))
+# Titan's accepted cfgScale range
+MIN_CFG_SCALE = 1.1
+MAX_CFG_SCALE = 10.0
+
+
+class SourceImageCache:
+    """
+    LRU cache of base64-encoded source images bounded by their total encoded size.
+    Entries are revalidated with a conditional GET, so an unchanged image is never downloaded twice.
+    """
+
+    def __init__(self, max_bytes=SOURCE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, image_key):
+        """
+        Return (etag, base64 image) for image_key.
+        """
+        with self._lock:
+            entry = self._entries.get(image_key)
+        try:
+            if entry:
+                response = image.s3_client.get_object(Bucket=image.S3_BUCKET, Key=image_key, IfNoneMatch=entry[0])
+            else:
+                response = image.s3_client.get_object(Bucket=image.S3_BUCKET, Key=image_key)
+        except ClientError as e:
+            if entry and e.response["Error"]["Code"] in ("304", "NotModified"):
+                with self._lock:
+                    self.hits += 1
+                    if image_key in self._entries:
+                        self._entries.move_to_end(image_key)
+                return entry
+            raise
+        etag = response["ETag"].strip('"')
+        encoded = base64.b64encode(response["Body"].read()).decode("utf-8")
+        self._put(image_key, (etag, encoded))
+        return etag, encoded
+
+    def _put(self, image_key, entry):
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.pop(image_key, None)
+            if previous:
+                self.size -= len(previous[1])
+            if len(entry[1]) > self.max_bytes:
+                return
+            self._entries[image_key] = entry
+            self.size += len(entry[1])
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted[1])
+
+
+source_cache = SourceImageCache()
+
+
+@bootstrap.instrument
+def handler(event, context):
+    body = json.loads(event["body"])
+    image_key = body.get("imageKey")
+    edits = body.get("edits")
+    if not image_key or not edits:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "imageKey and edits needed"})
+        }
+    try:
+        edits = get_edits(edits)
+    except ValueError as e:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": str(e)})
+        }
+    try:
+        etag, source_image = source_cache.get(image_key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+            return {
+                "statusCode": 404,
+                "body": json.dumps({"error": "image not found"})
+            }
+        raise
+
+    # The source image is fetched and encoded once; every edit reuses the same string
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_EDITS, len(edits))) as executor:
+        image_names = list(executor.map(lambda edit: apply_edit(source_image, etag, edit), edits))
+    return {
+        "statusCode": 200,
+        "body": json.dumps({"urls": [image.get_signed_url(image_name) for image_name in image_names]})
+    }
+
+
+def get_edits(edits):
+    """
+    Validate the requested edits and fill in their defaults, so equal edits hash to the same key.
+    Raises ValueError with a message for the client.
+    """
+    if not isinstance(edits, list) or not 1 <= len(edits) <= MAX_EDITS:
+        raise ValueError(f"edits must be a list of between 1 and {MAX_EDITS} edits")
+    validated = []
+    for edit in edits:
+        if not isinstance(edit, dict) or not all(isinstance(edit.get(name), str) and edit.get(name) for name in ("text", "maskPrompt")):
+            raise ValueError("each edit must be an object with text and maskPrompt")
+        cfg_scale = edit.get("cfgScale", 8.0)
+        if isinstance(cfg_scale, bool) or not isinstance(cfg_scale, (int, float)):
+            raise ValueError("cfgScale must be a number")
+        if not MIN_CFG_SCALE <= cfg_scale <= MAX_CFG_SCALE:
+            raise ValueError(f"cfgScale must be between {MIN_CFG_SCALE} and {MAX_CFG_SCALE}")
+        seed = image.int_field(edit, "seed", image.DEFAULT_SEED)
+        if not 0 <= seed <= image.MAX_SEED:
+            raise ValueError(f"seed must be between 0 and {image.MAX_SEED}")
+        validated.append({
+            "text": edit["text"],
+            "negativeText": edit.get("negativeText", "bad quality, low res"),
+            "maskPrompt": edit["maskPrompt"],
+            "cfgScale": float(cfg_scale),
+            "seed": seed
+        })
+    return validated
+
+
+def apply_edit(source_image, etag, edit):
+    # Same content addressing as generated images: with the seed pinned, identical source and
+    # edit always produce the same image, so an existing object is returned as is
+    key = json.dumps({"source": etag, "edit": edit}, sort_keys=True)
+    image_name = f"edits/{hashlib.sha256(key.encode('utf-8')).hexdigest()}.png"
+    if image.object_exists(image_name):
+        return image_name
+    model_config = get_model_config(source_image, edit)
+    response = image.bedrock_client.invoke_model(
+        modelId="amazon.titan-image-generator-v1",
+        body=model_config,
+        contentType="application/json",
+        accept="application/json"
+    )
+    response_body = json.loads(response.get("body").read())
+    return image.save_image_to_s3(response_body.get("images")[0], image_name)
+
+
+def get_model_config(source_image, edit):
+    return json.dumps({
+        "taskType": "INPAINTING",
+        "inPaintingParams": {
+            "text": edit["text"],
+            "negativeText": edit["negativeText"],
+            "image": source_image,
+            "maskPrompt": edit["maskPrompt"]
+        },
+        "imageGenerationConfig": {
+            "numberOfImages": 1,
+            "quality": "standard",
+            "cfgScale": edit["cfgScale"],
+            "seed": edit["seed"]
+        }
+    })
@@ -0,0 +1,239 @@
+"""
+Asynchronous image generation jobs.
+
+POST enqueues the request and answers with a job id right away, a queue-triggered worker
+runs the generation, and GET reports the job status and image URLs. Without JOBS_QUEUE_URL
+and JOBS_TABLE_NAME an in-process queue and store stand in for SQS and DynamoDB.
+
+Throttling and timeouts leave the job PENDING and hand the message back to SQS through a partial
+batch response, made visible again after a short jittered backoff rather than the queue's full
+visibility timeout; on its last receive the job is marked FAILED and the message moves to the
+dead-letter queue. Any other error fails the job right away. A job left RUNNING by a worker that
+never finished is reported as FAILED once no further receive can pick it up.
+"""
+
+import bootstrap
+import boto3
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+
+from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+import image
+
+JOBS_TABLE_NAME = os.environ.get("JOBS_TABLE_NAME")
+JOBS_QUEUE_URL = os.environ.get("JOBS_QUEUE_URL")
+JOB_TTL_SECONDS = int(os.environ.get("JOB_TTL_SECONDS", "86400"))
+# Must match the dead-letter queue's maxReceiveCount
+MAX_RECEIVE_COUNT = int(os.environ.get("MAX_RECEIVE_COUNT", "3"))
+# Backoff before a returned message is received again, in seconds
+RETRY_BASE_SECONDS = int(os.environ.get("RETRY_BASE_SECONDS", "10"))
+RETRY_MAX_SECONDS = int(os.environ.get("RETRY_MAX_SECONDS", "120"))
+# Longest a job can stay RUNNING while a worker may still finish or retry it
+RUNNING_TIMEOUT_SECONDS = int(os.environ.get("RUNNING_TIMEOUT_SECONDS", "1200"))
+RETRYABLE_ERRORS = (
+    "ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException",
+    "ModelNotReadyException", "InternalServerException", "SlowDown", "RequestTimeout"
+)
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+
+
+class DynamoDBJobStore:
+
+    def __init__(self, table_name):
+        self.table = boto3.resource("dynamodb", config=bootstrap.CLIENT_CONFIG).Table(table_name)
+
+    def put(self, job):
+        self.table.put_item(Item=job)
+
+    def get(self, job_id):
+        return self.table.get_item(Key={"job_id": job_id}).get("Item")
+
+    def update(self, job_id, **fields):
+        names = {f"#{name}": name for name in fields}
+        values = {f":{name}": value for name, value in fields.items()}
+        self.table.update_item(
+            Key={"job_id": job_id},
+            UpdateExpression="SET " + ", ".join(f"#{name} = :{name}" for name in fields),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+
+class MemoryJobStore:
+
+    def __init__(self):
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def put(self, job):
+        with self._lock:
+            self.jobs[job["job_id"]] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            self.jobs[job_id].update(fields)
+
+
+class SqsJobQueue:
+
+    def __init__(self, queue_url):
+        self.queue_url = queue_url
+        self.client = bootstrap.client("sqs")
+
+    def send(self, message):
+        self.client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(message))
+
+    def retry_later(self, receipt_handle, seconds):
+        self.client.change_message_visibility(QueueUrl=self.queue_url, ReceiptHandle=receipt_handle, VisibilityTimeout=seconds)
+
+
+class LocalJobQueue:
+    """
+    In-process stand-in for SQS: a daemon thread feeds queued messages to process_job.
+    """
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        threading.Thread(target=self._work, daemon=True).start()
+
+    def send(self, message):
+        self.messages.put(message)
+
+    def _work(self):
+        while True:
+            message = self.messages.get()
+            try:
+                # There is no redelivery in process, so every attempt is the last one
+                process_job(message, final_attempt=True)
+            except Exception:
+                pass
+            self.messages.task_done()
+
+
+job_store = DynamoDBJobStore(JOBS_TABLE_NAME) if JOBS_TABLE_NAME else MemoryJobStore()
+job_queue = SqsJobQueue(JOBS_QUEUE_URL) if JOBS_QUEUE_URL else LocalJobQueue()
+
+
+@bootstrap.instrument
+def submit_handler(event, context):
+    body = json.loads(event["body"])
+    description = body.get("description")
+    if not description:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "description needed"})
+        }
+    try:
+        generation_config = image.get_generation_config(body)
+    except ValueError as e:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": str(e)})
+        }
+
+    job_id = str(uuid.uuid4())
+    now = int(time.time())
+    job_store.put({
+        "job_id": job_id,
+        "status": PENDING,
+        "created_at": now,
+        "expires_at": now + JOB_TTL_SECONDS
+    })
+    job_queue.send({"job_id": job_id, "description": description, "generation_config": generation_config})
+    return {
+        "statusCode": 202,
+        "body": json.dumps({"jobId": job_id, "status": PENDING})
+    }
+
+
+@bootstrap.instrument
+def worker_handler(event, context):
+    """
+    SQS batch handler. Messages whose job should be retried are returned in batchItemFailures,
+    so only they go back to the queue, and become visible again after retry_delay.
+    """
+    failures = []
+    for record in event["Records"]:
+        receive_count = int(record.get("attributes", {}).get("ApproximateReceiveCount", "1"))
+        try:
+            process_job(json.loads(record["body"]), final_attempt=receive_count >= MAX_RECEIVE_COUNT)
+        except Exception as e:
+            print(json.dumps({"metric": "image_job_retry", "messageId": record["messageId"], "receiveCount": receive_count, "error": str(e)}))
+            job_queue.retry_later(record["receiptHandle"], retry_delay(receive_count))
+            failures.append({"itemIdentifier": record["messageId"]})
+    return {"batchItemFailures": failures}
+
+
+def retry_delay(receive_count):
+    """
+    Exponential backoff with full jitter, so throttled jobs do not all come back at once.
+    """
+    return random.randint(1, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** receive_count))
+
+
+def process_job(message, final_attempt=True):
+    """
+    Run one job. Raises when the message should be retried or sent to the dead-letter queue.
+    """
+    job_id = message["job_id"]
+    job_store.update(job_id, status=RUNNING, started_at=int(time.time()))
+    try:
+        image_names, cached = image.generate_images(message["description"], message["generation_config"])
+    except Exception as e:
+        retryable = is_retryable(e)
+        if retryable and not final_attempt:
+            job_store.update(job_id, status=PENDING, error=str(e))
+            raise
+        job_store.update(job_id, status=FAILED, error=str(e), finished_at=int(time.time()))
+        if retryable:
+            # Out of attempts: the message goes on to the dead-letter queue
+            raise
+        return
+    job_store.update(job_id, status=SUCCEEDED, images=image_names, cached=cached, finished_at=int(time.time()))
+
+
+def is_retryable(error):
+    """
+    Throttling, transient service errors and connection failures or timeouts.
+    """
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in RETRYABLE_ERRORS
+    return isinstance(error, (ConnectionError, HTTPClientError))
+
+
+@bootstrap.instrument
+def status_handler(event, context):
+    job_id = (event.get("pathParameters") or {}).get("job_id")
+    job = job_store.get(job_id) if job_id else None
+    if not job:
+        return {
+            "statusCode": 404,
+            "body": json.dumps({"error": "job not found"})
+        }
+    if job["status"] == RUNNING and time.time() - int(job["started_at"]) > RUNNING_TIMEOUT_SECONDS:
+        job = {**job, "status": FAILED, "error": "job timed out"}
+    result = {"jobId": job_id, "status": job["status"]}
+    if job["status"] == SUCCEEDED:
+        result["urls"] = [image.get_signed_url(image_name) for image_name in job["images"]]
+        result["cached"] = job["cached"]
+    elif job["status"] == FAILED:
+        result["error"] = job["error"]
+    return {
+        "statusCode": 200,
+        "body": json.dumps(result)
+    }
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The Lambda code imports its neighbours as top-level modules, as it does in the deployed asset
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "services")))
+os.environ.setdefault("BUCKET_NAME", "images-bucket")
@@ -0,0 +1,124 @@
+import base64
+import importlib
+import io
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import image
+
+
+def event(**body):
+    return {"body": json.dumps({"description": "a red fox in the snow", **body})}
+
+
+def test_generation_config_uses_the_request_fields():
+    config = image.get_generation_config({"count": "2", "seed": 7, "width": 768, "height": 1152, "quality": "premium"})
+
+    assert config == {"numberOfImages": 2, "height": 1152, "width": 768, "quality": "premium", "seed": 7}
+
+
+@pytest.mark.parametrize("fields, error", [
+    ({"width": "wide"}, "width must be an integer"),
+    ({"height": [512]}, "height must be an integer"),
+    ({"width": 512.5}, "width must be an integer"),
+    ({"width": 500, "height": 500}, "500x500 is not a supported image size"),
+    ({"width": 512, "height": 1024}, "512x1024 is not a supported image size"),
+    ({"count": 6}, "count must be between 1 and 5"),
+    ({"seed": -1}, "seed must be between"),
+    ({"quality": "ultra"}, "quality must be one of")
+])
+def test_invalid_fields_are_rejected_before_calling_bedrock(fields, error, monkeypatch):
+    monkeypatch.setattr(image, "generate_images", pytest.fail)
+
+    response = image.handler(event(**fields), None)
+
+    assert response["statusCode"] == 400
+    assert error in json.loads(response["body"])["error"]
+
+
+class TitanStub:
+
+    def __init__(self, images):
+        self.payload = json.dumps({"images": images, "error": None}).encode("utf-8")
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        return {
+            "body": io.BytesIO(self.payload),
+            "ResponseMetadata": {"HTTPHeaders": {"content-length": str(len(self.payload))}}
+        }
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=image.S3_BUCKET)
+        monkeypatch.setattr(image, "s3_client", client)
+        yield client
+
+
+@pytest.fixture
+def titan(monkeypatch):
+    stub = TitanStub([base64.b64encode(f"png {index}".encode()).decode() for index in range(2)])
+    monkeypatch.setattr(image, "bedrock_client", stub)
+    return stub
+
+
+def stored(s3, key):
+    return s3.get_object(Bucket=image.S3_BUCKET, Key=key)["Body"].read()
+
+
+@pytest.mark.parametrize("threshold, streamed", [(image.STREAM_THRESHOLD_BYTES, False), (0, True)])
+def test_small_responses_use_the_buffered_upload(s3, titan, monkeypatch, threshold, streamed):
+    monkeypatch.setattr(image, "STREAM_THRESHOLD_BYTES", threshold)
+    uploads = []
+    monkeypatch.setattr(image, "stream_images_to_s3", lambda body, prefix: uploads.append(prefix) or [])
+    config = image.get_generation_config({"count": 2, "seed": 1})
+
+    image_names, _ = image.generate_images("a red fox", config)
+
+    assert bool(uploads) == streamed
+    if not streamed:
+        assert [stored(s3, name) for name in image_names] == [b"png 0", b"png 1"]
+
+
+def test_streamed_upload_stores_every_image(s3, titan):
+    body = io.BytesIO(titan.payload)
+
+    image_names = image.stream_images_to_s3(body, "images/streamed/")
+
+    assert [stored(s3, name) for name in image_names] == [b"png 0", b"png 1"]
+
+
+def test_repeated_request_is_served_from_s3(s3, titan):
+    first = json.loads(image.handler(event(count=2), None)["body"])
+    second = json.loads(image.handler(event(count=2), None)["body"])
+
+    assert titan.calls == 1
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert [url.split("?")[0] for url in first["urls"]] == [url.split("?")[0] for url in second["urls"]]
+
+
+def test_requests_without_a_seed_get_the_same_key_in_every_container():
+    config = image.get_generation_config({})
+    # A new container imports the module again
+    importlib.reload(image)
+
+    assert image.get_generation_config({}) == config
+    assert image.get_image_prefix("a red fox", image.get_generation_config({})) == image.get_image_prefix("a red fox", config)
+
+
+def test_partial_generation_is_not_a_hit(s3, titan):
+    config = image.get_generation_config({"count": 2, "seed": 3})
+    prefix = image.get_image_prefix("a red fox", config)
+    s3.put_object(Bucket=image.S3_BUCKET, Key=f"{prefix}0.png", Body=b"png 0")
+
+    assert image.has_cached_images(prefix, 2) is False
+    assert image.has_cached_images(prefix, 1) is True
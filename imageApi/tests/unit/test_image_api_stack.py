@@ -3,13 +3,23 @@ import aws_cdk.assertions as assertions
 
 from image_api.image_api_stack import ImageApiStack
 
-# example tests. To run these tests, uncomment this file along with the example
-# resource in image_api/image_api_stack.py
 def test_sqs_queue_created():
     app = core.App()
     stack = ImageApiStack(app, "image-api")
     template = assertions.Template.from_stack(stack)
 
-#     template.has_resource_properties("AWS::SQS::Queue", {
-#         "VisibilityTimeout": 300
-#     })
+    template.has_resource_properties("AWS::SQS::Queue", {
+        "VisibilityTimeout": 900
+    })
+    template.has_resource_properties("AWS::Lambda::EventSourceMapping", {
+        "BatchSize": 1,
+        "FunctionResponseTypes": ["ReportBatchItemFailures"]
+    })
+    template.has_resource_properties("AWS::SQS::Queue", {
+        "RedrivePolicy": {"maxReceiveCount": 3, "deadLetterTargetArn": assertions.Match.any_value()}
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "Handler": "jobs.worker_handler",
+        "Timeout": 300,
+        "Environment": {"Variables": assertions.Match.object_like({"BOTO_MAX_ATTEMPTS": "3", "RUNNING_TIMEOUT_SECONDS": "1200"})}
+    })
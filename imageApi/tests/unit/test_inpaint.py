@@ -0,0 +1,99 @@
+import base64
+import io
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import image
+import inpaint
+
+EDIT = {"text": "a blue hat", "maskPrompt": "hat"}
+
+
+class TitanStub:
+
+    def __init__(self):
+        self.requests = []
+
+    def invoke_model(self, **kwargs):
+        self.requests.append(json.loads(kwargs["body"]))
+        payload = {"images": [base64.b64encode(f"edit {len(self.requests)}".encode()).decode()]}
+        return {"body": io.BytesIO(json.dumps(payload).encode("utf-8"))}
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=image.S3_BUCKET)
+        client.put_object(Bucket=image.S3_BUCKET, Key="images/source.png", Body=b"source png")
+        monkeypatch.setattr(image, "s3_client", client)
+        monkeypatch.setattr(inpaint, "source_cache", inpaint.SourceImageCache())
+        yield client
+
+
+@pytest.fixture
+def titan(monkeypatch):
+    stub = TitanStub()
+    monkeypatch.setattr(image, "bedrock_client", stub)
+    return stub
+
+
+def inpaint_event(edits, image_key="images/source.png"):
+    return {"body": json.dumps({"imageKey": image_key, "edits": edits})}
+
+
+def image_names(response):
+    return ["edits/" + url.split("?")[0].rsplit("/", 1)[-1] for url in json.loads(response["body"])["urls"]]
+
+
+def test_repeated_edit_reuses_the_stored_image(s3, titan):
+    first = image_names(inpaint.handler(inpaint_event([EDIT]), None))
+    stored = s3.get_object(Bucket=image.S3_BUCKET, Key=first[0])["Body"].read()
+    second = image_names(inpaint.handler(inpaint_event([EDIT]), None))
+
+    assert len(titan.requests) == 1
+    assert first == second
+    assert s3.get_object(Bucket=image.S3_BUCKET, Key=second[0])["Body"].read() == stored
+
+
+def test_edits_are_generated_with_a_pinned_seed(s3, titan):
+    inpaint.handler(inpaint_event([EDIT, {**EDIT, "text": "a red hat", "seed": 42}]), None)
+
+    seeds = sorted(request["imageGenerationConfig"]["seed"] for request in titan.requests)
+    assert seeds == [image.DEFAULT_SEED, 42]
+
+
+def test_different_seeds_get_different_keys(s3, titan):
+    names = image_names(inpaint.handler(inpaint_event([EDIT, {**EDIT, "seed": 5}]), None))
+
+    assert names[0] != names[1]
+    assert len(titan.requests) == 2
+
+
+@pytest.mark.parametrize("edits, error", [
+    ({"text": "a hat"}, "edits must be a list"),
+    ([EDIT] * (inpaint.MAX_EDITS + 1), "edits must be a list"),
+    (["a blue hat"], "each edit must be an object"),
+    ([{"text": "a blue hat"}], "each edit must be an object"),
+    ([{**EDIT, "cfgScale": "high"}], "cfgScale must be a number"),
+    ([{**EDIT, "cfgScale": True}], "cfgScale must be a number"),
+    ([{**EDIT, "cfgScale": 50}], "cfgScale must be between"),
+    ([{**EDIT, "seed": 1.5}], "seed must be an integer")
+])
+def test_invalid_edits_are_rejected(s3, titan, edits, error):
+    response = inpaint.handler(inpaint_event(edits), None)
+
+    assert response["statusCode"] == 400
+    assert error in json.loads(response["body"])["error"]
+    assert titan.requests == []
+
+
+def test_missing_source_image_is_not_found(s3, titan):
+    response = inpaint.handler(inpaint_event([EDIT], image_key="images/missing.png"), None)
+
+    assert response["statusCode"] == 404
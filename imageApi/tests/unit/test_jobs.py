@@ -0,0 +1,127 @@
+import json
+import time
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+import jobs
+
+
+def submit(**body):
+    response = jobs.submit_handler({"body": json.dumps({"description": "a red fox in the snow", **body})}, None)
+    return json.loads(response["body"])["jobId"]
+
+
+def sqs_event(job_id, receive_count=1):
+    message = {"job_id": job_id, "description": "a red fox in the snow", "generation_config": {"numberOfImages": 1}}
+    return {"Records": [{
+        "messageId": f"message-{job_id}",
+        "receiptHandle": f"receipt-{job_id}",
+        "body": json.dumps(message),
+        "attributes": {"ApproximateReceiveCount": str(receive_count)}
+    }]}
+
+
+class SentMessages(list):
+
+    def __init__(self):
+        super().__init__()
+        self.delays = {}
+
+    def send(self, message):
+        self.append(message)
+
+    def retry_later(self, receipt_handle, seconds):
+        self.delays[receipt_handle] = seconds
+
+
+@pytest.fixture
+def generate(monkeypatch):
+    """
+    Replace image generation with one that raises the given error, or succeeds when there is none.
+    Submitted jobs are held back from the in-process worker, the tests deliver them instead.
+    """
+    monkeypatch.setattr(jobs, "job_queue", SentMessages())
+
+    def set_outcome(error=None):
+        def generate_images(description, generation_config):
+            if error:
+                raise error
+            return ["generated/0.png"], False
+        monkeypatch.setattr(jobs.image, "generate_images", generate_images)
+    return set_outcome
+
+
+def throttled():
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+
+
+def test_successful_job_is_not_returned_to_the_queue(generate):
+    generate()
+    job_id = submit()
+
+    response = jobs.worker_handler(sqs_event(job_id), None)
+
+    assert response == {"batchItemFailures": []}
+    assert jobs.job_store.get(job_id)["status"] == jobs.SUCCEEDED
+
+
+@pytest.mark.parametrize("error", [throttled(), ReadTimeoutError(endpoint_url="https://bedrock")])
+def test_retryable_error_returns_the_message_and_keeps_the_job_pending(generate, error):
+    generate(error)
+    job_id = submit()
+
+    response = jobs.worker_handler(sqs_event(job_id, receive_count=1), None)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": f"message-{job_id}"}]}
+    assert jobs.job_store.get(job_id)["status"] == jobs.PENDING
+    # Back well before the queue's visibility timeout
+    assert 1 <= jobs.job_queue.delays[f"receipt-{job_id}"] <= jobs.RETRY_BASE_SECONDS * 2
+
+
+def test_retryable_error_on_the_last_receive_fails_the_job_and_dead_letters_it(generate):
+    generate(throttled())
+    job_id = submit()
+
+    response = jobs.worker_handler(sqs_event(job_id, receive_count=jobs.MAX_RECEIVE_COUNT), None)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": f"message-{job_id}"}]}
+    job = jobs.job_store.get(job_id)
+    assert job["status"] == jobs.FAILED
+    assert "slow down" in job["error"]
+
+
+def test_permanent_error_fails_the_job_without_a_retry(generate):
+    generate(ClientError({"Error": {"Code": "ValidationException", "Message": "bad prompt"}}, "InvokeModel"))
+    job_id = submit()
+
+    response = jobs.worker_handler(sqs_event(job_id), None)
+
+    assert response == {"batchItemFailures": []}
+    assert jobs.job_store.get(job_id)["status"] == jobs.FAILED
+
+
+@pytest.mark.parametrize("receive_count", [1, 2, 3, 10])
+def test_retry_delay_grows_with_the_receive_count_up_to_the_cap(receive_count):
+    delays = [jobs.retry_delay(receive_count) for _ in range(50)]
+
+    assert 1 <= min(delays)
+    assert max(delays) <= min(jobs.RETRY_MAX_SECONDS, jobs.RETRY_BASE_SECONDS * 2 ** receive_count)
+
+
+def test_job_left_running_past_the_timeout_is_reported_failed(generate):
+    job_id = submit()
+    jobs.job_store.update(job_id, status=jobs.RUNNING, started_at=int(time.time()) - jobs.RUNNING_TIMEOUT_SECONDS - 1)
+
+    response = jobs.status_handler({"pathParameters": {"job_id": job_id}}, None)
+
+    assert json.loads(response["body"]) == {"jobId": job_id, "status": jobs.FAILED, "error": "job timed out"}
+
+
+def test_recently_started_job_is_still_running(generate):
+    job_id = submit()
+    jobs.job_store.update(job_id, status=jobs.RUNNING, started_at=int(time.time()))
+
+    response = jobs.status_handler({"pathParameters": {"job_id": job_id}}, None)
+
+    assert json.loads(response["body"])["status"] == jobs.RUNNING
@@ -0,0 +1,97 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_PATH = ".embedding_cache.sqlite"
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model id, SHA-256 of the input bytes).
+    Vectors are stored as float32 blobs in SQLite; once maxEntries is exceeded the
+    least recently used rows are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, maxEntries=100_000):
+        self.path = path
+        self.maxEntries = maxEntries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model_id TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model_id, digest)
+            )"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._connection.commit()
+
+    def get(self, modelId: str, data: bytes):
+        digest = hashBytes(data)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT vector FROM embeddings WHERE model_id = ? AND digest = ?",
+                (modelId, digest)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._connection.execute(
+                "UPDATE embeddings SET last_used = ? WHERE model_id = ? AND digest = ?",
+                (time.time(), modelId, digest)
+            )
+            self._connection.commit()
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def put(self, modelId: str, data: bytes, embedding):
+        vector = np.asarray(embedding, dtype=np.float32).tobytes()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO embeddings (model_id, digest, vector, last_used) VALUES (?, ?, ?, ?)",
+                (modelId, hashBytes(data), vector, time.time())
+            )
+            self._evict()
+            self._connection.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM embeddings")
+            self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+    def _evict(self):
+        excess = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.maxEntries
+        if excess > 0:
+            self._connection.execute(
+                """DELETE FROM embeddings WHERE rowid IN (
+                    SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?
+                )""",
+                (excess,)
+            )
+
+
+def hashBytes(data: bytes):
+    return hashlib.sha256(data).hexdigest()
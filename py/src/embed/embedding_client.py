@@ -0,0 +1,95 @@
+import base64
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+AWS_REGION = "us-west-2"
+TEXT_MODEL_ID = "amazon.titan-embed-text-v1"
+IMAGE_MODEL_ID = "amazon.titan-embed-image-v1"
+
+THROTTLING_ERRORS = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+
+
+class EmbeddingClient:
+    """
+    Embeds many texts or images at once by fanning invoke_model calls out over a bounded
+    thread pool. Results keep the order of the inputs. When an EmbeddingCache is given,
+    inputs already embedded by the same model are served from it.
+
+    Throttled calls are retried here with jittered exponential backoff, so a client passed in
+    should not retry on its own (total_max_attempts=1).
+    """
+
+    def __init__(self, client=None, maxInFlight=8, maxRetries=6, baseDelay=0.25, maxDelay=8.0, cache=None):
+        self.cache = cache
+        self.maxInFlight = maxInFlight
+        self.maxRetries = maxRetries
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.client = client or boto3.client(
+            service_name="bedrock-runtime",
+            region_name=AWS_REGION,
+            # The backoff in _invoke is the only retry layer; botocore retrying as well would
+            # multiply the attempts and the time spent sleeping. Adaptive mode keeps its
+            # client-side rate limiter, shared by all the threads, which slows the whole pool
+            # under sustained throttling.
+            config=Config(
+                max_pool_connections=maxInFlight,
+                retries={"mode": "adaptive", "total_max_attempts": 1}
+            )
+        )
+
+    def getEmbeddings(self, texts, modelId=TEXT_MODEL_ID):
+        return self._map(lambda text: self.getEmbedding(text, modelId), texts)
+
+    def getImageEmbeddings(self, imagePaths, modelId=IMAGE_MODEL_ID):
+        return self._map(lambda imagePath: self.getImageEmbedding(imagePath, modelId), imagePaths)
+
+    def getEmbedding(self, text, modelId=TEXT_MODEL_ID):
+        return self._embed(text.encode("utf-8"), lambda data: {"inputText": text}, modelId)
+
+    def getImageEmbedding(self, imagePath, modelId=IMAGE_MODEL_ID):
+        with open(imagePath, "rb") as image_file:
+            image = image_file.read()
+        return self._embed(image, lambda data: {"inputImage": base64.b64encode(data).decode("utf-8")}, modelId)
+
+    def _map(self, embed, inputs):
+        inputs = list(inputs)
+        if len(inputs) <= 1:
+            return [embed(item) for item in inputs]
+        with ThreadPoolExecutor(max_workers=min(self.maxInFlight, len(inputs))) as executor:
+            return list(executor.map(embed, inputs))
+
+    def _embed(self, data, buildBody, modelId):
+        if self.cache is not None:
+            embedding = self.cache.get(modelId, data)
+            if embedding is not None:
+                return embedding
+        response_body = self._invoke(json.dumps(buildBody(data)), modelId)
+        embedding = response_body.get("embedding")
+        if self.cache is not None:
+            self.cache.put(modelId, data, embedding)
+        return embedding
+
+    def _invoke(self, body, modelId):
+        # Full-jitter exponential backoff on throttling
+        for attempt in range(self.maxRetries + 1):
+            try:
+                response = self.client.invoke_model(
+                    body=body,
+                    modelId=modelId,
+                    accept="application/json",
+                    contentType="application/json"
+                )
+                return json.loads(response.get("body").read())
+            except ClientError as error:
+                code = error.response.get("Error", {}).get("Code")
+                if code not in THROTTLING_ERRORS or attempt == self.maxRetries:
+                    raise
+                time.sleep(random.uniform(0, min(self.maxDelay, self.baseDelay * 2 ** attempt)))
+
@@ -0,0 +1,264 @@
+"""
+Compact similarity index for large embedding collections.
+
+Vectors are kept as int8 scalar-quantized or product-quantized codes and scored with asymmetric
+distance computation: the query stays float32 and only the stored side is approximate. The best
+candidates can then be reranked against the full-precision vectors, which live in a memory-mapped
+file so only the rows being reranked are read from disk. Vectors are normalized and encoded a
+block at a time, so building never holds a second float32 copy of the collection.
+
+    python quantized.py [--count 100000] [--dimensions 1536] [--subvectors 96]
+
+reports bytes per vector held in RAM, recall@k against exact search and query latency on random vectors.
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from similarity import SimilarityIndex, normalize, topK
+
+# Scoring decodes one block of codes to float32 at a time; blocks are sized to this many bytes
+SCORE_BLOCK_BYTES = 16 * 1024 * 1024
+# Encoding makes a few float32 temporaries per block, so its blocks are smaller
+ENCODE_BLOCK_ROWS = 4_096
+
+
+class ScalarQuantizer:
+    """
+    Symmetric per-dimension int8 quantization: code = round(value / scale), scale = max|value| / 127.
+    """
+
+    def __init__(self, sample):
+        maxAbs = np.abs(sample).max(axis=0)
+        maxAbs[maxAbs == 0] = 1.0
+        self.scale = (maxAbs / 127.0).astype(np.float32)
+        self.codeWidth = sample.shape[1]
+        self.codeType = np.int8
+
+    def nbytes(self):
+        return self.scale.nbytes
+
+    def encode(self, vectors):
+        return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+
+    def decode(self, codes):
+        return codes.astype(np.float32) * self.scale
+
+    def scores(self, queries, codes):
+        # query . (codes * scale) == (query * scale) . codes, so codes are never decoded
+        scaled = (queries * self.scale).T
+        blockRows = max(1, SCORE_BLOCK_BYTES // (4 * self.codeWidth))
+        return np.vstack([
+            codes[start:start + blockRows].astype(np.float32) @ scaled
+            for start in range(0, len(codes), blockRows)
+        ]).T if len(codes) else np.empty((len(queries), 0), dtype=np.float32)
+
+
+class ProductQuantizer:
+    """
+    Splits vectors into subvectors and replaces each with the id of its nearest of 256
+    k-means centroids, so a vector costs one byte per subvector.
+    """
+
+    def __init__(self, sample, subvectors=96, iterations=10, seed=0):
+        dimensions = sample.shape[1]
+        if dimensions % subvectors:
+            raise ValueError(f"{dimensions} dimensions cannot be split into {subvectors} subvectors")
+        self.subvectors = subvectors
+        self.width = dimensions // subvectors
+        self.codeWidth = subvectors
+        self.codeType = np.uint8
+        rng = np.random.default_rng(seed)
+        self.centroids = np.stack([
+            kMeans(self._part(sample, part), 256, iterations, rng)
+            for part in range(subvectors)
+        ])
+
+    def _part(self, vectors, part):
+        return vectors[:, part * self.width:(part + 1) * self.width]
+
+    def nbytes(self):
+        return self.centroids.nbytes
+
+    def encode(self, vectors):
+        codes = np.empty((len(vectors), self.subvectors), dtype=np.uint8)
+        for part in range(self.subvectors):
+            codes[:, part] = nearest(self._part(vectors, part), self.centroids[part])
+        return codes
+
+    def decode(self, codes):
+        return np.hstack([self.centroids[part][codes[:, part]] for part in range(self.subvectors)])
+
+    def scores(self, queries, codes):
+        # One lookup table per query: the dot product of each query subvector with every centroid
+        tables = np.einsum("qpw,pcw->qpc", queries.reshape(len(queries), self.subvectors, self.width), self.centroids)
+        scores = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for part in range(self.subvectors):
+            scores += tables[:, part, codes[:, part]]
+        return scores
+
+
+def kMeans(vectors, clusters, iterations, rng):
+    clusters = min(clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = nearest(vectors, centroids)
+        counts = np.bincount(assignment, minlength=clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    if clusters < 256:
+        centroids = np.vstack([centroids, np.zeros((256 - clusters, centroids.shape[1]), dtype=centroids.dtype)])
+    return centroids
+
+
+def nearest(vectors, centroids):
+    distances = (centroids ** 2).sum(axis=1) - 2 * vectors @ centroids.T
+    return distances.argmin(axis=1)
+
+
+class QuantizedIndex:
+    """
+    Same search interface as SimilarityIndex over int8 or product-quantized codes.
+
+    quantization: "int8" (4x smaller than float32) or "pq" (dimensions * 4 / subvectors times smaller).
+    fullPrecisionPath: file for the memory-mapped float32 vectors that reranking reads.
+    rerank: candidates per result rescored with full precision; 0 returns the approximate scores.
+        Reranking needs fullPrecisionPath, so it defaults to 4 with a path and 0 without one.
+
+    embeddings can itself be a memory-mapped array; it is read one block at a time.
+    """
+
+    def __init__(self, embeddings, items=None, quantization="int8", subvectors=96, rerank=None,
+                 fullPrecisionPath=None, trainingSize=20_000):
+        if not isinstance(embeddings, np.ndarray):
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+        embeddings = np.atleast_2d(embeddings)
+        self.items = list(range(len(embeddings))) if items is None else list(items)
+        if len(self.items) != len(embeddings):
+            raise ValueError("items and embeddings must have the same length")
+        if rerank is None:
+            rerank = 4 if fullPrecisionPath else 0
+        if rerank and not fullPrecisionPath:
+            # A float32 copy in RAM would take more memory than the unquantized SimilarityIndex
+            raise ValueError("rerank needs fullPrecisionPath for the memory-mapped float32 vectors")
+        self.rerank = rerank
+
+        sampleRows = np.sort(np.random.default_rng(0).permutation(len(embeddings))[:trainingSize])
+        sample = normalize(embeddings[sampleRows])
+        if quantization == "int8":
+            self.quantizer = ScalarQuantizer(sample)
+        elif quantization == "pq":
+            self.quantizer = ProductQuantizer(sample, subvectors)
+        else:
+            raise ValueError("quantization must be int8 or pq")
+        del sample
+
+        self.codes = np.empty((len(embeddings), self.quantizer.codeWidth), dtype=self.quantizer.codeType)
+        self.fullPrecision = None
+        if rerank:
+            self.fullPrecision = np.lib.format.open_memmap(
+                fullPrecisionPath, mode="w+", dtype=np.float32, shape=embeddings.shape
+            )
+        for start in range(0, len(embeddings), ENCODE_BLOCK_ROWS):
+            block = normalize(embeddings[start:start + ENCODE_BLOCK_ROWS])
+            self.codes[start:start + len(block)] = self.quantizer.encode(block)
+            if self.fullPrecision is not None:
+                self.fullPrecision[start:start + len(block)] = block
+        if self.fullPrecision is not None:
+            self.fullPrecision.flush()
+
+    def __len__(self):
+        return len(self.items)
+
+    def memoryBytes(self):
+        """
+        Bytes held in RAM by the codes and the quantizer. The memory-mapped full-precision vectors
+        are not counted: only the rows being reranked are paged in, and the kernel can drop them again.
+        """
+        return self.codes.nbytes + self.quantizer.nbytes()
+
+    def search(self, queries, k=5):
+        single = np.ndim(queries) == 1
+        queries = normalize(np.atleast_2d(queries))
+        candidates = k * self.rerank if self.fullPrecision is not None else k
+        top, topScores = topK(self.quantizer.scores(queries, self.codes), candidates)
+        results = []
+        for query, rowIndexes, rowScores in zip(queries, top, topScores):
+            if self.fullPrecision is not None and len(rowIndexes):
+                # Sorted indexes keep memory-mapped reads sequential
+                rowIndexes = np.sort(rowIndexes)
+                rowScores = self.fullPrecision[rowIndexes] @ query
+                best, _ = topK(rowScores[None, :], k)
+                rowIndexes, rowScores = rowIndexes[best[0]], rowScores[best[0]]
+            results.append([(self.items[index], float(score)) for index, score in zip(rowIndexes, rowScores)])
+        return results[0] if single else results
+
+
+def measureRecall(index, exact: SimilarityIndex, queries, k=10):
+    """
+    Fraction of the exact top-k items that the index also returns in its top k.
+    """
+    found = 0
+    for approximate, expected in zip(index.search(queries, k), exact.search(queries, k)):
+        found += len({item for item, _ in approximate} & {item for item, _ in expected})
+    return found / (k * len(queries))
+
+
+def traceBuild(build):
+    """
+    Call build under tracemalloc. Returns its result, the bytes it still holds and the peak while it ran.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        index = build()
+        held, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return index, held, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure memory and recall of the quantized index")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--subvectors", type=int, default=96)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    # Clustered data resembles real embeddings better than uniform noise
+    centers = rng.normal(size=(256, args.dimensions)).astype(np.float32)
+    embeddings = centers[rng.integers(0, 256, args.count)] + 0.5 * rng.normal(size=(args.count, args.dimensions)).astype(np.float32)
+    queries = embeddings[rng.choice(args.count, args.queries, replace=False)] + 0.1 * rng.normal(size=(args.queries, args.dimensions)).astype(np.float32)
+    exact, held, peak = traceBuild(lambda: SimilarityIndex(embeddings))
+
+    # heap/vector is everything the index still holds after building, measured with tracemalloc;
+    # build peak is the most the build allocated at once, on top of the input embeddings
+    print(f"{'index':<16}{'bytes/vector':>14}{'heap/vector':>13}{'build peak MB':>15}{'recall@' + str(args.k):>11}{'ms/query':>10}")
+    print(f"{'float32':<16}{exact.matrix.nbytes // args.count:>14}{held // args.count:>13}{peak / 2**20:>15.1f}{1.0:>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for quantization in ("int8", "pq"):
+            for rerank in (0, 4, 16):
+                path = os.path.join(directory, f"{quantization}-{rerank}.npy") if rerank else None
+                index, held, peak = traceBuild(lambda: QuantizedIndex(
+                    embeddings, quantization=quantization, subvectors=args.subvectors, rerank=rerank,
+                    fullPrecisionPath=path
+                ))
+                started = time.perf_counter()
+                index.search(queries, args.k)
+                elapsed = (time.perf_counter() - started) * 1000 / args.queries
+                recall = measureRecall(index, exact, queries, args.k)
+                name = f"{quantization} rerank={rerank}"
+                print(f"{name:<16}{index.memoryBytes() // args.count:>14}{held // args.count:>13}{peak / 2**20:>15.1f}"
+                      f"{recall:>11.3f}{elapsed:>10.2f}")
+                del index
@@ -1,31 +1,16 @@
-import boto3
-import json
+from embedding_cache import EmbeddingCache
+from embedding_client import EmbeddingClient
 
-client = boto3.client(service_name='bedrock-runtime', region_name='us-west-2')
+client = EmbeddingClient(cache=EmbeddingCache())
 
 fact = "The capital of Colombia is Bogota."
 animal = "cat"
 
-def get_embedding(text: str):
-    response = client.invoke_model(
-        body=json.dumps(
-            {
-                "inputText": text
-            }
-        ),
-        modelId="amazon.titan-embed-text-v1",
-        accept="application/json",
-        contentType="application/json"
-    )
-    return json.loads(response.get('body').read())
+factEmbedding, animalEmbedding = client.getEmbeddings([fact, animal])
 
-factResponse = get_embedding(fact)
-animalResponse = get_embedding(animal)
-
-print(factResponse.get('embedding'))
-print(animalResponse.get('embedding'))
+print(factEmbedding)
+print(animalEmbedding)
 
 # Same length for both embeddings independent of input text
-print("Fact embedding length:", len(factResponse.get('embedding')))
-print("Animal embedding length:", len(animalResponse.get('embedding')))
-
+print("Fact embedding length:", len(factEmbedding))
+print("Animal embedding length:", len(animalEmbedding))
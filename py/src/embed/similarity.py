@@ -1,8 +1,77 @@
-def dotProduct(embedding1: list, embedding2: list):
-    return sum([embedding1[i] * embedding2[i] for i in range(len(embedding1))])
-
-def cosineSimilarity(embedding1: list, embedding2: list):
-    dotProductValue = dotProduct(embedding1, embedding2)
-    magnitude1 = dotProduct(embedding1, embedding1) ** 0.5
-    magnitude2 = dotProduct(embedding2, embedding2) ** 0.5
-    return dotProductValue / (magnitude1 * magnitude2)
\ No newline at end of file
+import numpy as np
+
+
+def dotProduct(embedding1, embedding2):
+    return float(np.dot(np.asarray(embedding1, dtype=np.float32), np.asarray(embedding2, dtype=np.float32)))
+
+def cosineSimilarity(embedding1, embedding2):
+    vector1 = np.asarray(embedding1, dtype=np.float32)
+    vector2 = np.asarray(embedding2, dtype=np.float32)
+    return float(np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2)))
+
+def normalize(embeddings):
+    # Scale rows to unit length so cosine similarity becomes a plain dot product
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def topK(scores, k):
+    """
+    Row-wise indexes and values of the k largest scores, best first.
+    """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((len(scores), 0))
+        return empty.astype(np.int64), empty
+    # argpartition is O(n); only the k winners get fully sorted
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    topScores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-topScores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(topScores, order, axis=1)
+
+
+class SimilarityIndex:
+    """
+    Float32 matrix of pre-normalized embeddings scored in a single vectorized call.
+    """
+
+    def __init__(self, embeddings=None, items=None):
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.items = []
+        if embeddings is not None:
+            self.add(embeddings, items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, embeddings, items=None):
+        rows = normalize(np.atleast_2d(embeddings))
+        if items is None:
+            items = list(range(len(self.items), len(self.items) + len(rows)))
+        if len(items) != len(rows):
+            raise ValueError("items and embeddings must have the same length")
+        self.matrix = rows if len(self.items) == 0 else np.vstack([self.matrix, rows])
+        self.items.extend(items)
+
+    def scores(self, queries):
+        """
+        Cosine similarity of each query (one vector or a batch) against every stored row.
+        """
+        queries = normalize(np.atleast_2d(queries))
+        if len(self) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32)
+        return queries @ self.matrix.T
+
+    def search(self, queries, k=5):
+        """
+        Top-k (item, similarity) pairs per query, best first.
+        Returns a single list for one query and a list of lists for a batch.
+        """
+        single = np.ndim(queries) == 1
+        top, topScores = topK(self.scores(queries), k)
+        results = [
+            [(self.items[index], float(score)) for index, score in zip(rowIndexes, rowScores)]
+            for rowIndexes, rowScores in zip(top, topScores)
+        ]
+        return results[0] if single else results
@@ -1,8 +1,8 @@
-import boto3
-import json
+from embedding_cache import EmbeddingCache
+from embedding_client import EmbeddingClient
+from similarity import SimilarityIndex
 
-from similarity import cosineSimilarity
-client = boto3.client(service_name='bedrock-runtime', region_name='us-west-2')
+client = EmbeddingClient(cache=EmbeddingCache())
 
 facts = [
     "The first computer was invented in the 1940s.",
@@ -15,43 +15,13 @@ facts = [
 newFact = "I like to play computer games."
 question = "Who is the president of the United States?"
 
+factsIndex = SimilarityIndex(client.getEmbeddings(facts), facts)
 
-def getEmbedding(text: str):
-    response = client.invoke_model(
-        body=json.dumps(
-            {
-                "inputText": text
-            }
-        ),
-        modelId="amazon.titan-embed-text-v1",
-        accept="application/json",
-        contentType="application/json"
-    )
-    response_body = json.loads(response.get('body').read())
-    return response_body.get('embedding')
+newFactEmbedding = client.getEmbedding(newFact)
 
-factsWithEmbeddings = []
-
-for fact in facts:
-    factsWithEmbeddings.append({
-        "text": fact,
-        "embedding": getEmbedding(fact)
-    })
-
-newFactEmbedding = getEmbedding(newFact)
-
-similarities = []
-
-for fact in factsWithEmbeddings:
-    similarities.append({
-        "text": fact['text'],
-        "similarity": cosineSimilarity(fact['embedding'], newFactEmbedding)
-    })
+similarities = factsIndex.search(newFactEmbedding, k=len(facts))
 
 # Get the more related fact to newFact
 print(f"Similarities for fact: '{newFact}' with:")
-similarities.sort(key=lambda x: x['similarity'], reverse=True)
-for similarity in similarities:
-    print(f" '{similarity['text']}': {similarity['similarity']:.2f}")
-
-
+for text, similarity in similarities:
+    print(f" '{text}': {similarity:.2f}")
@@ -0,0 +1,454 @@
+"""
+Local stand-in for bedrock-runtime and bedrock-agent-runtime, for benchmarks and load tests
+without an AWS account.
+
+Implements InvokeModel (Titan text, embeddings and images, Nova, Claude), Converse,
+ConverseStream, Retrieve, RetrieveAndGenerate and RetrieveAndGenerateStream with the response
+shapes of the real services. Latency is drawn from a named profile, throttling can be injected,
+and embeddings are deterministic: the same text always gets the same vector and texts sharing
+words get similar vectors.
+
+    python server.py [--port 8765] [--profile realistic] [--throttle-rate 0.05] [--max-rps 50] [--seed 0]
+
+Point any boto3 client at it through the SDK's per-service endpoint variables:
+
+    export AWS_ENDPOINT_URL_BEDROCK_RUNTIME=http://localhost:8765
+    export AWS_ENDPOINT_URL_BEDROCK_AGENT_RUNTIME=http://localhost:8765
+    export AWS_ACCESS_KEY_ID=fake AWS_SECRET_ACCESS_KEY=fake
+
+GET /stats returns request, throttle and prompt cache counts per operation.
+"""
+
+import argparse
+import base64
+import functools
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+# Latencies in milliseconds as (median, p99) of a log-normal distribution
+PROFILES = {
+    "none": {},
+    "fast": {
+        "embed": (15, 40), "firstToken": (80, 200), "perToken": (3, 6), "image": (300, 800), "retrieve": (30, 80)
+    },
+    "realistic": {
+        "embed": (60, 250), "firstToken": (450, 1500), "perToken": (12, 30), "image": (4500, 9000), "retrieve": (150, 500)
+    },
+    "slow": {
+        "embed": (200, 900), "firstToken": (1500, 5000), "perToken": (35, 80), "image": (12000, 25000), "retrieve": (600, 2000)
+    }
+}
+WORDS = (
+    "the a story model answer river light summary point prince garden journey data vector "
+    "retrieval context quick cloud lambda question result token image dragon planet rose fox"
+).split()
+CHARS_PER_TOKEN = 4
+
+
+class FakeBedrock:
+    """
+    Response generation, latency sampling and throttling shared by all request threads.
+    """
+
+    def __init__(self, profile="realistic", throttle_rate=0.0, max_rps=None, output_tokens=120, seed=0):
+        self.profile = PROFILES[profile]
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.output_tokens = output_tokens
+        self.requests = Counter()
+        self.throttled = Counter()
+        self.cache_hits = 0
+        self._random = random.Random(seed)
+        self._cached_prefixes = set()
+        self._tokens = float(max_rps or 0)
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+
+    def latency(self, kind: str, count: int = 1):
+        """
+        Seconds to wait for `count` samples of the profile's `kind` latency.
+        """
+        if kind not in self.profile:
+            return 0.0
+        median, p99 = self.profile[kind]
+        sigma = (math.log(p99) - math.log(median)) / 2.326
+        with self._lock:
+            return sum(self._random.lognormvariate(math.log(median), sigma) for _ in range(count)) / 1000
+
+    def throttle(self, operation: str):
+        """
+        Count the request and decide whether it is rejected, by chance or by the request rate limit.
+        """
+        with self._lock:
+            self.requests[operation] += 1
+            throttled = self._random.random() < self.throttle_rate
+            if self.max_rps:
+                now = time.monotonic()
+                self._tokens = min(self.max_rps, self._tokens + (now - self._refilled) * self.max_rps)
+                self._refilled = now
+                if self._tokens < 1:
+                    throttled = True
+                elif not throttled:
+                    self._tokens -= 1
+            if throttled:
+                self.throttled[operation] += 1
+            return throttled
+
+    def cache_prefix(self, prefix: str):
+        """
+        True when the prompt prefix was seen before, as with a Bedrock prompt cache read.
+        """
+        digest = hashlib.sha256(prefix.encode("utf-8")).digest()
+        with self._lock:
+            if digest in self._cached_prefixes:
+                self.cache_hits += 1
+                return True
+            self._cached_prefixes.add(digest)
+            return False
+
+    def text(self, prompt: str, max_tokens: int):
+        words = min(max_tokens or self.output_tokens, self.output_tokens)
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+        return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+    def stats(self):
+        with self._lock:
+            return {"requests": dict(self.requests), "throttled": dict(self.throttled), "promptCacheHits": self.cache_hits}
+
+
+@functools.lru_cache(maxsize=50_000)
+def _word_vector(word: str, dimensions: int):
+    rng = random.Random(hashlib.sha256(word.encode("utf-8")).digest())
+    return [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+
+
+def embedding(text: str, dimensions: int):
+    """
+    Unit-length sum of per-word random vectors: deterministic, and similar for texts sharing words.
+    """
+    vector = [0.0] * dimensions
+    for word in re.findall(r"\w+", text.lower()) or [text]:
+        for i, value in enumerate(_word_vector(word, dimensions)):
+            vector[i] += value
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def png(width: int, height: int, seed: str):
+    """
+    Solid-colour RGB PNG of the requested size, coloured from the seed.
+    """
+    red, green, blue = hashlib.sha256(seed.encode("utf-8")).digest()[:3]
+    row = b"\x00" + bytes((red, green, blue)) * width
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+def event_message(event_type: str, payload: dict):
+    """
+    One application/vnd.amazon.eventstream message: prelude, CRCs, string headers and JSON payload.
+    """
+    headers = b""
+    for name, value in ((":event-type", event_type), (":content-type", "application/json"), (":message-type", "event")):
+        headers += struct.pack(">B", len(name)) + name.encode() + b"\x07" + struct.pack(">H", len(value)) + value.encode()
+    body = json.dumps(payload).encode("utf-8")
+    prelude = struct.pack(">II", 12 + len(headers) + len(body) + 4, len(headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + headers + body
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def tokens(text: str):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def message_text(messages, system=None):
+    """
+    (prompt text, prefix before the last cachePoint) of a Converse request.
+    """
+    parts, prefix = [], ""
+    for block in (system or []) + [block for message in messages for block in message.get("content", [])]:
+        if "cachePoint" in block:
+            prefix = "\n".join(parts)
+        elif "text" in block:
+            parts.append(block["text"])
+    return "\n".join(parts), prefix
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeBedrock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/stats":
+            return self.send_json(self.fake.stats())
+        self.send_error_json(404, "ResourceNotFoundException", f"no route for GET {self.path}")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request = json.loads(body or b"{}")
+        path = unquote(self.path.split("?")[0])
+        routes = (
+            (r"^/model/(.+)/invoke$", "InvokeModel", self.invoke_model),
+            (r"^/model/(.+)/converse$", "Converse", self.converse),
+            (r"^/model/(.+)/converse-stream$", "ConverseStream", self.converse_stream),
+            (r"^/knowledgebases/(.+)/retrieve$", "Retrieve", self.retrieve),
+            (r"^/retrieveAndGenerate()$", "RetrieveAndGenerate", self.retrieve_and_generate),
+            (r"^/retrieveAndGenerateStream()$", "RetrieveAndGenerateStream", self.retrieve_and_generate_stream)
+        )
+        for pattern, operation, route in routes:
+            match = re.match(pattern, path)
+            if match:
+                if self.fake.throttle(operation):
+                    return self.send_error_json(429, "ThrottlingException", "Too many requests, please wait before trying again.")
+                return route(match.group(1), request)
+        self.send_error_json(404, "ResourceNotFoundException", f"no route for POST {path}")
+
+    def invoke_model(self, model_id: str, request: dict):
+        if "titan-embed-text" in model_id:
+            dimensions = request.get("dimensions", 1536 if model_id.endswith("v1") else 1024)
+            time.sleep(self.fake.latency("embed"))
+            return self.send_json({
+                "embedding": embedding(request["inputText"], dimensions),
+                "inputTextTokenCount": tokens(request["inputText"])
+            })
+        if "titan-embed-image" in model_id:
+            dimensions = request.get("embeddingConfig", {}).get("outputEmbeddingLength", 1024)
+            source = request.get("inputText") or hashlib.sha256(request.get("inputImage", "").encode()).hexdigest()
+            time.sleep(self.fake.latency("embed"))
+            return self.send_json({
+                "embedding": embedding(source, dimensions),
+                "inputTextTokenCount": tokens(request.get("inputText", "")),
+                "message": None
+            })
+        if "image-generator" in model_id or "nova-canvas" in model_id:
+            config = request.get("imageGenerationConfig", {})
+            count = config.get("numberOfImages", 1)
+            seed = json.dumps(request, sort_keys=True)
+            time.sleep(self.fake.latency("image"))
+            images = [
+                base64.b64encode(png(config.get("width", 512), config.get("height", 512), f"{seed}{i}")).decode()
+                for i in range(count)
+            ]
+            return self.send_json({"images": images, "error": None})
+        if "titan-text" in model_id:
+            prompt = request["inputText"]
+            output = self.generate(prompt, request.get("textGenerationConfig", {}).get("maxTokenCount"))
+            return self.send_json({
+                "inputTextTokenCount": tokens(prompt),
+                "results": [{"tokenCount": tokens(output), "outputText": output, "completionReason": "FINISH"}]
+            })
+        if "anthropic" in model_id:
+            prompt = json.dumps(request.get("messages", []))
+            output = self.generate(prompt, request.get("max_tokens"))
+            return self.send_json({
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "text", "text": output}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": tokens(prompt), "output_tokens": tokens(output)}
+            })
+        if "nova" in model_id:
+            prompt, _ = message_text(request.get("messages", []), request.get("system"))
+            output = self.generate(prompt, request.get("inferenceConfig", {}).get("maxTokens"))
+            return self.send_json({
+                "output": {"message": {"role": "assistant", "content": [{"text": output}]}},
+                "stopReason": "end_turn",
+                "usage": {"inputTokens": tokens(prompt), "outputTokens": tokens(output), "totalTokens": tokens(prompt) + tokens(output)}
+            })
+        self.send_error_json(400, "ValidationException", f"The provided model identifier is invalid: {model_id}")
+
+    def converse(self, model_id: str, request: dict):
+        started = time.perf_counter()
+        prompt, usage, first_token = self.converse_usage(request)
+        output = self.fake.text(prompt, request.get("inferenceConfig", {}).get("maxTokens"))
+        time.sleep(first_token + self.fake.latency("perToken", tokens(output)))
+        usage.update(outputTokens=tokens(output), totalTokens=usage["inputTokens"] + tokens(output))
+        self.send_json({
+            "output": {"message": {"role": "assistant", "content": [{"text": output}]}},
+            "stopReason": "end_turn",
+            "usage": usage,
+            "metrics": {"latencyMs": round((time.perf_counter() - started) * 1000)}
+        })
+
+    def converse_stream(self, model_id: str, request: dict):
+        started = time.perf_counter()
+        prompt, usage, first_token = self.converse_usage(request)
+        output = self.fake.text(prompt, request.get("inferenceConfig", {}).get("maxTokens"))
+        self.start_stream()
+        self.write_chunk(event_message("messageStart", {"role": "assistant"}))
+        time.sleep(first_token)
+        for delta in self.deltas(output):
+            self.write_chunk(event_message("contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": delta}}))
+        self.write_chunk(event_message("contentBlockStop", {"contentBlockIndex": 0}))
+        self.write_chunk(event_message("messageStop", {"stopReason": "end_turn"}))
+        usage.update(outputTokens=tokens(output), totalTokens=usage["inputTokens"] + tokens(output))
+        self.write_chunk(event_message("metadata", {
+            "usage": usage,
+            "metrics": {"latencyMs": round((time.perf_counter() - started) * 1000)}
+        }))
+        self.end_stream()
+
+    def retrieve(self, knowledge_base_id: str, request: dict):
+        query = request["retrievalQuery"]["text"]
+        count = request.get("retrievalConfiguration", {}).get("vectorSearchConfiguration", {}).get("numberOfResults", 5)
+        time.sleep(self.fake.latency("embed") + self.fake.latency("retrieve"))
+        self.send_json({"retrievalResults": [
+            {**reference, "score": round(0.9 - i * 0.05, 4)}
+            for i, reference in enumerate(self.references(query, count))
+        ]})
+
+    def retrieve_and_generate(self, _, request: dict):
+        question = request["input"]["text"]
+        time.sleep(self.fake.latency("embed") + self.fake.latency("retrieve"))
+        output = self.generate(question, None)
+        self.send_json({
+            "output": {"text": output},
+            "citations": [self.citation(question, output)],
+            "sessionId": request.get("sessionId") or str(uuid.uuid4())
+        })
+
+    def retrieve_and_generate_stream(self, _, request: dict):
+        question = request["input"]["text"]
+        time.sleep(self.fake.latency("embed") + self.fake.latency("retrieve"))
+        output = self.fake.text(question, None)
+        self.start_stream({"x-amzn-bedrock-knowledge-base-session-id": request.get("sessionId") or str(uuid.uuid4())})
+        time.sleep(self.fake.latency("firstToken"))
+        for delta in self.deltas(output):
+            self.write_chunk(event_message("output", {"text": delta}))
+        self.write_chunk(event_message("citation", self.citation(question, output)))
+        self.end_stream()
+
+    def converse_usage(self, request: dict):
+        """
+        Prompt text, usage with prompt cache reads and writes, and the time to first token,
+        which only covers the part of the prompt that was not read from the cache.
+        """
+        prompt, prefix = message_text(request.get("messages", []), request.get("system"))
+        usage = {"inputTokens": tokens(prompt), "cacheReadInputTokens": 0, "cacheWriteInputTokens": 0}
+        first_token = self.fake.latency("firstToken")
+        if prefix:
+            cached = tokens(prefix)
+            if self.fake.cache_prefix(prefix):
+                usage["cacheReadInputTokens"] = cached
+                first_token *= max(0.1, 1 - cached / usage["inputTokens"])
+            else:
+                usage["cacheWriteInputTokens"] = cached
+            usage["inputTokens"] = tokens(prompt[len(prefix):])
+        return prompt, usage, first_token
+
+    def generate(self, prompt: str, max_tokens):
+        output = self.fake.text(prompt, max_tokens)
+        time.sleep(self.fake.latency("firstToken") + self.fake.latency("perToken", tokens(output)))
+        return output
+
+    def deltas(self, output: str):
+        words = output.split(" ")
+        for start in range(0, len(words), 4):
+            time.sleep(self.fake.latency("perToken", 4))
+            yield (" " if start else "") + " ".join(words[start:start + 4])
+
+    def references(self, query: str, count: int):
+        return [
+            {
+                "content": {"text": self.fake.text(f"{query}{i}", 60)},
+                "location": {"type": "S3", "s3Location": {"uri": f"s3://fake-knowledge-base/document-{i}.txt"}},
+                "metadata": {}
+            }
+            for i in range(count)
+        ]
+
+    def citation(self, question: str, output: str):
+        return {
+            "generatedResponsePart": {"textResponsePart": {"text": output, "span": {"start": 0, "end": len(output)}}},
+            "retrievedReferences": self.references(question, 1)
+        }
+
+    def send_json(self, payload: dict, status: int = 200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, error_type: str, message: str):
+        self.send_json({"message": message}, status, {"x-amzn-ErrorType": error_type})
+
+    def start_stream(self, headers=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("x-amzn-RequestId", str(uuid.uuid4()))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def serve(port=8765, **options):
+    """
+    Start the server on a background thread and return it; call shutdown() to stop.
+    """
+    handler = type("FakeBedrockHandler", (Handler,), {"fake": FakeBedrock(**options)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Bedrock runtime for local performance tests")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", choices=PROFILES, default="realistic")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests rejected with ThrottlingException")
+    parser.add_argument("--max-rps", type=float, help="requests per second above which requests are throttled")
+    parser.add_argument("--output-tokens", type=int, default=120, help="words generated per text response")
+    parser.add_argument("--seed", type=int, default=0, help="seed for latency and throttling draws")
+    args = parser.parse_args()
+
+    server = serve(
+        args.port,
+        profile=args.profile,
+        throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps,
+        output_tokens=args.output_tokens,
+        seed=args.seed
+    )
+    print(f"Fake Bedrock listening on http://127.0.0.1:{args.port} ({args.profile} profile)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -4,6 +4,9 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.vectorstores import FAISS
 import boto3
 
+from cached_embeddings import CachedBedrockEmbeddings
+from hybrid_retriever import HybridRetriever
+
 my_data = [
     "The weather is nice today.",
     "Last night's game ended in a tie.",
@@ -17,15 +20,17 @@ AWS_REGION = "us-west-2"
 
 bedrock = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION)
 model = Bedrock(model_id="amazon.titan-text-express-v1", client=bedrock)
-bedrock_embeddings = BedrockEmbeddings(model_id="amazon.titan-embed-text-v1", client=bedrock)
+bedrock_embeddings = CachedBedrockEmbeddings(
+    BedrockEmbeddings(model_id="amazon.titan-embed-text-v1", client=bedrock)
+)
 
 # Create vector store
 vector_store = FAISS.from_texts(my_data, bedrock_embeddings)
 
-# Create retriever
-retriever = vector_store.as_retriever(seach_kwargs={"k": 2})
+# Create retriever: BM25 and FAISS rankings fused with RRF, always returning k chunks
+retriever = HybridRetriever.from_vector_store(vector_store, k=2)
 
-results = retriever.get_relevant_documents(question)
+results = retriever.invoke(question)
 
 results_string = []
 for result in results:
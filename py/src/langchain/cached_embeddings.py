@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "embed"))
+from embedding_cache import EmbeddingCache
+
+
+class CachedBedrockEmbeddings(Embeddings):
+    """
+    Wraps BedrockEmbeddings so texts already embedded by the same model are read
+    from the on-disk EmbeddingCache instead of calling Bedrock again.
+    """
+
+    def __init__(self, embeddings, cache=None):
+        self.embeddings = embeddings
+        self.cache = cache or EmbeddingCache()
+
+    def embed_documents(self, texts):
+        modelId = self.embeddings.model_id
+        results = [self.cache.get(modelId, text.encode("utf-8")) for text in texts]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            new_embeddings = self.embeddings.embed_documents([texts[index] for index in missing])
+            for index, embedding in zip(missing, new_embeddings):
+                self.cache.put(modelId, texts[index].encode("utf-8"), embedding)
+                results[index] = embedding
+        return results
+
+    def embed_query(self, text):
+        modelId = self.embeddings.model_id
+        embedding = self.cache.get(modelId, text.encode("utf-8"))
+        if embedding is None:
+            embedding = self.embeddings.embed_query(text)
+            self.cache.put(modelId, text.encode("utf-8"), embedding)
+        return embedding
@@ -0,0 +1,133 @@
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any
+
+import numpy as np
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, Field
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Inverted index over document texts scored with Okapi BM25. Only documents that share a
+    term with the query are scored, so the lexical candidate set is the union of the posting lists.
+    """
+
+    def __init__(self, documents, k1: float = 1.5, b: float = 0.75):
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.lengths = []
+        for index, document in enumerate(self.documents):
+            terms = tokenize(document.page_content)
+            self.lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self.postings[term].append((index, frequency))
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def search(self, query: str, k: int):
+        """
+        Return up to k (document, score) pairs, best first.
+        """
+        return [(self.documents[index], score) for index, score in self.search_indices(query, k)]
+
+    def search_indices(self, query: str, k: int):
+        """
+        Return up to k (document index, score) pairs, best first.
+        """
+        scores = defaultdict(float)
+        count = len(self.documents)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.average_length)
+                scores[index] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Fuses BM25 and FAISS rankings with reciprocal rank fusion and returns a fixed k documents.
+    BM25 picks the top fetch_k candidates and only their vectors are scored against the query
+    embedding, so the dense side never searches the whole corpus. A document's fused score is
+    the sum of 1 / (rrf_k + rank) over the two rankings. Queries matching fewer than k documents
+    fall back to a dense search of the store, which fills the candidates up to k.
+
+    The BM25 index must hold the store's documents in FAISS index order, as from_vector_store builds it.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vector_store: Any
+    bm25: BM25Index
+    k: int = 2
+    fetch_k: int = 10
+    rrf_k: int = 60
+    timings: dict = Field(default_factory=dict)
+
+    @classmethod
+    def from_vector_store(cls, vector_store, **kwargs):
+        """
+        Build the BM25 index over the documents already held by a FAISS store.
+        """
+        documents = [
+            vector_store.docstore.search(vector_store.index_to_docstore_id[position])
+            for position in range(len(vector_store.index_to_docstore_id))
+        ]
+        return cls(vector_store=vector_store, bm25=BM25Index(documents), **kwargs)
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None):
+        started = time.perf_counter()
+        candidates = [index for index, _ in self.bm25.search_indices(query, self.fetch_k)]
+        lexical = [self.bm25.documents[index] for index in candidates]
+        lexical_done = time.perf_counter()
+        if len(candidates) >= self.k:
+            dense = [self.bm25.documents[candidates[offset]] for offset, _ in self.dense_ranking(query, candidates)]
+        else:
+            dense = [document for document, _ in self.vector_store.similarity_search_with_score(query, k=self.fetch_k)]
+        dense_done = time.perf_counter()
+
+        fused = {}
+        for ranking in (lexical, dense):
+            for rank, document in enumerate(ranking, start=1):
+                key = getattr(document, "id", None) or document.page_content
+                score, _ = fused.get(key, (0.0, document))
+                fused[key] = (score + 1.0 / (self.rrf_k + rank), document)
+        results = [document for score, document in sorted(fused.values(), key=lambda item: item[0], reverse=True)]
+
+        self.timings = {
+            "lexicalMs": round((lexical_done - started) * 1000, 2),
+            "denseMs": round((dense_done - lexical_done) * 1000, 2),
+            "candidates": len(fused)
+        }
+        return results[:self.k]
+
+    def dense_ranking(self, query: str, positions):
+        """
+        Rank the vectors at the given FAISS positions against the query, best first, as
+        (offset into positions, score) pairs. The query is embedded once and only these vectors are read.
+        """
+        query_vector = np.asarray(self.vector_store._embed_query(query), dtype=np.float32)
+        if self.vector_store._normalize_L2:
+            query_vector /= np.linalg.norm(query_vector) or 1.0
+        vectors = self.vector_store.index.reconstruct_batch(np.asarray(positions, dtype=np.int64))
+        if self.vector_store.distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT:
+            scores = vectors @ query_vector
+        else:
+            # Smaller distances are better, so they are negated to sort the same way
+            scores = -np.square(vectors - query_vector).sum(axis=1)
+        order = np.argsort(-scores, kind="stable")
+        return [(int(i), float(scores[i])) for i in order]
@@ -2,41 +2,157 @@ from langchain_aws import BedrockLLM as Bedrock
 from langchain_aws import BedrockEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import argparse
+import hashlib
+import json
+from pathlib import Path
 import boto3
 
+from cached_embeddings import CachedBedrockEmbeddings
+from hybrid_retriever import HybridRetriever
+
 AWS_REGION = "us-west-2"
+ASSETS_FOLDER = Path("assets")
+INDEX_FOLDER = Path("assets/pdf_index")
+MANIFEST_FILE = INDEX_FOLDER / "manifest.json"
+NUMBER_OF_RESULTS = 2
+CHUNK_SIZE = 200
+CHUNK_OVERLAP = 0
 
 bedrock = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION)
 model = Bedrock(model_id="amazon.titan-text-express-v1", client=bedrock)
-bedrock_embeddings = BedrockEmbeddings(model_id="amazon.titan-embed-text-v1", client=bedrock)
-
-question = "What themes does Gone with the Wind explore?"
-# Data ingestion
-loader = PyPDFLoader("assets/document.pdf")
-docs = loader.load()
-splitter = RecursiveCharacterTextSplitter(separators=[". \n"], chunk_size=200)
-splitted_docs = splitter.split_documents(docs)
-
-# Create vector store
-vector_store = FAISS.from_documents(splitted_docs, bedrock_embeddings)
-
-# Create retriever
-retriever = vector_store.as_retriever(search_kwargs={"k": 2})
-results = retriever.invoke(question)
-results_string = []
-for result in results:
-    results_string.append(result.page_content)
-
-# Build template
-template = ChatPromptTemplate.from_messages(
-    [
-        ("system", "Answer the users questions based on the following context: {context}"),
-        ("user", "{question}"),
-    ]
+bedrock_embeddings = CachedBedrockEmbeddings(
+    BedrockEmbeddings(model_id="amazon.titan-embed-text-v1", client=bedrock)
 )
 
-chain = template.pipe(model)
-response = chain.invoke({"question": question, "context": results_string})
-print(response)
+
+def file_hash(file_path: Path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest():
+    if MANIFEST_FILE.exists():
+        return json.loads(MANIFEST_FILE.read_text())
+    return {}
+
+
+def split_pdf(file_path: Path, chunking: dict):
+    # Only the ingestion path pays for the PDF and splitter imports
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    docs = PyPDFLoader(str(file_path)).load()
+    splitter = RecursiveCharacterTextSplitter(separators=[". \n"], **chunking)
+    return splitter.split_documents(docs)
+
+
+def ingest(chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+    """
+    Build or update the saved index. Only PDFs whose hash or chunking settings changed since
+    the last run are re-split and re-embedded; chunks of removed or changed PDFs are deleted.
+    Files with the same content share one set of chunks, and PDFs without text are skipped.
+    """
+    chunking = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+    manifest = load_manifest()
+    vector_store = load_index() if (INDEX_FOLDER / "index.faiss").exists() else None
+    current = {str(path): path for path in sorted(ASSETS_FOLDER.rglob("*.pdf"))}
+
+    for source in list(manifest):
+        if source not in current:
+            release(vector_store, manifest, source)
+            print(f"Removed: {source}")
+
+    for source, file_path in current.items():
+        sha256 = file_hash(file_path)
+        entry = manifest.get(source)
+        if entry and entry["sha256"] == sha256 and entry.get("chunking", chunking) == chunking:
+            print(f"Unchanged: {source}")
+            continue
+        if entry:
+            release(vector_store, manifest, source)
+        indexed = next(
+            (other for other in manifest.values() if other["sha256"] == sha256 and other.get("chunking") == chunking),
+            None
+        )
+        if indexed is not None:
+            manifest[source] = {"sha256": sha256, "chunking": chunking, "ids": indexed["ids"]}
+            print(f"Duplicate: {source} (same content as an indexed file)")
+            continue
+        chunks = split_pdf(file_path, chunking)
+        if not chunks:
+            # Recorded so the file is not split again until it changes
+            manifest[source] = {"sha256": sha256, "chunking": chunking, "ids": []}
+            print(f"Warning: skipped {source}, it has no text to index")
+            continue
+        # The chunking is part of the id so a re-split never collides with chunks still shared by a duplicate
+        ids = [f"{sha256}-{chunk_size}-{chunk_overlap}-{i}" for i in range(len(chunks))]
+        if vector_store is None:
+            vector_store = FAISS.from_documents(chunks, bedrock_embeddings, ids=ids)
+        else:
+            vector_store.add_documents(chunks, ids=ids)
+        manifest[source] = {"sha256": sha256, "chunking": chunking, "ids": ids}
+        print(f"Indexed: {source} ({len(chunks)} chunks)")
+
+    INDEX_FOLDER.mkdir(parents=True, exist_ok=True)
+    if vector_store is None:
+        print(f"No PDF text found in {ASSETS_FOLDER}")
+    else:
+        vector_store.save_local(str(INDEX_FOLDER))
+    MANIFEST_FILE.write_text(json.dumps(manifest, indent=2))
+
+
+def release(vector_store, manifest, source: str):
+    """
+    Drop source from the manifest and delete its chunks unless a duplicate file still uses them.
+    """
+    entry = manifest.pop(source)
+    still_used = any(other["ids"] == entry["ids"] for other in manifest.values())
+    if vector_store is not None and entry["ids"] and not still_used:
+        vector_store.delete(entry["ids"])
+
+
+def load_index():
+    # The index is built locally by ingest(), so loading its pickled docstore is trusted
+    return FAISS.load_local(str(INDEX_FOLDER), bedrock_embeddings, allow_dangerous_deserialization=True)
+
+
+def ask(question: str):
+    # Create retriever: BM25 and FAISS rankings fused with RRF
+    retriever = HybridRetriever.from_vector_store(load_index(), k=NUMBER_OF_RESULTS)
+    results = retriever.invoke(question)
+    results_string = []
+    for result in results:
+        results_string.append(result.page_content)
+
+    # Build template
+    template = ChatPromptTemplate.from_messages(
+        [
+            ("system", "Answer the users questions based on the following context: {context}"),
+            ("user", "{question}"),
+        ]
+    )
+
+    chain = template.pipe(model)
+    return chain.invoke({"question": question, "context": results_string})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ask questions about the PDFs in the assets folder")
+    parser.add_argument("--ingest", action="store_true", help="Build or update the saved FAISS index")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="characters per chunk")
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP, help="characters shared by neighbouring chunks")
+    parser.add_argument("question", nargs="?", default="What themes does Gone with the Wind explore?")
+
+    args = parser.parse_args()
+
+    if args.ingest or not MANIFEST_FILE.exists():
+        ingest(args.chunk_size, args.chunk_overlap)
+    if args.ingest:
+        parser.exit()
+    if not (INDEX_FOLDER / "index.faiss").exists():
+        parser.exit(1, f"No index to ask: add PDFs with text to {ASSETS_FOLDER} and run with --ingest\n")
+    print(ask(args.question))
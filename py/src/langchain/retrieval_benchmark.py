@@ -0,0 +1,68 @@
+"""
+Compare the hybrid BM25 + FAISS retriever against dense-only FAISS on the saved PDF index.
+
+    python retrieval_benchmark.py questions.json [-k 2] [--repeat 5]
+
+questions.json is a list of {"question": ..., "evidence": passage that answers it}. A question
+is recalled when one of the k returned chunks contains its evidence. Context tokens are what
+the chunks would add to the prompt, estimated at 4 characters per token.
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from hybrid_retriever import HybridRetriever
+from pdf_rag import NUMBER_OF_RESULTS, load_index
+
+CHARS_PER_TOKEN = 4
+
+
+def normalize(text: str):
+    return " ".join(text.lower().split())
+
+
+def evaluate(name: str, retrieve, questions, repeat: int):
+    latencies, recalled, context_tokens = [], 0, 0
+    for question in questions:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = retrieve(question["question"])
+            latencies.append((time.perf_counter() - started) * 1000)
+        evidence = normalize(question["evidence"])
+        recalled += any(evidence in normalize(result.page_content) for result in results)
+        context_tokens += sum(len(result.page_content) for result in results) // CHARS_PER_TOKEN
+    latencies.sort()
+    return {
+        "retriever": name,
+        "recall": round(recalled / len(questions), 3),
+        "p50Ms": round(statistics.median(latencies), 2),
+        "p95Ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        "contextTokens": round(context_tokens / len(questions))
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hybrid vs dense retrieval")
+    parser.add_argument("questions", help='JSON list of {"question": ..., "evidence": ...}')
+    parser.add_argument("-k", type=int, default=NUMBER_OF_RESULTS)
+    parser.add_argument("--fetch-k", type=int, default=10, help="candidates taken from each ranking")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per question")
+    args = parser.parse_args()
+
+    with open(args.questions) as f:
+        questions = json.load(f)
+    vector_store = load_index()
+    dense = vector_store.as_retriever(search_kwargs={"k": args.k})
+    hybrid = HybridRetriever.from_vector_store(vector_store, k=args.k, fetch_k=args.fetch_k)
+
+    # Query embeddings come from the on-disk cache after the first run, so the timed runs
+    # measure retrieval rather than Bedrock round trips
+    print(f"{'retriever':<10}{'recall@' + str(args.k):>10}{'p50 ms':>9}{'p95 ms':>9}{'ctx tokens':>12}")
+    for result in (
+        evaluate("dense", dense.invoke, questions, args.repeat),
+        evaluate("hybrid", hybrid.invoke, questions, args.repeat)
+    ):
+        print(f"{result['retriever']:<10}{result['recall']:>10}{result['p50Ms']:>9}{result['p95Ms']:>9}"
+              f"{result['contextTokens']:>12}")
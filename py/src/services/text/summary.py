@@ -1,8 +1,12 @@
 import boto3
 import json
 
+import response_cache
+
 AWS_REGION = "us-west-2"
 client = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION)
+model_id = "amazon.titan-text-express-v1"
+cache = response_cache.from_environment()
 
 def handler(event, context):
     body = json.loads(event["body"])
@@ -10,18 +14,26 @@ def handler(event, context):
     points = event["queryStringParameters"]["points"]
     if text and points:
         titan_config = get_titan_config(text, points)
-        response = client.invoke_model(
-            body=titan_config,
-            modelId="amazon.titan-text-express-v1",
-            accept="application/json",
-            contentType="application/json"
-        )
-        response_body = json.loads(response.get("body").read())
-        result = response_body.get("results")[0]
+        # The request body carries both the prompt and the generation config
+        key = response_cache.cache_key(model_id, titan_config, {})
+        bypass = response_cache.should_bypass(event)
+        summary = None if bypass else cache.get(key)
+        cache_status = "BYPASS" if bypass else ("HIT" if summary is not None else "MISS")
+        if summary is None:
+            response = client.invoke_model(
+                body=titan_config,
+                modelId=model_id,
+                accept="application/json",
+                contentType="application/json"
+            )
+            response_body = json.loads(response.get("body").read())
+            summary = response_body.get("results")[0].get("outputText")
+            cache.set(key, summary)
         return {
             "statusCode": 200,
+            "headers": {"X-Cache": cache_status},
             "body": json.dumps({
-                "summary": result.get("outputText")
+                "summary": summary
             })
         }
     return {
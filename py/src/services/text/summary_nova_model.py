@@ -1,9 +1,14 @@
 import boto3
 import json
 
+import prompt_cache
+import response_cache
+
 AWS_REGION = "us-west-2"
 client = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION)
 model_id = "us.amazon.nova-lite-v1:0"
+inference_config = {"maxTokens": 512, "temperature": 0, "topP": 1}
+cache = response_cache.from_environment()
 
 
 def handler(event, context):
@@ -11,14 +16,23 @@ def handler(event, context):
     text = body.get("text")
     points = event["queryStringParameters"]["points"]
     if text and points:
-        response = client.converse(
-            modelId=model_id,
-            messages=get_conversation(text, points),
-            inferenceConfig={"maxTokens": 512, "temperature": 0, "topP": 1}
-        )
-        result = response["output"]["message"]["content"][0]["text"]
+        messages = get_conversation(text, points)
+        key = response_cache.cache_key(model_id, json.dumps(messages), inference_config)
+        bypass = response_cache.should_bypass(event)
+        result = None if bypass else cache.get(key)
+        cache_status = "BYPASS" if bypass else ("HIT" if result is not None else "MISS")
+        if result is None:
+            response = client.converse(
+                modelId=model_id,
+                messages=messages,
+                inferenceConfig=inference_config
+            )
+            prompt_cache.log_usage(model_id, response)
+            result = response["output"]["message"]["content"][0]["text"]
+            cache.set(key, result)
         return {
             "statusCode": 200,
+            "headers": {"X-Cache": cache_status},
             "body": json.dumps({
                 "summary": result
             })
@@ -31,10 +45,12 @@ def handler(event, context):
     }
 
 def get_conversation(text: str, points: str):
-    user_message = f"""Text: {text} \n
-        From the text above, summarize the story in {points} points.\n
-    """
+    # The text is the stable prefix; only the requested number of points varies between calls
     return [{
         "role": "user",
-        "content": [{"text": user_message}],
+        "content": prompt_cache.content(
+            model_id,
+            f"Text: {text} \n",
+            f"From the text above, summarize the story in {points} points.\n"
+        ),
     }]
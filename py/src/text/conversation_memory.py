@@ -0,0 +1,152 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CHARS_PER_TOKEN = 4
+DEFAULT_PATH = ".chat_sessions.sqlite"
+SUMMARY_MODEL_ID = "amazon.titan-text-express-v1"
+
+
+def estimate_tokens(text: str):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class SessionStore:
+    """
+    Chat sessions in SQLite: the running summary and the turns not yet folded into it.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                turns TEXT NOT NULL,
+                updated REAL NOT NULL
+            )"""
+        )
+        self._connection.commit()
+
+    def load(self, session_id: str):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT summary, turns FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return "", []
+        return row[0], json.loads(row[1])
+
+    def save(self, session_id: str, summary: str, turns):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, summary, turns, updated) VALUES (?, ?, ?, ?)",
+                (session_id, summary, json.dumps(turns), time.time())
+            )
+            self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+
+class ConversationMemory:
+    """
+    Conversation history that fits a token budget. Recent turns are kept verbatim; once they
+    exceed their share of the budget the oldest ones are folded into a running summary by a
+    background thread, so building the prompt never waits on the model.
+    """
+
+    def __init__(self, client, session_id="default", store=None, token_budget=1000, summary_share=0.25):
+        self.client = client
+        self.session_id = session_id
+        self.store = store or SessionStore()
+        self.summary_budget = int(token_budget * summary_share)
+        self.window_budget = token_budget - self.summary_budget
+        self.summary, self.turns = self.store.load(session_id)
+        self.pending = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._compacting = False
+        self._fit_window()
+
+    def add(self, role: str, text: str):
+        with self._lock:
+            self.turns.append(f"{role}: {text}")
+        self._fit_window()
+        self._save()
+
+    def prompt(self):
+        """
+        The summary followed by the recent turns, within the token budget. Turns still being
+        summarized are left out until the summary covers them.
+        """
+        with self._lock:
+            summary, turns = self.summary, list(self.turns)
+        if summary:
+            return f"Summary of the earlier conversation: {summary}\n" + "\n".join(turns)
+        return "\n".join(turns)
+
+    def close(self):
+        """
+        Finish any compaction in progress and persist the session.
+        """
+        self._executor.shutdown(wait=True)
+        self._save()
+
+    def _fit_window(self):
+        with self._lock:
+            while len(self.turns) > 1 and sum(estimate_tokens(turn) for turn in self.turns) > self.window_budget:
+                self.pending.append(self.turns.pop(0))
+            if self.pending and not self._compacting:
+                self._compacting = True
+                self._executor.submit(self._compact)
+
+    def _compact(self):
+        while True:
+            with self._lock:
+                if not self.pending:
+                    self._compacting = False
+                    return
+                summary, turns = self.summary, list(self.pending)
+            try:
+                updated = self._summarize(summary, turns)
+            except Exception:
+                with self._lock:
+                    self._compacting = False
+                raise
+            with self._lock:
+                self.summary = updated
+                del self.pending[:len(turns)]
+            self._save()
+
+    def _summarize(self, summary: str, turns):
+        prompt = (
+            "Update the summary of a conversation between a user and a bot with the new turns. "
+            "Keep names, facts and open questions; drop small talk.\n"
+            f"Current summary: {summary or 'none'}\n"
+            "New turns:\n" + "\n".join(turns) + "\nUpdated summary:"
+        )
+        response = self.client.invoke_model(
+            body=json.dumps({
+                "inputText": prompt,
+                "textGenerationConfig": {
+                    "maxTokenCount": self.summary_budget,
+                    "stopSequences": [],
+                    "temperature": 0,
+                    "topP": 1
+                }
+            }),
+            modelId=SUMMARY_MODEL_ID,
+            accept="application/json",
+            contentType="application/json"
+        )
+        return json.loads(response.get("body").read()).get("results")[0].get("outputText").strip()
+
+    def _save(self):
+        with self._lock:
+            # Turns waiting for compaction are saved too, so a resumed session re-queues them
+            summary, turns = self.summary, self.pending + self.turns
+        self.store.save(self.session_id, summary, turns)
@@ -1,16 +1,21 @@
+import argparse
 import boto3
 import json
 
+from conversation_memory import ConversationMemory, SessionStore
+
 client = boto3.client(service_name='bedrock-runtime', region_name='us-west-2')
 
-history = []
+parser = argparse.ArgumentParser(description="Chat with Titan, keeping history within a token budget")
+parser.add_argument("--session", default="default", help="resume or start this chat session")
+parser.add_argument("--budget", type=int, default=1000, help="tokens of history sent with each turn")
+args = parser.parse_args()
 
-def get_history():
-    return "\n".join(history)
+memory = ConversationMemory(client, args.session, SessionStore(), token_budget=args.budget)
 
 def get_configuration(prompt: str):
     return json.dumps({
-        "inputText": get_history(),
+        "inputText": memory.prompt(),
         "textGenerationConfig": {
             "maxTokenCount": 4096,
             "stopSequences": [],
@@ -25,9 +30,9 @@ print(
 
 while True:
     user_input = input("User: ")
-    history.append("User: " + user_input)
     if user_input.lower() == "exit":
         break
+    memory.add("User", user_input)
     response = client.invoke_model(
         body = get_configuration(user_input),
         modelId="amazon.titan-text-express-v1",
@@ -37,4 +42,7 @@ while True:
     response_body = json.loads(response.get("body").read())
     output_text = response_body.get("results")[0].get("outputText").strip()
     print(output_text)
-    history.append("Bot: " + output_text)
\ No newline at end of file
+    print(f"({response_body.get('inputTextTokenCount')} input tokens)")
+    memory.add("Bot", output_text)
+
+memory.close()
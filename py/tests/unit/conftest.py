@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The scripts in src import their neighbours as top-level modules, as they do when run directly
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+for folder in ("fake_bedrock", "text", "langchain", "embed"):
+    sys.path.insert(0, os.path.join(SRC, folder))
@@ -0,0 +1,93 @@
+import io
+import json
+import threading
+
+import pytest
+
+from conversation_memory import ConversationMemory, SessionStore, estimate_tokens
+
+
+class SummaryStub:
+    """
+    invoke_model for the summary model; each call waits for release when one is given.
+    """
+
+    def __init__(self, release=None):
+        self.release = release
+        self.prompts = []
+
+    def invoke_model(self, **kwargs):
+        if self.release:
+            self.release.wait(5)
+        prompt = json.loads(kwargs["body"])["inputText"]
+        self.prompts.append(prompt)
+        text = f"summary {len(self.prompts)}"
+        return {"body": io.BytesIO(json.dumps({"results": [{"outputText": text}]}).encode("utf-8"))}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite"))
+    yield store
+    store.close()
+
+
+def turn(index):
+    return "x" * 36 + f" {index:02d}"
+
+
+def window_tokens(memory):
+    return sum(estimate_tokens(line) for line in memory.turns)
+
+
+def test_recent_turns_stay_within_their_budget(store):
+    memory = ConversationMemory(SummaryStub(), store=store, token_budget=100)
+    for index in range(10):
+        memory.add("User", turn(index))
+    memory.close()
+
+    assert window_tokens(memory) <= memory.window_budget
+    assert memory.turns[-1] == f"User: {turn(9)}"
+    assert memory.prompt().startswith("Summary of the earlier conversation: summary")
+
+
+def test_prompt_does_not_wait_for_the_summary(store):
+    release = threading.Event()
+    memory = ConversationMemory(SummaryStub(release), store=store, token_budget=100)
+    for index in range(10):
+        memory.add("User", turn(index))
+
+    # The summarizer is still blocked, so the prompt holds only the recent turns
+    prompt = memory.prompt()
+    release.set()
+    memory.close()
+
+    assert not prompt.startswith("Summary")
+    assert f"User: {turn(9)}" in prompt
+
+
+def test_older_turns_are_folded_into_the_summary_in_order(store):
+    client = SummaryStub()
+    memory = ConversationMemory(client, store=store, token_budget=100)
+    for index in range(10):
+        memory.add("User", turn(index))
+    memory.close()
+
+    summarized = "".join(client.prompts)
+    assert summarized.index(turn(0)) < summarized.index(turn(1))
+    assert memory.pending == []
+
+
+def test_session_is_resumed_from_the_store(store):
+    memory = ConversationMemory(SummaryStub(), session_id="alice", store=store, token_budget=100)
+    for index in range(10):
+        memory.add("User", turn(index))
+    memory.close()
+
+    resumed = ConversationMemory(SummaryStub(), session_id="alice", store=store, token_budget=100)
+    other = ConversationMemory(SummaryStub(), session_id="bob", store=store, token_budget=100)
+
+    assert resumed.prompt() == memory.prompt()
+    assert other.prompt() == ""
+    resumed.close()
+    other.close()
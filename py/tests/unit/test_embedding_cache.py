@@ -0,0 +1,85 @@
+import itertools
+
+import pytest
+
+import embedding_cache
+from embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Strictly increasing time, so least-recently-used order never depends on timer resolution.
+    """
+    ticks = itertools.count(1)
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), maxEntries=2)
+    yield cache
+    cache.close()
+
+
+def test_stored_vector_is_returned_for_the_same_model_and_input(cache):
+    cache.put("titan", b"hello", [0.5, 0.25])
+
+    assert cache.get("titan", b"hello") == [0.5, 0.25]
+    assert cache.get("cohere", b"hello") is None
+    assert cache.get("titan", b"hello!") is None
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2, "hitRate": 1 / 3}
+
+
+def test_entries_survive_reopening_the_file(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    first = EmbeddingCache(path)
+    first.put("titan", b"hello", [1.0])
+    first.close()
+
+    reopened = EmbeddingCache(path)
+
+    assert reopened.get("titan", b"hello") == [1.0]
+    reopened.close()
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.put("titan", b"a", [1.0])
+    cache.put("titan", b"b", [2.0])
+    cache.get("titan", b"a")
+
+    cache.put("titan", b"c", [3.0])
+
+    assert cache.get("titan", b"b") is None
+    assert cache.get("titan", b"a") == [1.0]
+    assert cache.get("titan", b"c") == [3.0]
+
+
+class CountingEmbeddings:
+    model_id = "fake-embeddings"
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded += texts
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return [float(len(text))]
+
+
+def test_langchain_wrapper_only_embeds_uncached_texts(tmp_path, clock):
+    pytest.importorskip("langchain_core")
+    from cached_embeddings import CachedBedrockEmbeddings
+
+    inner = CountingEmbeddings()
+    embeddings = CachedBedrockEmbeddings(inner, cache=EmbeddingCache(str(tmp_path / "cache.sqlite")))
+
+    embeddings.embed_documents(["one", "three"])
+    vectors = embeddings.embed_documents(["three", "seven", "one"])
+    embeddings.embed_query("seven")
+
+    assert vectors == [[5.0], [5.0], [3.0]]
+    assert inner.embedded == ["one", "three", "seven"]
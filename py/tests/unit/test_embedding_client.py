@@ -0,0 +1,74 @@
+import io
+import json
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from embedding_client import EmbeddingClient, TEXT_MODEL_ID
+
+
+def invoke_response(embedding):
+    data = json.dumps({"embedding": embedding}).encode("utf-8")
+    return {"body": StreamingBody(io.BytesIO(data), len(data)), "contentType": "application/json"}
+
+
+def invoke_params(text):
+    return {
+        "body": json.dumps({"inputText": text}),
+        "modelId": TEXT_MODEL_ID,
+        "accept": "application/json",
+        "contentType": "application/json"
+    }
+
+
+@pytest.fixture
+def runtime():
+    client = boto3.client("bedrock-runtime", region_name="us-west-2")
+    with Stubber(client) as stubber:
+        yield client, stubber
+        stubber.assert_no_pending_responses()
+
+
+def test_embeddings_keep_input_order(runtime):
+    client, stubber = runtime
+    for index, text in enumerate(["a", "b", "c"]):
+        stubber.add_response("invoke_model", invoke_response([float(index)]), invoke_params(text))
+
+    embeddings = EmbeddingClient(client, maxInFlight=1).getEmbeddings(["a", "b", "c"])
+
+    assert embeddings == [[0.0], [1.0], [2.0]]
+
+
+def test_throttled_call_is_retried(runtime):
+    client, stubber = runtime
+    stubber.add_client_error("invoke_model", "ThrottlingException", http_status_code=429)
+    stubber.add_response("invoke_model", invoke_response([0.5]), invoke_params("a"))
+
+    assert EmbeddingClient(client, baseDelay=0).getEmbedding("a") == [0.5]
+
+
+def test_retries_stop_after_max_retries(runtime):
+    client, stubber = runtime
+    for _ in range(3):
+        stubber.add_client_error("invoke_model", "ThrottlingException", http_status_code=429)
+
+    with pytest.raises(ClientError):
+        EmbeddingClient(client, maxRetries=2, baseDelay=0).getEmbedding("a")
+
+
+def test_other_errors_are_not_retried(runtime):
+    client, stubber = runtime
+    stubber.add_client_error("invoke_model", "ValidationException", http_status_code=400)
+
+    with pytest.raises(ClientError):
+        EmbeddingClient(client, baseDelay=0).getEmbedding("a")
+
+
+def test_default_client_does_not_retry_on_its_own():
+    client = EmbeddingClient()
+
+    assert client.client.meta.config.retries["total_max_attempts"] == 1
+    assert client.client.meta.config.retries["mode"] == "adaptive"
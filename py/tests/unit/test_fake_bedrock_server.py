@@ -0,0 +1,112 @@
+import json
+import math
+
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+import server
+from server import FakeBedrock, embedding
+
+
+def runtime_client(fake):
+    """
+    bedrock-runtime client pointed at a running fake server, without retries.
+    """
+    return boto3.client(
+        "bedrock-runtime",
+        region_name="us-east-1",
+        endpoint_url=f"http://127.0.0.1:{fake.server_port}",
+        aws_access_key_id="fake",
+        aws_secret_access_key="fake",
+        config=Config(retries={"max_attempts": 1})
+    )
+
+
+@pytest.fixture
+def bedrock():
+    fake = server.serve(0, profile="none", output_tokens=20)
+    yield fake, runtime_client(fake)
+    fake.shutdown()
+    fake.server_close()
+
+
+def cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_embeddings_are_deterministic_unit_vectors():
+    vector = embedding("The fox crossed the river", 64)
+
+    assert vector == embedding("The fox crossed the river", 64)
+    assert math.sqrt(sum(value * value for value in vector)) == pytest.approx(1.0)
+
+
+def test_texts_sharing_words_get_similar_embeddings():
+    query = embedding("the fox crossed the river", 256)
+
+    assert cosine(query, embedding("a fox near the river", 256)) > cosine(query, embedding("planet cloud lambda", 256))
+
+
+def test_every_request_is_throttled_at_rate_one():
+    fake = FakeBedrock(profile="none", throttle_rate=1.0)
+
+    assert all(fake.throttle("Converse") for _ in range(5))
+    assert fake.stats()["throttled"] == {"Converse": 5}
+
+
+def test_request_rate_limit_throttles_a_burst():
+    fake = FakeBedrock(profile="none", max_rps=2)
+
+    throttled = [fake.throttle("InvokeModel") for _ in range(4)]
+
+    assert throttled == [False, False, True, True]
+
+
+def test_converse_reports_prompt_cache_reads_on_the_second_call(bedrock):
+    fake, client = bedrock
+    messages = [{"role": "user", "content": [{"text": "x" * 4000}, {"cachePoint": {"type": "default"}}, {"text": "Summarize."}]}]
+
+    first = client.converse(modelId="us.amazon.nova-lite-v1:0", messages=messages)
+    second = client.converse(modelId="us.amazon.nova-lite-v1:0", messages=messages)
+
+    assert first["output"]["message"]["content"][0]["text"] == second["output"]["message"]["content"][0]["text"]
+    assert first["usage"]["cacheWriteInputTokens"] == 1001
+    assert second["usage"]["cacheReadInputTokens"] == 1001
+    assert fake.RequestHandlerClass.fake.stats() == {"requests": {"Converse": 2}, "throttled": {}, "promptCacheHits": 1}
+
+
+def test_titan_embedding_round_trip(bedrock):
+    _, client = bedrock
+
+    response = client.invoke_model(
+        modelId="amazon.titan-embed-text-v2:0",
+        body=json.dumps({"inputText": "the fox", "dimensions": 256})
+    )
+
+    assert json.loads(response["body"].read())["embedding"] == embedding("the fox", 256)
+
+
+def test_converse_stream_yields_the_generated_text(bedrock):
+    _, client = bedrock
+    messages = [{"role": "user", "content": [{"text": "Tell a story."}]}]
+
+    expected = client.converse(modelId="us.amazon.nova-lite-v1:0", messages=messages)
+    stream = client.converse_stream(modelId="us.amazon.nova-lite-v1:0", messages=messages)["stream"]
+    text = "".join(event["contentBlockDelta"]["delta"]["text"] for event in stream if "contentBlockDelta" in event)
+
+    assert text == expected["output"]["message"]["content"][0]["text"]
+
+
+def test_throttled_request_raises_throttling_exception():
+    fake = server.serve(0, profile="none", throttle_rate=1.0)
+    client = runtime_client(fake)
+    try:
+        with pytest.raises(ClientError) as error:
+            client.converse(modelId="us.amazon.nova-lite-v1:0", messages=[{"role": "user", "content": [{"text": "hi"}]}])
+    finally:
+        fake.shutdown()
+        fake.server_close()
+
+    assert error.value.response["Error"]["Code"] == "ThrottlingException"
@@ -0,0 +1,87 @@
+import pytest
+
+pytest.importorskip("langchain_community.vectorstores")
+from langchain_community.vectorstores import FAISS  # noqa: E402
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+from langchain_core.retrievers import BaseRetriever  # noqa: E402
+
+from hybrid_retriever import BM25Index, HybridRetriever  # noqa: E402
+
+TEXTS = [
+    "Scarlett O'Hara returns to Tara after the war",
+    "Rhett Butler leaves Atlanta",
+    "Tara is the O'Hara family plantation",
+    "Melanie Wilkes nurses the wounded soldiers",
+    "Ashley Wilkes marries Melanie",
+    "The burning of Atlanta lights the night sky"
+]
+
+
+@pytest.fixture
+def vector_store():
+    documents = [Document(page_content=text) for text in TEXTS]
+    return FAISS.from_documents(documents, DeterministicFakeEmbedding(size=16), ids=[str(i) for i in range(len(TEXTS))])
+
+
+def test_is_a_langchain_retriever(vector_store):
+    retriever = HybridRetriever.from_vector_store(vector_store, k=2)
+
+    assert isinstance(retriever, BaseRetriever)
+    assert len(retriever.invoke("Tara")) == 2
+    assert len(retriever.batch(["Tara", "Atlanta"])) == 2
+
+
+def test_bm25_ranks_documents_sharing_query_terms():
+    index = BM25Index([Document(page_content=text) for text in TEXTS])
+
+    results = index.search("O'Hara plantation", 2)
+
+    assert results[0][0].page_content == "Tara is the O'Hara family plantation"
+    assert results[1][0].page_content == "Scarlett O'Hara returns to Tara after the war"
+
+
+def test_dense_side_only_scores_the_bm25_candidates(vector_store, monkeypatch):
+    retriever = HybridRetriever.from_vector_store(vector_store, k=3)
+    monkeypatch.setattr(type(vector_store), "similarity_search_with_score", pytest.fail)
+    searched = []
+    index = vector_store.index
+    monkeypatch.setattr(vector_store, "index", type("Index", (), {
+        "search": pytest.fail,
+        "reconstruct_batch": lambda self, positions: searched.append(list(positions)) or index.reconstruct_batch(positions)
+    })())
+
+    results = retriever.invoke("Wilkes Atlanta")
+
+    assert sorted(searched[0]) == [1, 3, 4, 5]
+    assert retriever.timings["candidates"] == 4
+    assert {result.page_content for result in results} <= {TEXTS[i] for i in (1, 3, 4, 5)}
+
+
+def test_dense_ranking_matches_faiss_on_the_candidates(vector_store):
+    retriever = HybridRetriever.from_vector_store(vector_store)
+    candidates = [0, 2, 5]
+    query = "Tara Atlanta"
+
+    ranking = [candidates[offset] for offset, _ in retriever.dense_ranking(query, candidates)]
+
+    full = vector_store.similarity_search_with_score(query, k=len(TEXTS))
+    expected = [TEXTS.index(document.page_content) for document, _ in full]
+    assert ranking == [position for position in expected if position in candidates]
+
+
+def test_query_without_indexed_terms_falls_back_to_dense_search(vector_store):
+    retriever = HybridRetriever.from_vector_store(vector_store, k=2)
+
+    results = retriever.invoke("Gone")
+
+    assert len(results) == 2
+
+
+def test_query_matching_fewer_than_k_documents_is_filled_from_the_dense_search(vector_store):
+    retriever = HybridRetriever.from_vector_store(vector_store, k=3)
+
+    results = retriever.invoke("Rhett")
+
+    assert len(results) == 3
+    assert results[0].page_content == "Rhett Butler leaves Atlanta"
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+pytest.importorskip("langchain_community.vectorstores")
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.embeddings import DeterministicFakeEmbedding  # noqa: E402
+
+import pdf_rag  # noqa: E402
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_rag, "ASSETS_FOLDER", tmp_path)
+    monkeypatch.setattr(pdf_rag, "INDEX_FOLDER", tmp_path / "pdf_index")
+    monkeypatch.setattr(pdf_rag, "MANIFEST_FILE", tmp_path / "pdf_index" / "manifest.json")
+    monkeypatch.setattr(pdf_rag, "bedrock_embeddings", DeterministicFakeEmbedding(size=8))
+    # The fake PDFs hold plain text, one chunk per line
+    monkeypatch.setattr(pdf_rag, "split_pdf", lambda path, chunking: [
+        Document(page_content=line, metadata={"source": str(path)})
+        for line in path.read_text().splitlines() if line
+    ])
+    return tmp_path
+
+
+def manifest(assets):
+    return json.loads((assets / "pdf_index" / "manifest.json").read_text())
+
+
+def test_identical_files_are_indexed_once(assets):
+    (assets / "a.pdf").write_text("first chunk\nsecond chunk\n")
+    (assets / "b.pdf").write_text("first chunk\nsecond chunk\n")
+
+    pdf_rag.ingest()
+    pdf_rag.ingest()
+
+    entries = manifest(assets)
+    assert entries[str(assets / "a.pdf")]["ids"] == entries[str(assets / "b.pdf")]["ids"]
+    assert len(pdf_rag.load_index().index_to_docstore_id) == 2
+
+
+def test_removing_one_duplicate_keeps_the_shared_chunks(assets):
+    (assets / "a.pdf").write_text("shared chunk\n")
+    (assets / "b.pdf").write_text("shared chunk\n")
+    pdf_rag.ingest()
+
+    (assets / "a.pdf").unlink()
+    pdf_rag.ingest()
+
+    assert list(manifest(assets)) == [str(assets / "b.pdf")]
+    assert len(pdf_rag.load_index().index_to_docstore_id) == 1
+
+
+def test_pdf_without_text_is_skipped(assets, capsys):
+    (assets / "empty.pdf").write_text("")
+    (assets / "a.pdf").write_text("some text\n")
+
+    pdf_rag.ingest()
+
+    assert "skipped" in capsys.readouterr().out
+    assert manifest(assets)[str(assets / "empty.pdf")]["ids"] == []
+    assert len(pdf_rag.load_index().index_to_docstore_id) == 1
+
+
+def test_only_empty_pdfs_build_no_index(assets):
+    (assets / "empty.pdf").write_text("")
+
+    pdf_rag.ingest()
+
+    assert not (assets / "pdf_index" / "index.faiss").exists()
+
+
+def test_empty_pdfs_are_recorded_so_they_are_not_split_again(assets, monkeypatch, capsys):
+    (assets / "empty.pdf").write_text("")
+    pdf_rag.ingest()
+    monkeypatch.setattr(pdf_rag, "split_pdf", pytest.fail)
+
+    pdf_rag.ingest()
+
+    assert manifest(assets)[str(assets / "empty.pdf")]["ids"] == []
+    assert "Unchanged" in capsys.readouterr().out
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import quantized
+from quantized import QuantizedIndex
+from similarity import SimilarityIndex, normalize
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(3)
+    centers = rng.normal(size=(16, 64)).astype(np.float32)
+    return centers[rng.integers(0, 16, 1000)] + 0.3 * rng.normal(size=(1000, 64)).astype(np.float32)
+
+
+def test_default_index_holds_only_the_codes_in_memory(embeddings):
+    index = QuantizedIndex(embeddings)
+
+    assert index.rerank == 0
+    assert index.fullPrecision is None
+    assert index.memoryBytes() < SimilarityIndex(embeddings).matrix.nbytes / 3
+
+
+def test_rerank_without_a_file_is_rejected(embeddings):
+    with pytest.raises(ValueError, match="fullPrecisionPath"):
+        QuantizedIndex(embeddings, rerank=4)
+
+
+def test_reranked_vectors_are_memory_mapped(embeddings, tmp_path):
+    index = QuantizedIndex(embeddings, fullPrecisionPath=tmp_path / "vectors.npy")
+    exact = SimilarityIndex(embeddings)
+    queries = embeddings[:20]
+
+    assert index.rerank == 4
+    assert isinstance(index.fullPrecision, np.memmap)
+    np.testing.assert_allclose(np.load(tmp_path / "vectors.npy"), normalize(embeddings), atol=1e-6)
+    assert [row[0][0] for row in index.search(queries, 1)] == [row[0][0] for row in exact.search(queries, 1)]
+
+
+@pytest.mark.parametrize("quantization", ["int8", "pq"])
+def test_encoding_in_blocks_matches_encoding_everything_at_once(embeddings, monkeypatch, quantization):
+    whole = QuantizedIndex(embeddings, quantization=quantization, subvectors=8)
+    monkeypatch.setattr(quantized, "ENCODE_BLOCK_ROWS", 64)
+
+    blocked = QuantizedIndex(embeddings, quantization=quantization, subvectors=8)
+
+    np.testing.assert_array_equal(blocked.codes, whole.codes)
+
+
+def test_memory_mapped_embeddings_are_accepted(embeddings, tmp_path):
+    np.save(tmp_path / "embeddings.npy", embeddings)
+    mapped = np.load(tmp_path / "embeddings.npy", mmap_mode="r")
+
+    index = QuantizedIndex(mapped, items=[f"doc-{i}" for i in range(len(mapped))])
+
+    assert index.search(embeddings[7], 1)[0][0] == "doc-7"
+
+
+def test_scoring_in_blocks_matches_decoding_everything(embeddings, monkeypatch):
+    index = QuantizedIndex(embeddings)
+    queries = normalize(embeddings[:5])
+    whole = queries @ index.quantizer.decode(index.codes).T
+    # 64 dimensions of float32 per row: 10 rows per block
+    monkeypatch.setattr(quantized, "SCORE_BLOCK_BYTES", 64 * 4 * 10)
+
+    np.testing.assert_allclose(index.quantizer.scores(queries, index.codes), whole, rtol=1e-5, atol=1e-5)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from similarity import SimilarityIndex, cosineSimilarity, dotProduct, normalize, topK
+
+
+def test_cosine_similarity_ignores_length():
+    assert cosineSimilarity([1, 0], [5, 0]) == pytest.approx(1.0)
+    assert cosineSimilarity([1, 0], [0, 2]) == pytest.approx(0.0)
+    assert dotProduct([1, 2], [3, 4]) == pytest.approx(11.0)
+
+
+def test_normalize_leaves_zero_vectors_at_zero():
+    rows = normalize([[3, 4], [0, 0]])
+
+    np.testing.assert_allclose(rows, [[0.6, 0.8], [0.0, 0.0]])
+    assert rows.dtype == np.float32
+
+
+def test_top_k_is_sorted_and_clamped_to_the_row_length():
+    scores = np.array([[0.1, 0.9, 0.5], [0.7, 0.2, 0.3]])
+
+    top, topScores = topK(scores, 5)
+
+    np.testing.assert_array_equal(top, [[1, 2, 0], [0, 2, 1]])
+    np.testing.assert_allclose(topScores, [[0.9, 0.5, 0.1], [0.7, 0.3, 0.2]])
+
+
+def test_search_matches_the_pairwise_cosine_ranking():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(50, 16))
+    query = rng.normal(size=16)
+    index = SimilarityIndex(embeddings, items=[f"doc-{i}" for i in range(50)])
+
+    results = index.search(query, k=3)
+
+    expected = sorted(range(50), key=lambda i: cosineSimilarity(query, embeddings[i]), reverse=True)[:3]
+    assert [item for item, _ in results] == [f"doc-{i}" for i in expected]
+    assert results[0][1] == pytest.approx(cosineSimilarity(query, embeddings[expected[0]]), abs=1e-5)
+
+
+def test_batch_search_returns_one_list_per_query():
+    index = SimilarityIndex([[1, 0], [0, 1]], items=["x", "y"])
+
+    results = index.search([[1, 0.1], [0.1, 1]], k=1)
+
+    assert [[item for item, _ in row] for row in results] == [["x"], ["y"]]
+
+
+def test_added_rows_continue_the_item_numbering():
+    index = SimilarityIndex([[1, 0]])
+    index.add([[0, 1], [1, 1]])
+
+    assert len(index) == 3
+    assert index.search([0, 1], k=1)[0][0] == 1
+
+
+def test_items_must_match_the_embeddings():
+    with pytest.raises(ValueError):
+        SimilarityIndex([[1, 0], [0, 1]], items=["only one"])
+
+
+def test_empty_index_returns_no_results():
+    index = SimilarityIndex()
+
+    assert index.search([1, 0], k=3) == []
+    assert index.search([[1, 0], [0, 1]], k=3) == [[], []]
@@ -0,0 +1,129 @@
+"""
+Offline benchmark of the chunking strategies on a corpus and a labelled question set.
+
+For every configuration it builds a local vector store and reports chunk count, embedding calls,
+embedded tokens, index size and recall@k. A question counts as recalled when one of the top k
+retrieved texts contains its evidence passage, so labels do not depend on chunk boundaries.
+
+    python benchmarks/chunking_benchmark.py --questions benchmarks/chunking_questions.json \
+        --config fixed --config fixed:max_tokens=256,overlap_percentage=10 --config semantic
+
+--offline replaces Titan with a hashed bag-of-words embedding, which needs no AWS access and
+keeps the comparison between strategies meaningful, though not the absolute recall.
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+
+# The Lambda modules import their neighbours as top-level modules, as in the deployed asset
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services"))
+import bootstrap  # noqa: E402
+import chunking  # noqa: E402
+import local_store  # noqa: E402
+
+np = bootstrap.lazy_import("numpy")
+
+OFFLINE_DIMENSIONS = 512
+
+
+class CountingEmbedder:
+
+    def __init__(self, embed_text):
+        self.embed_text = embed_text
+        self.calls = 0
+        self.tokens = 0
+
+    def __call__(self, text: str):
+        self.calls += 1
+        self.tokens += len(text) // chunking.CHARS_PER_TOKEN
+        return self.embed_text(text)
+
+
+def offline_embed(text: str):
+    vector = np.zeros(OFFLINE_DIMENSIONS, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()):
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % OFFLINE_DIMENSIONS] += 1.0
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+def parse_config(config: str):
+    """
+    "fixed:max_tokens=256,overlap_percentage=10" -> ("fixed", {"max_tokens": 256, "overlap_percentage": 10})
+    """
+    strategy, _, options = config.partition(":")
+    if strategy not in chunking.STRATEGIES:
+        raise argparse.ArgumentTypeError(f"chunking strategy must be one of {', '.join(chunking.STRATEGIES)}")
+    return strategy, {
+        name: int(value)
+        for name, value in (option.split("=") for option in options.split(",") if option)
+    }
+
+
+def normalize(text: str):
+    return " ".join(text.lower().split())
+
+
+def run(embed_text, folder: str, questions, strategy: str, options: dict, k: int):
+    embedder = CountingEmbedder(embed_text)
+    with tempfile.TemporaryDirectory() as directory:
+        chunk_count = local_store.build(embedder, folder, directory, strategy, **options)
+        index_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in local_store.INDEX_FILES)
+        ingest_calls, ingest_tokens = embedder.calls, embedder.tokens
+
+        store = local_store.LocalVectorStore(directory)
+        recalled = 0
+        for question in questions:
+            results = store.search(embed_text(question["question"]), k)
+            evidence = normalize(question["evidence"])
+            if any(evidence in normalize(result["text"]) for result in results):
+                recalled += 1
+        del store
+
+    return {
+        "strategy": strategy,
+        "options": options,
+        "chunks": chunk_count,
+        "embeddingCalls": ingest_calls,
+        "embeddedTokens": ingest_tokens,
+        "indexBytes": index_bytes,
+        f"recall@{k}": round(recalled / len(questions), 3) if questions else None
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare chunking strategies on a labelled question set")
+    parser.add_argument("--folder", default="assets")
+    parser.add_argument("--questions", required=True,
+                        help='JSON list of {"question": ..., "evidence": passage that answers it}')
+    parser.add_argument("--config", action="append", type=parse_config,
+                        help="strategy[:option=value,...], repeatable; defaults to every strategy")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--offline", action="store_true", help="use a hashed bag-of-words embedding")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    with open(args.questions) as f:
+        questions = json.load(f)
+    if args.offline:
+        embed_text = offline_embed
+    else:
+        embed_text = functools.partial(local_store.embed, bootstrap.client("bedrock-runtime", "us-west-2"))
+
+    configs = args.config or [(strategy, {}) for strategy in chunking.STRATEGIES]
+    results = [run(embed_text, args.folder, questions, strategy, options, args.k) for strategy, options in configs]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        recall = f"recall@{args.k}"
+        print(f"{'config':<45}{'chunks':>8}{'embed calls':>13}{'tokens':>9}{'index KB':>10}{recall:>11}")
+        for result in results:
+            name = result["strategy"] + "".join(f" {key}={value}" for key, value in result["options"].items())
+            print(f"{name:<45}{result['chunks']:>8}{result['embeddingCalls']:>13}{result['embeddedTokens']:>9}"
+                  f"{result['indexBytes'] / 1024:>10.1f}{result[recall]:>11}")
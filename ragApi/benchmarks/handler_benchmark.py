@@ -0,0 +1,98 @@
+"""
+Per-invocation overhead of the rag handler, with Bedrock answering in process.
+
+    python benchmarks/handler_benchmark.py [--iterations 2000] [--case handler] [--update-baseline]
+
+Covers the request path stage by stage (event JSON parse, request build, response parse) and end
+to end for every mode: retrieve, retrieve_and_generate with and without a session, and cached.
+Results are compared with handler_baseline.json next to this file; see benchmarks/microbench.py
+at the repository root for the metrics and tolerances.
+"""
+
+import json
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# The handlers import their neighbours as top-level modules, as in the deployed asset. The shared
+# harness lives in the top-level benchmarks folder, so neither ships in a Lambda zip.
+sys.path[:0] = [os.path.join(HERE, "..", "services"), os.path.join(HERE, "..", "..", "benchmarks")]
+import microbench  # noqa: E402
+
+# rag.py reads the knowledge base id at import time; the placeholder default fails validation
+os.environ.setdefault("KNOWLEDGE_BASE_ID", "BENCHMARK0")
+import rag  # noqa: E402
+
+BASELINE = os.path.join(HERE, "handler_baseline.json")
+QUESTION = "What is the name of the rose the little prince looks after?"
+PASSAGE = "The little prince tells the pilot about the rose that grows on his asteroid and how he cares for it. "
+SESSION_ID = "5f1b2c3d-4e5f-4a6b-8c7d-9e0f1a2b3c4d"
+EMBEDDING_DIMENSIONS = 1024
+
+
+def location(index: int):
+    return {"type": "S3", "s3Location": {"uri": f"s3://benchmark-bucket/assets/book.pdf#{index}"}}
+
+
+class AgentRuntimeEndpoint:
+
+    def __init__(self, results):
+        self.retrieve_response = microbench.json_response({
+            "retrievalResults": [
+                {"content": {"text": PASSAGE * 8}, "score": 0.8 - index / 100, "location": location(index)}
+                for index in range(results)
+            ]
+        })
+        self.generate_response = microbench.json_response({
+            "output": {"text": "The little prince looks after a single rose that grows on his asteroid."},
+            "citations": [{
+                "generatedResponsePart": {"textResponsePart": {"text": "a single rose", "span": {"start": 0, "end": 13}}},
+                "retrievedReferences": [{"content": {"text": PASSAGE * 8}, "location": location(0)}]
+            }],
+            "sessionId": SESSION_ID
+        })
+
+    def __call__(self, request):
+        if request.url.endswith("/retrieve"):
+            return self.retrieve_response
+        return self.generate_response
+
+
+def embedding_endpoint():
+    rng = random.Random(0)
+    response = microbench.json_response({
+        "embedding": [rng.uniform(-1, 1) for _ in range(EMBEDDING_DIMENSIONS)],
+        "inputTextTokenCount": 14
+    })
+    return lambda request: response
+
+
+def event(**body):
+    return {"body": json.dumps({"question": QUESTION, **body})}
+
+
+def cases():
+    endpoint = AgentRuntimeEndpoint(rag.NUMBER_OF_RESULTS)
+    rag.client = microbench.stub_client("bedrock-agent-runtime", endpoint)
+    rag.answer_cache.bedrock_client = microbench.stub_client("bedrock-runtime", embedding_endpoint())
+
+    request = event(mode="retrieve_and_generate")
+    session_request = event(mode="retrieve_and_generate", sessionId=SESSION_ID)
+    retrieve_request = event(mode="retrieve")
+    cached_request = event(mode="cached")
+    raw_response = endpoint.generate_response[2]
+
+    return {
+        "json_parse": lambda: json.loads(request["body"]),
+        "request_build": lambda: rag.get_request(QUESTION, SESSION_ID),
+        "response_parse": lambda: json.loads(raw_response)["output"]["text"],
+        "handler": lambda: rag.handler(request, None),
+        "handler_session": lambda: rag.handler(session_request, None),
+        "handler_retrieve": lambda: rag.handler(retrieve_request, None),
+        "handler_cached": lambda: rag.handler(cached_request, None)
+    }
+
+
+if __name__ == "__main__":
+    microbench.run(cases(), BASELINE, "Measure per-invocation overhead of the rag handler")
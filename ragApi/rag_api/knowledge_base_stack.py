@@ -11,6 +11,13 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+
+def int_context(node, name, default):
+    # An explicit 0, such as -c overlap_percentage=0, is a valid setting and must not fall back to the default
+    value = node.try_get_context(name)
+    return default if value is None else int(value)
+
+
 class KnowledgeBaseStack(Stack):
 
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
@@ -20,9 +27,17 @@ class KnowledgeBaseStack(Stack):
         self.collection_name = "knowledge-base-vectors"
         self.embedding_model_arn = "arn:aws:bedrock:us-west-2::foundation-model/amazon.titan-embed-text-v1"
         self.vector_dimension = 1536
-        self.chunking_strategy = "FIXED_SIZE"
-        self.max_tokens = 512
-        self.overlap_percentage = 20
+
+        # Chunking is tunable through context, e.g. cdk deploy -c chunking_strategy=semantic -c max_tokens=300.
+        # Compare settings offline first with benchmarks/chunking_benchmark.py
+        self.chunking_strategy = self.node.try_get_context("chunking_strategy") or "fixed"
+        self.max_tokens = int_context(self.node, "max_tokens", 300 if self.chunking_strategy == "semantic" else 512)
+        self.overlap_percentage = int_context(self.node, "overlap_percentage", 20)
+        self.parent_tokens = int_context(self.node, "parent_tokens", 1500)
+        self.child_tokens = int_context(self.node, "child_tokens", 300)
+        self.overlap_tokens = int_context(self.node, "overlap_tokens", 60)
+        self.buffer_size = int_context(self.node, "buffer_size", 0)
+        self.breakpoint_percentile = int_context(self.node, "breakpoint_percentile", 95)
 
         # ========================================
         # OPENSEARCH INFRASTRUCTURE
@@ -240,13 +255,7 @@ class KnowledgeBaseStack(Stack):
                 }
             },
             vector_ingestion_configuration={
-                "chunkingConfiguration": {
-                    "chunkingStrategy": self.chunking_strategy,
-                    "fixedSizeChunkingConfiguration": {
-                        "maxTokens": self.max_tokens,
-                        "overlapPercentage": self.overlap_percentage
-                    }
-                }
+                "chunkingConfiguration": self.get_chunking_configuration()
             }
         )
         
@@ -308,4 +317,37 @@ class KnowledgeBaseStack(Stack):
             "KnowledgeBaseName",
             value=self.knowledge_base.name,
             description="Knowledge Base Name"
-        ) 
\ No newline at end of file
+        )
+
+    def get_chunking_configuration(self):
+        if self.chunking_strategy == "fixed":
+            return {
+                "chunkingStrategy": "FIXED_SIZE",
+                "fixedSizeChunkingConfiguration": {
+                    "maxTokens": self.max_tokens,
+                    "overlapPercentage": self.overlap_percentage
+                }
+            }
+        if self.chunking_strategy == "hierarchical":
+            return {
+                "chunkingStrategy": "HIERARCHICAL",
+                "hierarchicalChunkingConfiguration": {
+                    "levelConfigurations": [
+                        {"maxTokens": self.parent_tokens},
+                        {"maxTokens": self.child_tokens}
+                    ],
+                    "overlapTokens": self.overlap_tokens
+                }
+            }
+        if self.chunking_strategy == "semantic":
+            return {
+                "chunkingStrategy": "SEMANTIC",
+                "semanticChunkingConfiguration": {
+                    "maxTokens": self.max_tokens,
+                    "bufferSize": self.buffer_size,
+                    "breakpointPercentileThreshold": self.breakpoint_percentile
+                }
+            }
+        if self.chunking_strategy == "none":
+            return {"chunkingStrategy": "NONE"}
+        raise ValueError("chunking_strategy must be one of fixed, hierarchical, semantic, none")
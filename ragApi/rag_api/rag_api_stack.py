@@ -3,7 +3,8 @@ from aws_cdk import (
     Stack,
     aws_lambda,
     aws_apigateway,
-    aws_iam
+    aws_iam,
+    aws_s3
 )
 from constructs import Construct
 
@@ -18,9 +19,28 @@ class RagApiStack(Stack):
             runtime=aws_lambda.Runtime.PYTHON_3_13,
             code=aws_lambda.Code.from_asset("services"),
             handler="rag.handler",
-            timeout=Duration.seconds(30)
+            timeout=Duration.seconds(30),
+            environment={
+                "KNOWLEDGE_BASE_ID": self.node.try_get_context("knowledge_base_id") or "XXXXXXX",
+                "MODEL_ARN": self.node.try_get_context("model_arn")
+                    or "arn:aws:bedrock:us-west-2::foundation-model/anthropic.claude-3-5-sonnet-20241022-v2:0",
+                "RAG_MODE": self.node.try_get_context("rag_mode") or "retrieve_and_generate",
+                "RETRIEVAL_BACKEND": self.node.try_get_context("retrieval_backend") or "knowledge_base"
+            }
         )
 
+        # Self-hosted vector store: the index lives in S3 and is memory-mapped from /tmp.
+        # NumPy is not in the Lambda runtime, so pass a layer that provides it (e.g. AWSSDKPandas)
+        if self.node.try_get_context("retrieval_backend") == "local":
+            vector_store_bucket = aws_s3.Bucket(self, "Py-VectorStoreBucket")
+            vector_store_bucket.grant_read(rag_lambda)
+            rag_lambda.add_environment("VECTOR_STORE_BUCKET", vector_store_bucket.bucket_name)
+            numpy_layer_arn = self.node.try_get_context("numpy_layer_arn")
+            if numpy_layer_arn:
+                rag_lambda.add_layers(
+                    aws_lambda.LayerVersion.from_layer_version_arn(self, "Py-NumpyLayer", numpy_layer_arn)
+                )
+
         rag_lambda.add_to_role_policy(aws_iam.PolicyStatement(
             effect=aws_iam.Effect.ALLOW,
             resources=["*"],
@@ -28,6 +48,7 @@ class RagApiStack(Stack):
                 "bedrock:RetrieveAndGenerate",
                 "bedrock:Retrieve",
                 "bedrock:InvokeModel",
+                "bedrock:InvokeModelWithResponseStream",
                 "bedrock:InvokeAgent"
             ])
         )
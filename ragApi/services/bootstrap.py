@@ -0,0 +1,92 @@
+"""
+Shared runtime bootstrap for the Lambda handlers in this folder.
+
+Clients are built once per container with a tuned botocore Config, heavy modules can be
+imported lazily, and the first invocation emits a structured cold-start timing record.
+"""
+
+import time
+
+_init_started = time.perf_counter()
+
+import functools
+import importlib
+import json
+import os
+
+import boto3
+from botocore.config import Config
+
+CLIENT_CONFIG = Config(
+    retries={"mode": "adaptive", "max_attempts": int(os.environ.get("BOTO_MAX_ATTEMPTS", "4"))},
+    max_pool_connections=int(os.environ.get("BOTO_MAX_POOL_CONNECTIONS", "16")),
+    connect_timeout=float(os.environ.get("BOTO_CONNECT_TIMEOUT", "2")),
+    read_timeout=float(os.environ.get("BOTO_READ_TIMEOUT", "60")),
+    tcp_keepalive=True
+)
+
+_clients = {}
+_timings = {"clients": {}, "imports": {}}
+_cold = True
+
+
+def client(service_name: str, region_name: str = None):
+    """
+    Return the container-wide client for a service, creating it on first use.
+    """
+    key = (service_name, region_name)
+    if key not in _clients:
+        started = time.perf_counter()
+        _clients[key] = boto3.client(service_name=service_name, region_name=region_name, config=CLIENT_CONFIG)
+        _timings["clients"][service_name] = _elapsed_ms(started)
+    return _clients[key]
+
+
+def lazy_import(module_name: str):
+    """
+    Module proxy that defers the import until an attribute is first accessed.
+    """
+    return _LazyModule(module_name)
+
+
+def instrument(handler):
+    """
+    Wrap a handler so its first invocation logs how long container initialization took.
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        global _cold
+        if not _cold:
+            return handler(event, context)
+        _cold = False
+        invoke_started = time.perf_counter()
+        try:
+            return handler(event, context)
+        finally:
+            print(json.dumps({
+                "metric": "cold_start",
+                "function": getattr(context, "function_name", os.environ.get("AWS_LAMBDA_FUNCTION_NAME")),
+                "initMs": round((invoke_started - _init_started) * 1000, 1),
+                "firstInvokeMs": _elapsed_ms(invoke_started),
+                "clientsMs": _timings["clients"],
+                "importsMs": _timings["imports"]
+            }))
+    return wrapper
+
+
+class _LazyModule:
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, name):
+        if self._module is None:
+            started = time.perf_counter()
+            self._module = importlib.import_module(self._module_name)
+            _timings["imports"][self._module_name] = _elapsed_ms(started)
+        return getattr(self._module, name)
+
+
+def _elapsed_ms(started: float):
+    return round((time.perf_counter() - started) * 1000, 1)
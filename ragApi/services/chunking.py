@@ -0,0 +1,108 @@
+"""
+Chunking strategies for the local RAG pipeline, mirroring the Knowledge Base options:
+
+    fixed         windows of max_tokens with overlap_percentage overlap
+    hierarchical  parent windows split into child windows; children are embedded, parents returned
+    semantic      sentence groups split where the embedding distance between neighbours jumps
+    none          one chunk per document
+
+Token counts are estimated from characters, the same way the summary service does.
+"""
+
+import bootstrap
+import os
+import re
+
+np = bootstrap.lazy_import("numpy")
+
+CHARS_PER_TOKEN = int(os.environ.get("CHARS_PER_TOKEN", "4"))
+STRATEGIES = ("fixed", "hierarchical", "semantic", "none")
+
+
+def chunk_text(text: str, strategy: str = "fixed", embed=None, **options):
+    """
+    Return the chunks of text as dicts with a "text" key, plus "parent" for hierarchical chunks.
+    The semantic strategy needs embed, a callable that returns a unit-length vector for a string.
+    """
+    if strategy == "fixed":
+        return [{"text": chunk} for chunk in fixed_chunks(text, **options)]
+    if strategy == "hierarchical":
+        return hierarchical_chunks(text, **options)
+    if strategy == "semantic":
+        if embed is None:
+            raise ValueError("semantic chunking needs an embed function")
+        return [{"text": chunk} for chunk in semantic_chunks(text, embed, **options)]
+    if strategy == "none":
+        return [{"text": text.strip()}] if text.strip() else []
+    raise ValueError(f"chunking strategy must be one of {', '.join(STRATEGIES)}")
+
+
+def fixed_chunks(text: str, max_tokens: int = 512, overlap_percentage: int = 20):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    return windows(text.split(), max_chars, max_chars * overlap_percentage // 100)
+
+
+def hierarchical_chunks(text: str, parent_tokens: int = 1500, child_tokens: int = 300, overlap_tokens: int = 60):
+    chunks = []
+    overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+    for parent in windows(text.split(), parent_tokens * CHARS_PER_TOKEN, overlap_chars):
+        for child in windows(parent.split(), child_tokens * CHARS_PER_TOKEN, overlap_chars):
+            chunks.append({"text": child, "parent": parent})
+    return chunks
+
+
+def semantic_chunks(text: str, embed, max_tokens: int = 300, buffer_size: int = 0, breakpoint_percentile: int = 95):
+    """
+    Embed every sentence together with buffer_size neighbours on each side and start a new chunk
+    where the cosine distance to the next sentence is above the breakpoint percentile.
+    """
+    sentences = split_sentences(text)
+    if len(sentences) < 2:
+        return sentences
+    groups = [
+        " ".join(sentences[max(0, i - buffer_size):i + buffer_size + 1])
+        for i in range(len(sentences))
+    ]
+    embeddings = np.stack([embed(group) for group in groups])
+    distances = 1.0 - np.sum(embeddings[:-1] * embeddings[1:], axis=1)
+    threshold = np.percentile(distances, breakpoint_percentile)
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks, current = [], []
+    for i, sentence in enumerate(sentences):
+        if current and len(" ".join(current)) + len(sentence) + 1 > max_chars:
+            chunks.append(" ".join(current))
+            current = []
+        current.append(sentence)
+        if i < len(distances) and distances[i] > threshold:
+            chunks.append(" ".join(current))
+            current = []
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def split_sentences(text: str):
+    return [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+|\n\s*\n", text) if sentence.strip()]
+
+
+def windows(words, max_chars: int, overlap_chars: int = 0):
+    """
+    Pack words into windows of at most max_chars. Each window starts overlap_chars worth of
+    words before the end of the previous one.
+    """
+    chunks, start = [], 0
+    while start < len(words):
+        end, size = start, 0
+        while end < len(words) and (end == start or size + len(words[end]) + 1 <= max_chars):
+            size += len(words[end]) + 1
+            end += 1
+        chunks.append(" ".join(words[start:end]))
+        if end == len(words):
+            break
+        back, size = end, 0
+        while back > start + 1 and size + len(words[back - 1]) + 1 <= overlap_chars:
+            back -= 1
+            size += len(words[back]) + 1
+        start = back
+    return chunks
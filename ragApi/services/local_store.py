@@ -0,0 +1,184 @@
+"""
+Self-hosted vector store, an alternative to the Bedrock Knowledge Base for dev, test and small tenants.
+
+The index is two files: embeddings.npy, a float32 matrix of unit-length chunk embeddings, and
+chunks.json with the text and location of every row. At cold start they are downloaded from S3
+to /tmp and the matrix is memory-mapped, so retrieval is a brute-force dot product with no
+service round trip besides the question embedding. A copy left in /tmp by an earlier container
+is reused only while its S3 ETags are unchanged.
+
+Build an index from the assets folder and upload it:
+    python local_store.py --bucket <bucket> [--prefix vector_store/] [--folder assets] \
+        [--chunking fixed|hierarchical|semantic|none] [--max-tokens 512] [--overlap-percentage 20]
+"""
+
+import bootstrap
+import argparse
+import functools
+import json
+import os
+import time
+
+import chunking
+from semantic_cache import EMBEDDING_MODEL_ID
+
+np = bootstrap.lazy_import("numpy")
+
+VECTOR_STORE_BUCKET = os.environ.get("VECTOR_STORE_BUCKET")
+VECTOR_STORE_PREFIX = os.environ.get("VECTOR_STORE_PREFIX", "vector_store/")
+VECTOR_STORE_DIR = os.environ.get("VECTOR_STORE_DIR", "/tmp/vector_store")
+INDEX_FILES = ("embeddings.npy", "chunks.json")
+# ETags of the downloaded index files, to tell whether the /tmp copy is still current
+ETAGS_FILE = "etags.json"
+
+
+class LocalVectorStore:
+    """
+    Memory-mapped embeddings and their chunks, searched by cosine similarity.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.embeddings = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "chunks.json")) as f:
+            self.chunks = json.load(f)
+        if len(self.chunks) != self.embeddings.shape[0]:
+            raise ValueError(f"{directory} has {self.embeddings.shape[0]} embeddings for {len(self.chunks)} chunks")
+
+    @classmethod
+    def from_s3(cls, s3_client, bucket: str, prefix: str = VECTOR_STORE_PREFIX, directory: str = VECTOR_STORE_DIR):
+        """
+        Download the index files unless the copy in directory matches their current ETags, then open the store.
+        """
+        os.makedirs(directory, exist_ok=True)
+        started = time.perf_counter()
+        etags_path = os.path.join(directory, ETAGS_FILE)
+        etags = {}
+        if os.path.exists(etags_path):
+            with open(etags_path) as f:
+                etags = json.load(f)
+        downloaded = []
+        for name in INDEX_FILES:
+            path = os.path.join(directory, name)
+            etag = s3_client.head_object(Bucket=bucket, Key=f"{prefix}{name}")["ETag"]
+            if etags.get(name) != etag or not os.path.exists(path):
+                s3_client.download_file(bucket, f"{prefix}{name}", path)
+                etags[name] = etag
+                downloaded.append(name)
+        if downloaded:
+            with open(etags_path, "w") as f:
+                json.dump(etags, f)
+        store = cls(directory)
+        print(json.dumps({
+            "metric": "vector_store_load",
+            "chunks": len(store.chunks),
+            "downloaded": downloaded,
+            "loadMs": round((time.perf_counter() - started) * 1000, 1)
+        }))
+        return store
+
+    def search(self, query_embedding, k: int):
+        """
+        Return the k closest chunks as dicts shaped like Bedrock retrieval results.
+        """
+        scores = self.embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        k = min(k, scores.shape[0])
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {
+                # Hierarchical chunks are matched on the child and answered with the parent
+                "text": self.chunks[i].get("parent", self.chunks[i]["text"]),
+                "score": float(scores[i]),
+                "location": self.chunks[i].get("location")
+            }
+            for i in top
+        ]
+
+
+def embed(bedrock_client, text: str):
+    response = bedrock_client.invoke_model(
+        body=json.dumps({"inputText": text, "normalize": True}),
+        modelId=EMBEDDING_MODEL_ID,
+        accept="application/json",
+        contentType="application/json"
+    )
+    embedding = np.asarray(json.loads(response.get("body").read()).get("embedding"), dtype=np.float32)
+    return embedding / (np.linalg.norm(embedding) or 1.0)
+
+
+def read_documents(local_folder: str):
+    """
+    Yield (location, text) for every text file under local_folder.
+    """
+    for root, _, files in os.walk(local_folder):
+        for file in sorted(files):
+            if file.endswith((".txt", ".md")):
+                path = os.path.join(root, file)
+                with open(path, encoding="utf-8") as f:
+                    yield os.path.relpath(path, local_folder), f.read()
+
+
+def build(embed_text, local_folder: str, directory: str, strategy: str = "fixed", **options):
+    """
+    Chunk every document with the given strategy, embed the chunks with embed_text and write
+    the index files to directory. Returns the number of chunks.
+    Raises ValueError when the folder has no text to index.
+    """
+    chunks = []
+    for location, text in read_documents(local_folder):
+        for chunk in chunking.chunk_text(text, strategy, embed=embed_text, **options):
+            chunks.append({**chunk, "location": location})
+    if not chunks:
+        raise ValueError(f"no text to index: {local_folder} has no non-empty .txt or .md files")
+
+    embeddings = np.stack([embed_text(chunk["text"]) for chunk in chunks])
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "embeddings.npy"), embeddings.astype(np.float32))
+    with open(os.path.join(directory, "chunks.json"), "w") as f:
+        json.dump(chunks, f)
+    return len(chunks)
+
+
+def chunking_options(args):
+    """
+    Chunking keyword arguments from the command line flags that were given.
+    """
+    names = {
+        "fixed": ("max_tokens", "overlap_percentage"),
+        "hierarchical": ("parent_tokens", "child_tokens", "overlap_tokens"),
+        "semantic": ("max_tokens", "buffer_size", "breakpoint_percentile"),
+        "none": ()
+    }[args.chunking]
+    return {name: getattr(args, name) for name in names if getattr(args, name) is not None}
+
+
+def add_chunking_arguments(parser):
+    parser.add_argument("--chunking", choices=chunking.STRATEGIES, default="fixed")
+    for name in ("max_tokens", "overlap_percentage", "parent_tokens", "child_tokens", "overlap_tokens",
+                 "buffer_size", "breakpoint_percentile"):
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the local vector store and upload it to S3")
+    parser.add_argument("--bucket", help="upload the index to this bucket")
+    parser.add_argument("--prefix", default=VECTOR_STORE_PREFIX)
+    parser.add_argument("--folder", default="assets")
+    parser.add_argument("--output", default="vector_store")
+    add_chunking_arguments(parser)
+    args = parser.parse_args()
+
+    embed_text = functools.partial(embed, bootstrap.client("bedrock-runtime", "us-west-2"))
+    try:
+        count = build(embed_text, args.folder, args.output, args.chunking, **chunking_options(args))
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Indexed {count} chunks into {args.output}")
+    if args.bucket:
+        s3_client = bootstrap.client("s3")
+        for name in INDEX_FILES:
+            s3_client.upload_file(os.path.join(args.output, name), args.bucket, f"{args.prefix}{name}")
+        print(f"Uploaded to s3://{args.bucket}/{args.prefix}")
@@ -1,31 +1,150 @@
-import boto3
+import bootstrap
 import json
+import os
+
+import local_store
+from semantic_cache import SemanticCache
 
 AWS_REGION = 'us-west-2'
+KNOWLEDGE_BASE_ID = os.environ.get("KNOWLEDGE_BASE_ID", "XXXXXXX")
+MODEL_ARN = os.environ.get(
+    "MODEL_ARN",
+    "arn:aws:bedrock:us-west-2::foundation-model/anthropic.claude-3-5-sonnet-20241022-v2:0"
+)
+NUMBER_OF_RESULTS = int(os.environ.get("NUMBER_OF_RESULTS", "5"))
+
+# retrieve: only the matching chunks, retrieve_and_generate: full RAG answer,
+# cached: retrieve_and_generate behind the semantic answer cache
+MODES = ("retrieve", "retrieve_and_generate", "cached")
+DEFAULT_MODE = os.environ.get("RAG_MODE", "retrieve_and_generate")
+
+# knowledge_base: Bedrock Knowledge Base, local: self-hosted index loaded from S3 (see local_store.py)
+RETRIEVAL_BACKEND = os.environ.get("RETRIEVAL_BACKEND", "knowledge_base")
+
+client = bootstrap.client("bedrock-agent-runtime", AWS_REGION)
+bedrock_client = bootstrap.client("bedrock-runtime", AWS_REGION)
+answer_cache = SemanticCache(bedrock_client)
 
-client = boto3.client(service_name="bedrock-agent-runtime", region_name=AWS_REGION)
 
+def load_vector_store():
+    return local_store.LocalVectorStore.from_s3(bootstrap.client("s3"), local_store.VECTOR_STORE_BUCKET)
+
+
+# Loaded during init, so the download and memory map are not added to the first request
+vector_store = load_vector_store() if RETRIEVAL_BACKEND == "local" else None
+
+@bootstrap.instrument
 def handler(event, context):
     body = json.loads(event["body"])
     question = body.get("question")
+    mode = body.get("mode", DEFAULT_MODE)
+    if mode not in MODES:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": f"mode must be one of {', '.join(MODES)}"})
+        }
+    session_id = body.get("sessionId")
     if question:
-        response = client.retrieve_and_generate(
-            input={"text": question},
-            retrieveAndGenerateConfiguration={
-                "type": "KNOWLEDGE_BASE",
-                "knowledgeBaseConfiguration": {
-                    "knowledgeBaseId": "XXXXXXX",
-                    "modelArn": "arn:aws:bedrock:us-west-2::foundation-model/anthropic.claude-3-5-sonnet-20241022-v2:0"
-                }
-            }
-        )
-        answer = response.get("output").get("text")
+        if mode == "retrieve":
+            result = {"chunks": retrieve(question)}
+        elif mode == "cached":
+            result = cached_answer(question, session_id)
+        else:
+            answer, session_id = retrieve_and_generate(question, session_id)
+            result = {"answer": answer, "sessionId": session_id}
         return {
             "statusCode": 200,
-            "body": json.dumps({"answer": answer})
+            "body": json.dumps(result)
         }
     else:
         return {
             "statusCode": 400,
             "body": json.dumps({"error": "question needed"})
-        }
\ No newline at end of file
+        }
+
+
+def retrieve(question: str):
+    if RETRIEVAL_BACKEND == "local":
+        return get_vector_store().search(local_store.embed(bedrock_client, question), NUMBER_OF_RESULTS)
+    response = client.retrieve(
+        knowledgeBaseId=KNOWLEDGE_BASE_ID,
+        retrievalQuery={"text": question},
+        retrievalConfiguration={
+            "vectorSearchConfiguration": {"numberOfResults": NUMBER_OF_RESULTS}
+        }
+    )
+    return [
+        {
+            "text": result["content"]["text"],
+            "score": result.get("score"),
+            "location": result.get("location")
+        }
+        for result in response.get("retrievalResults", [])
+    ]
+
+
+def retrieve_and_generate(question: str, session_id: str = None):
+    """
+    Return the answer and the session id to pass with the next question of the conversation.
+    The local backend has no Bedrock session, so its answers are generated without one.
+    """
+    if RETRIEVAL_BACKEND == "local":
+        return generate_from_chunks(question, retrieve(question)), None
+    response = client.retrieve_and_generate(**get_request(question, session_id))
+    return response.get("output").get("text"), response.get("sessionId")
+
+
+def get_request(question: str, session_id: str = None):
+    request = {
+        "input": {"text": question},
+        "retrieveAndGenerateConfiguration": {
+            "type": "KNOWLEDGE_BASE",
+            "knowledgeBaseConfiguration": {
+                "knowledgeBaseId": KNOWLEDGE_BASE_ID,
+                "modelArn": MODEL_ARN
+            }
+        }
+    }
+    if session_id:
+        request["sessionId"] = session_id
+    return request
+
+
+def get_vector_store():
+    global vector_store
+    if vector_store is None:
+        vector_store = load_vector_store()
+    return vector_store
+
+
+def generate_from_chunks(question: str, chunks):
+    response = bedrock_client.converse(modelId=MODEL_ARN, messages=get_messages(question, chunks))
+    return response["output"]["message"]["content"][0]["text"]
+
+
+def get_messages(question: str, chunks):
+    context = "\n\n".join(chunk["text"] for chunk in chunks)
+    return [{
+        "role": "user",
+        "content": [{
+            "text": f"Answer the question using only this context.\n\nContext:\n{context}\n\nQuestion: {question}"
+        }]
+    }]
+
+
+def cached_answer(question: str, session_id: str = None):
+    """
+    Answer from the semantic cache when a similar question was answered before. Follow-up
+    questions depend on the conversation, so a question with a session bypasses the cache.
+    A generated answer comes with the session id to continue the conversation.
+    """
+    if session_id:
+        answer, session_id = retrieve_and_generate(question, session_id)
+        return {"answer": answer, "sessionId": session_id, "cached": False}
+    embedding = answer_cache.embed(question)
+    answer, similarity = answer_cache.lookup(embedding)
+    if answer is not None:
+        return {"answer": answer, "cached": True, "similarity": round(similarity, 4)}
+    answer, session_id = retrieve_and_generate(question)
+    answer_cache.store(question, embedding, answer)
+    return {"answer": answer, "sessionId": session_id, "cached": False, "similarity": round(similarity, 4)}
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+
+import rag
+
+
+def stream_answer(question: str, session_id: str = None, metrics: dict = None):
+    """
+    Yield (event, data) pairs from retrieve_and_generate_stream: "session" first, then "text"
+    and "citation" events as they arrive. Time-to-first-byte and totals are written to metrics.
+    The local backend streams the same events, without a session.
+    """
+    started = time.perf_counter()
+    first_byte_at = None
+    citations = 0
+    if rag.RETRIEVAL_BACKEND == "local":
+        session_id, stream = None, local_stream(question)
+    else:
+        response = rag.client.retrieve_and_generate_stream(**rag.get_request(question, session_id))
+        session_id, stream = response.get("sessionId"), response["stream"]
+    yield "session", {"sessionId": session_id}
+    for event in stream:
+        if "output" in event:
+            if first_byte_at is None:
+                first_byte_at = time.perf_counter()
+            yield "text", {"text": event["output"]["text"]}
+        elif "citation" in event:
+            citations += 1
+            yield "citation", event["citation"]
+
+    finished = time.perf_counter()
+    result = {
+        "timeToFirstByteMs": round(((first_byte_at or finished) - started) * 1000, 1),
+        "totalMs": round((finished - started) * 1000, 1),
+        "citations": citations
+    }
+    print(json.dumps({"metric": "rag_stream", "sessionId": session_id, **result}))
+    if metrics is not None:
+        metrics.update(result)
+
+
+def local_stream(question: str):
+    """
+    Answer from the local vector store with converse_stream, as retrieve_and_generate_stream events:
+    the text as it is generated, then one citation with the chunks the answer was based on.
+    """
+    chunks = rag.retrieve(question)
+    response = rag.bedrock_client.converse_stream(modelId=rag.MODEL_ARN, messages=rag.get_messages(question, chunks))
+    for event in response["stream"]:
+        if "contentBlockDelta" in event:
+            text = event["contentBlockDelta"]["delta"].get("text")
+            if text:
+                yield {"output": {"text": text}}
+    yield {"citation": {"retrievedReferences": [
+        {"content": {"text": chunk["text"]}, "location": chunk["location"]} for chunk in chunks
+    ]}}
+
+
+async def app(scope, receive, send):
+    """
+    ASGI app that streams the answer as server-sent events. Run it locally with
+    `uvicorn rag_stream:app`, or behind Lambda response streaming through the Lambda
+    Web Adapter. Takes the same question and sessionId body as rag.handler.
+    """
+    if scope["type"] != "http":
+        return
+
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    request = json.loads(body or b"{}")
+    question = request.get("question")
+    if not question:
+        await send({"type": "http.response.start", "status": 400, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps({"error": "question needed"}).encode()})
+        return
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")]
+    })
+    metrics = {}
+    # Each event is flushed to the client as soon as it is read
+    async for event, data in in_thread(stream_answer(question, request.get("sessionId"), metrics)):
+        await send({"type": "http.response.body", "body": sse(event, data), "more_body": True})
+    await send({"type": "http.response.body", "body": sse("metrics", metrics)})
+
+
+async def in_thread(iterator):
+    """
+    Iterate a blocking iterator, such as a boto3 event stream, from async code. Each item is read
+    in a worker thread, so the event loop keeps serving other connections while one waits on Bedrock.
+    """
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def sse(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
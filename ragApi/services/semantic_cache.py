@@ -0,0 +1,66 @@
+import json
+import math
+import operator
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+EMBEDDING_MODEL_ID = os.environ.get("EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0")
+SIMILARITY_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+MAX_ENTRIES = int(os.environ.get("SEMANTIC_CACHE_MAX_ENTRIES", "500"))
+
+
+class SemanticCache:
+    """
+    Answers keyed by question embedding. A lookup returns the stored answer of the most similar
+    earlier question when its cosine similarity reaches the threshold. Lives for the container,
+    evicting the least recently used question beyond max_entries.
+    """
+
+    def __init__(self, bedrock_client, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES):
+        self.bedrock_client = bedrock_client
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed(self, question: str):
+        response = self.bedrock_client.invoke_model(
+            body=json.dumps({"inputText": question, "normalize": True}),
+            modelId=EMBEDDING_MODEL_ID,
+            accept="application/json",
+            contentType="application/json"
+        )
+        embedding = json.loads(response.get("body").read()).get("embedding")
+        norm = math.sqrt(sum(value * value for value in embedding)) or 1.0
+        return array("f", (value / norm for value in embedding))
+
+    def lookup(self, embedding):
+        """
+        Return (answer, similarity) of the closest cached question, or (None, best similarity).
+        """
+        best_question, best_similarity = None, -1.0
+        with self._lock:
+            entries = list(self._entries.items())
+        for question, (cached_embedding, _) in entries:
+            # Embeddings are unit length, so the dot product is the cosine similarity
+            similarity = sum(map(operator.mul, embedding, cached_embedding))
+            if similarity > best_similarity:
+                best_question, best_similarity = question, similarity
+        with self._lock:
+            if best_question is not None and best_similarity >= self.threshold and best_question in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(best_question)
+                return self._entries[best_question][1], best_similarity
+            self.misses += 1
+        return None, best_similarity
+
+    def store(self, question: str, embedding, answer):
+        with self._lock:
+            self._entries[question] = (embedding, answer)
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
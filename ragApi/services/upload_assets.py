@@ -4,38 +4,166 @@ Utility script to upload files to the assets folder and S3 bucket.
 """
 
 import os
+import json
+import time
+import hashlib
 import boto3
 import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 
-def upload_to_s3(bucket_name, local_folder="assets", s3_prefix=""):
+MB = 1024 * 1024
+MANIFEST_FILE = ".upload_manifest.json"
+
+# Multipart settings are also used to predict the ETag S3 assigns to each upload
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * MB,
+    multipart_chunksize=16 * MB,
+    max_concurrency=4,
+    use_threads=True
+)
+
+def upload_to_s3(bucket_name, local_folder="assets", s3_prefix="", sync=False, delete=False, workers=8):
     """
     Upload files from local assets folder to S3 bucket.
+    With sync, only files that are new or whose content differs from the S3 object are uploaded.
+    With delete, objects under the prefix that no longer exist locally are removed.
     """
-    s3_client = boto3.client('s3')
-    
+    # Every file upload runs up to max_concurrency part uploads, each needing its own connection
+    s3_client = boto3.client('s3', config=Config(max_pool_connections=workers * TRANSFER_CONFIG.max_concurrency))
+
     # Get bucket name from CDK outputs or use provided name
     if not bucket_name:
         print("Please provide bucket name from CDK outputs")
         return
-    
+
     local_path = Path(local_folder)
     if not local_path.exists():
         print(f"Local folder {local_folder} does not exist")
         return
-    
-    # Upload all files in assets folder
-    for file_path in local_path.rglob("*"):
-        if file_path.is_file():
-            # Calculate S3 key
-            relative_path = file_path.relative_to(local_path)
-            s3_key = f"{s3_prefix}{relative_path}"
-            
+
+    # Calculate S3 key for every file in assets folder
+    local_files = {
+        f"{s3_prefix}{file_path.relative_to(local_path).as_posix()}": file_path
+        for file_path in local_path.rglob("*")
+        if file_path.is_file() and file_path.name != MANIFEST_FILE
+    }
+
+    remote_objects = list_objects(s3_client, bucket_name, s3_prefix) if sync or delete else {}
+    manifest_path = local_path / MANIFEST_FILE
+    manifest = load_manifest(manifest_path) if sync else {}
+
+    pending = {}
+    for s3_key, file_path in local_files.items():
+        if sync:
+            etag = local_etag(file_path, manifest)
+            remote = remote_objects.get(s3_key)
+            if remote and remote["size"] == file_path.stat().st_size and remote["etag"] == etag:
+                continue
+        pending[s3_key] = file_path
+
+    started = time.perf_counter()
+    uploaded_bytes = 0
+    uploaded_files = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(s3_client.upload_file, str(file_path), bucket_name, s3_key, Config=TRANSFER_CONFIG): (s3_key, file_path)
+            for s3_key, file_path in pending.items()
+        }
+        for future in as_completed(futures):
+            s3_key, file_path = futures[future]
             try:
-                s3_client.upload_file(str(file_path), bucket_name, s3_key)
+                future.result()
+                uploaded_files += 1
+                uploaded_bytes += file_path.stat().st_size
                 print(f"Uploaded: {file_path} -> s3://{bucket_name}/{s3_key}")
             except Exception as e:
                 print(f"Error uploading {file_path}: {e}")
+    elapsed = time.perf_counter() - started
+
+    failed_deletes = []
+    if delete:
+        stale_keys = sorted(set(remote_objects) - set(local_files))
+        failed_deletes = delete_objects(s3_client, bucket_name, stale_keys)
+
+    if sync:
+        save_manifest(manifest_path, manifest)
+
+    skipped = len(local_files) - len(pending)
+    print(
+        f"Uploaded {uploaded_files} files ({uploaded_bytes / MB:.2f} MB), skipped {skipped} unchanged "
+        f"in {elapsed:.2f}s: {uploaded_files / elapsed if elapsed else 0:.1f} files/s, "
+        f"{uploaded_bytes / MB / elapsed if elapsed else 0:.2f} MB/s"
+    )
+    if failed_deletes:
+        print(f"Failed to delete {len(failed_deletes)} objects")
+
+def list_objects(s3_client, bucket_name, s3_prefix=""):
+    """
+    Map every S3 key under the prefix to its size and ETag using ListObjectsV2.
+    """
+    objects = {}
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=s3_prefix):
+        for obj in page.get("Contents", []):
+            objects[obj["Key"]] = {"size": obj["Size"], "etag": obj["ETag"].strip('"')}
+    return objects
+
+def delete_objects(s3_client, bucket_name, keys):
+    """
+    Delete keys in batches of 1000, the DeleteObjects limit. Returns the keys that could not be deleted.
+    """
+    failed = []
+    for start in range(0, len(keys), 1000):
+        batch = keys[start:start + 1000]
+        response = s3_client.delete_objects(
+            Bucket=bucket_name,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+        )
+        # Quiet mode only lists the keys that failed
+        errors = {error["Key"]: error for error in response.get("Errors", [])}
+        for key in batch:
+            if key in errors:
+                failed.append(key)
+                print(f"Error deleting s3://{bucket_name}/{key}: {errors[key].get('Code')} {errors[key].get('Message', '')}")
+            else:
+                print(f"Deleted: s3://{bucket_name}/{key}")
+    return failed
+
+def local_etag(file_path, manifest):
+    """
+    ETag S3 will report for the file when uploaded with TRANSFER_CONFIG.
+    Files whose size and mtime match the manifest reuse the stored value instead of being re-hashed.
+    """
+    stat = file_path.stat()
+    entry = manifest.get(str(file_path))
+    if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+        return entry["etag"]
+
+    part_digests = []
+    whole = hashlib.md5()
+    chunk_size = TRANSFER_CONFIG.multipart_chunksize
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            whole.update(chunk)
+            part_digests.append(hashlib.md5(chunk).digest())
+    if stat.st_size < TRANSFER_CONFIG.multipart_threshold:
+        etag = whole.hexdigest()
+    else:
+        etag = f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+    manifest[str(file_path)] = {"size": stat.st_size, "mtime": stat.st_mtime, "etag": etag}
+    return etag
+
+def load_manifest(manifest_path):
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())
+    return {}
+
+def save_manifest(manifest_path, manifest):
+    manifest_path.write_text(json.dumps(manifest, indent=2))
 
 def list_assets():
     """
@@ -45,23 +173,26 @@ def list_assets():
     if not assets_path.exists():
         print("Assets folder does not exist")
         return
-    
+
     print("Files in assets folder:")
     for file_path in assets_path.rglob("*"):
-        if file_path.is_file():
+        if file_path.is_file() and file_path.name != MANIFEST_FILE:
             print(f"  - {file_path}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Upload assets to S3 bucket")
     parser.add_argument("--bucket", help="S3 bucket name")
     parser.add_argument("--list", action="store_true", help="List files in assets folder")
-    
+    parser.add_argument("--sync", action="store_true", help="Only upload new or changed files")
+    parser.add_argument("--delete", action="store_true", help="Delete S3 objects that no longer exist locally")
+    parser.add_argument("--workers", type=int, default=8, help="Number of files uploaded in parallel")
+
     args = parser.parse_args()
-    
+
     if args.list:
         list_assets()
     elif args.bucket:
-        upload_to_s3(args.bucket)
+        upload_to_s3(args.bucket, sync=args.sync, delete=args.delete, workers=args.workers)
     else:
         print("Please provide --bucket name or use --list to see assets")
-        print("Example: python upload_assets.py --bucket my-knowledge-base-bucket") 
\ No newline at end of file
+        print("Example: python upload_assets.py --bucket my-knowledge-base-bucket --sync")
@@ -0,0 +1,14 @@
+import sys
+
+import bootstrap
+
+
+def test_lazy_import_defers_loading_until_first_use(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+    colorsys = bootstrap.lazy_import("colorsys")
+    assert "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    assert "colorsys" in bootstrap._timings["imports"]
@@ -0,0 +1,16 @@
+import aws_cdk as core
+import pytest
+
+from rag_api.knowledge_base_stack import int_context
+
+
+@pytest.mark.parametrize("context, expected", [
+    ({}, 20),
+    ({"overlap_percentage": 0}, 0),
+    ({"overlap_percentage": "0"}, 0),
+    ({"overlap_percentage": "35"}, 35)
+])
+def test_chunking_context_keeps_an_explicit_zero(context, expected):
+    node = core.App(context=context).node
+
+    assert int_context(node, "overlap_percentage", 20) == expected
@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+import boto3
+import numpy as np
+import pytest
+from moto import mock_aws
+
+import local_store
+
+BUCKET = "vector-store-bucket"
+
+
+def embed_text(text: str):
+    """
+    Deterministic stand-in for the embedding model.
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+    vector = np.random.default_rng(seed).standard_normal(8).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def write_documents(folder, documents):
+    os.makedirs(folder, exist_ok=True)
+    for name, text in documents.items():
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def publish(s3, tmp_path, documents):
+    """
+    Build an index from documents and upload it, as `python local_store.py --bucket` does.
+    """
+    write_documents(tmp_path / "assets", documents)
+    local_store.build(embed_text, str(tmp_path / "assets"), str(tmp_path / "index"), "none")
+    for name in local_store.INDEX_FILES:
+        s3.upload_file(str(tmp_path / "index" / name), BUCKET, f"{local_store.VECTOR_STORE_PREFIX}{name}")
+
+
+def test_search_returns_the_closest_chunk(tmp_path):
+    write_documents(tmp_path / "assets", {"tara.txt": "Tara is a plantation.", "rhett.md": "Rhett leaves."})
+    count = local_store.build(embed_text, str(tmp_path / "assets"), str(tmp_path / "index"), "none")
+
+    store = local_store.LocalVectorStore(str(tmp_path / "index"))
+    results = store.search(embed_text("Rhett leaves."), 1)
+
+    assert count == 2
+    assert [(result["text"], result["location"]) for result in results] == [("Rhett leaves.", "rhett.md")]
+
+
+def test_empty_folder_is_rejected(tmp_path):
+    write_documents(tmp_path / "assets", {"empty.txt": "", "image.png": "not text"})
+
+    with pytest.raises(ValueError, match="no text to index"):
+        local_store.build(embed_text, str(tmp_path / "assets"), str(tmp_path / "index"), "none")
+
+
+def test_unchanged_copy_is_not_downloaded_again(s3, tmp_path, monkeypatch):
+    publish(s3, tmp_path, {"tara.txt": "Tara is a plantation."})
+    local_store.LocalVectorStore.from_s3(s3, BUCKET, directory=str(tmp_path / "tmp"))
+    downloads = []
+    monkeypatch.setattr(s3, "download_file", lambda *args: downloads.append(args))
+
+    store = local_store.LocalVectorStore.from_s3(s3, BUCKET, directory=str(tmp_path / "tmp"))
+
+    assert downloads == []
+    assert len(store.chunks) == 1
+
+
+def test_stale_copy_is_replaced_when_the_index_changes(s3, tmp_path):
+    publish(s3, tmp_path, {"tara.txt": "Tara is a plantation."})
+    local_store.LocalVectorStore.from_s3(s3, BUCKET, directory=str(tmp_path / "tmp"))
+    publish(s3, tmp_path, {"tara.txt": "Tara is a plantation.", "rhett.md": "Rhett leaves."})
+
+    # A warm container of a later deployment still has the first copy in /tmp
+    store = local_store.LocalVectorStore.from_s3(s3, BUCKET, directory=str(tmp_path / "tmp"))
+
+    assert sorted(chunk["text"] for chunk in store.chunks) == ["Rhett leaves.", "Tara is a plantation."]
@@ -0,0 +1,105 @@
+import importlib
+import io
+import json
+
+import pytest
+
+import local_store
+import rag
+from semantic_cache import SemanticCache
+
+
+class KnowledgeBaseStub:
+
+    def __init__(self):
+        self.requests = []
+
+    def retrieve(self, **kwargs):
+        self.requests.append(("retrieve", kwargs))
+        return {"retrievalResults": [
+            {"content": {"text": "Tara is the O'Hara plantation."}, "score": 0.9, "location": {"type": "S3"}}
+        ]}
+
+    def retrieve_and_generate(self, **kwargs):
+        self.requests.append(("retrieve_and_generate", kwargs))
+        return {"output": {"text": f"answer {len(self.requests)}"}, "sessionId": kwargs.get("sessionId", "session-1")}
+
+
+class EmbeddingStub:
+    """
+    invoke_model for the embedding model: questions about Tara share one direction, anything else another.
+    """
+
+    def invoke_model(self, **kwargs):
+        text = json.loads(kwargs["body"])["inputText"]
+        embedding = [1.0, 0.0] if "Tara" in text else [0.0, 1.0]
+        return {"body": io.BytesIO(json.dumps({"embedding": embedding}).encode("utf-8"))}
+
+
+@pytest.fixture
+def knowledge_base(monkeypatch):
+    stub = KnowledgeBaseStub()
+    monkeypatch.setattr(rag, "client", stub)
+    monkeypatch.setattr(rag, "RETRIEVAL_BACKEND", "knowledge_base")
+    monkeypatch.setattr(rag, "answer_cache", SemanticCache(EmbeddingStub()))
+    return stub
+
+
+def ask(**body):
+    response = rag.handler({"body": json.dumps(body)}, None)
+    return response["statusCode"], json.loads(response["body"])
+
+
+def test_retrieve_mode_returns_chunks_without_generating(knowledge_base):
+    status, result = ask(question="What is Tara?", mode="retrieve")
+
+    assert status == 200
+    assert result["chunks"][0]["text"] == "Tara is the O'Hara plantation."
+    assert [name for name, _ in knowledge_base.requests] == ["retrieve"]
+
+
+def test_similar_question_is_answered_from_the_cache(knowledge_base):
+    _, first = ask(question="What is Tara?", mode="cached")
+    _, second = ask(question="Tell me about Tara", mode="cached")
+
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["answer"] == first["answer"]
+    assert len(knowledge_base.requests) == 1
+
+
+def test_cache_miss_returns_the_session_to_continue(knowledge_base):
+    _, result = ask(question="What is Tara?", mode="cached")
+
+    assert result["sessionId"] == "session-1"
+
+
+def test_follow_up_question_bypasses_the_cache_and_keeps_the_session(knowledge_base):
+    ask(question="What is Tara?", mode="cached")
+
+    _, result = ask(question="What is Tara?", mode="cached", sessionId="session-1")
+
+    assert result["cached"] is False
+    assert result["sessionId"] == "session-1"
+    assert knowledge_base.requests[-1][1]["sessionId"] == "session-1"
+    assert len(knowledge_base.requests) == 2
+
+
+def test_unknown_mode_is_rejected(knowledge_base):
+    status, _ = ask(question="What is Tara?", mode="everything")
+
+    assert status == 400
+    assert knowledge_base.requests == []
+
+
+def test_local_backend_loads_the_vector_store_during_init(monkeypatch):
+    loaded = []
+    monkeypatch.setenv("RETRIEVAL_BACKEND", "local")
+    monkeypatch.setattr(local_store.LocalVectorStore, "from_s3", classmethod(lambda cls, *args: loaded.append(args) or cls))
+
+    try:
+        importlib.reload(rag)
+        assert len(loaded) == 1
+        assert rag.vector_store is local_store.LocalVectorStore
+    finally:
+        monkeypatch.undo()
+        importlib.reload(rag)
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+import rag
+import rag_stream
+
+TEXTS = ["Scarlett ", "survives ", "the war."]
+
+
+class SlowStreamClient:
+    """
+    retrieve_and_generate_stream whose events arrive with a blocking delay, like a boto3 EventStream.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def retrieve_and_generate_stream(self, **kwargs):
+        self.requests.append(kwargs)
+
+        def events():
+            for text in TEXTS:
+                time.sleep(0.1)
+                yield {"output": {"text": text}}
+            yield {"citation": {"retrievedReferences": []}}
+        return {"sessionId": kwargs.get("sessionId", "session-1"), "stream": events()}
+
+
+async def call(body: dict):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps(body).encode()}
+
+    async def send(message):
+        messages.append(message)
+
+    await rag_stream.app({"type": "http"}, receive, send)
+    return messages
+
+
+def events(messages):
+    return [
+        (body.split("\n")[0].removeprefix("event: "), json.loads(body.split("data: ")[1]))
+        for body in (message["body"].decode() for message in messages[1:])
+    ]
+
+
+def test_stream_sends_session_text_citations_then_metrics(monkeypatch):
+    monkeypatch.setattr(rag, "client", SlowStreamClient())
+
+    messages = asyncio.run(call({"question": "Who survives?"}))
+
+    assert messages[0]["status"] == 200
+    sent = events(messages)
+    assert sent[0] == ("session", {"sessionId": "session-1"})
+    assert [data["text"] for name, data in sent if name == "text"] == TEXTS
+    assert [name for name, _ in sent[-2:]] == ["citation", "metrics"]
+
+
+def test_follow_up_question_continues_the_session(monkeypatch):
+    client = SlowStreamClient()
+    monkeypatch.setattr(rag, "client", client)
+
+    asyncio.run(call({"question": "And then?", "sessionId": "session-7"}))
+
+    assert client.requests[0]["sessionId"] == "session-7"
+
+
+def test_concurrent_streams_do_not_block_each_other(monkeypatch):
+    monkeypatch.setattr(rag, "client", SlowStreamClient())
+
+    async def both():
+        return await asyncio.gather(*(call({"question": "Who survives?"}) for _ in range(2)))
+
+    started = time.perf_counter()
+    asyncio.run(both())
+
+    # Served one after the other they would take 2 * 3 * 0.1s
+    assert time.perf_counter() - started < 0.5
+
+
+def test_missing_question_is_rejected():
+    messages = asyncio.run(call({}))
+
+    assert messages[0]["status"] == 400
+
+
+class ConverseStreamStub:
+
+    def converse_stream(self, **kwargs):
+        self.messages = kwargs["messages"]
+        return {"stream": iter([{"contentBlockDelta": {"delta": {"text": text}}} for text in TEXTS])}
+
+
+class VectorStoreStub:
+
+    def search(self, query_embedding, k):
+        return [{"text": "Scarlett survives.", "score": 0.9, "location": "gwtw.txt"}]
+
+
+def test_local_backend_streams_from_the_local_store(monkeypatch):
+    bedrock = ConverseStreamStub()
+    monkeypatch.setattr(rag, "RETRIEVAL_BACKEND", "local")
+    monkeypatch.setattr(rag, "vector_store", VectorStoreStub())
+    monkeypatch.setattr(rag, "bedrock_client", bedrock)
+    monkeypatch.setattr(rag.local_store, "embed", lambda client, text: [1.0])
+    monkeypatch.setattr(rag, "client", None)
+
+    sent = events(asyncio.run(call({"question": "Who survives?"})))
+
+    assert sent[0] == ("session", {"sessionId": None})
+    assert [data["text"] for name, data in sent if name == "text"] == TEXTS
+    citation = next(data for name, data in sent if name == "citation")
+    assert citation["retrievedReferences"][0]["location"] == "gwtw.txt"
+    assert "Scarlett survives." in bedrock.messages[0]["content"][0]["text"]
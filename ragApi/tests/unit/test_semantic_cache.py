@@ -0,0 +1,72 @@
+import io
+import json
+import math
+
+import pytest
+
+from semantic_cache import SemanticCache
+
+
+class EmbeddingStub:
+
+    def __init__(self, embedding):
+        self.embedding = embedding
+        self.requests = []
+
+    def invoke_model(self, **kwargs):
+        self.requests.append(json.loads(kwargs["body"]))
+        return {"body": io.BytesIO(json.dumps({"embedding": self.embedding}).encode("utf-8"))}
+
+
+def unit(angle):
+    return [math.cos(angle), math.sin(angle)]
+
+
+def test_question_embedding_is_unit_length():
+    client = EmbeddingStub([3.0, 4.0])
+
+    embedding = SemanticCache(client).embed("What is Tara?")
+
+    assert list(embedding) == pytest.approx([0.6, 0.8])
+    assert client.requests == [{"inputText": "What is Tara?", "normalize": True}]
+
+
+def test_similar_question_above_the_threshold_is_a_hit():
+    cache = SemanticCache(None, threshold=0.9)
+    cache.store("What is Tara?", unit(0.0), "A plantation.")
+
+    answer, similarity = cache.lookup(unit(0.3))
+
+    assert answer == "A plantation."
+    assert similarity == pytest.approx(math.cos(0.3), abs=1e-6)
+
+
+def test_question_below_the_threshold_is_a_miss():
+    cache = SemanticCache(None, threshold=0.99)
+    cache.store("What is Tara?", unit(0.0), "A plantation.")
+
+    answer, similarity = cache.lookup(unit(0.3))
+
+    assert answer is None
+    assert similarity == pytest.approx(math.cos(0.3), abs=1e-6)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_least_recently_used_question_is_evicted():
+    cache = SemanticCache(None, threshold=0.99, max_entries=2)
+    cache.store("first", unit(0.0), "answer 1")
+    cache.store("second", unit(1.0), "answer 2")
+    cache.lookup(unit(0.0))
+
+    cache.store("third", unit(2.0), "answer 3")
+
+    assert cache.lookup(unit(1.0))[0] is None
+    assert cache.lookup(unit(0.0))[0] == "answer 1"
+    assert cache.lookup(unit(2.0))[0] == "answer 3"
+
+
+def test_empty_cache_is_a_miss():
+    answer, similarity = SemanticCache(None).lookup(unit(0.0))
+
+    assert answer is None
+    assert similarity == -1.0
@@ -0,0 +1,69 @@
+import boto3
+import pytest
+from botocore.stub import Stubber
+from moto import mock_aws
+
+import upload_assets
+
+BUCKET = "knowledge-base-assets"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def keys(s3):
+    return sorted(obj["Key"] for obj in s3.list_objects_v2(Bucket=BUCKET).get("Contents", []))
+
+
+def test_sync_uploads_only_new_or_changed_files(s3, tmp_path, capsys):
+    (tmp_path / "a.txt").write_text("first")
+    (tmp_path / "b.txt").write_text("second")
+    upload_assets.upload_to_s3(BUCKET, str(tmp_path), sync=True)
+    capsys.readouterr()
+
+    (tmp_path / "b.txt").write_text("second, edited")
+    upload_assets.upload_to_s3(BUCKET, str(tmp_path), sync=True)
+
+    uploaded = [line for line in capsys.readouterr().out.splitlines() if line.startswith("Uploaded:")]
+    assert len(uploaded) == 1 and "b.txt" in uploaded[0]
+    assert s3.get_object(Bucket=BUCKET, Key="b.txt")["Body"].read() == b"second, edited"
+
+
+def test_delete_removes_objects_missing_locally(s3, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key="stale.txt", Body=b"old")
+    (tmp_path / "a.txt").write_text("first")
+
+    upload_assets.upload_to_s3(BUCKET, str(tmp_path), sync=True, delete=True)
+
+    assert keys(s3) == ["a.txt"]
+
+
+def test_client_pool_fits_every_part_upload(s3, tmp_path, monkeypatch):
+    clients = []
+    create = boto3.client
+    monkeypatch.setattr(upload_assets.boto3, "client", lambda *args, **kwargs: clients.append(create(*args, **kwargs)) or clients[-1])
+    (tmp_path / "a.txt").write_text("first")
+
+    upload_assets.upload_to_s3(BUCKET, str(tmp_path), workers=8)
+
+    assert clients[0].meta.config.max_pool_connections == 8 * upload_assets.TRANSFER_CONFIG.max_concurrency
+
+
+def test_failed_deletes_are_reported():
+    client = boto3.client("s3", region_name="us-east-1")
+    with Stubber(client) as stubber:
+        stubber.add_response("delete_objects", {
+            "Errors": [{"Key": "locked.txt", "Code": "AccessDenied", "Message": "Access Denied"}]
+        })
+
+        failed = upload_assets.delete_objects(client, BUCKET, ["gone.txt", "locked.txt"])
+
+    assert failed == ["locked.txt"]
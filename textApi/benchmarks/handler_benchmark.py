@@ -0,0 +1,75 @@
+"""
+Per-invocation overhead of the summary handler, with Bedrock answering in process.
+
+    python benchmarks/handler_benchmark.py [--iterations 2000] [--case handler] [--update-baseline]
+
+Covers the request path stage by stage (event JSON parse, prompt build, cache key, converse
+response parse) and end to end (cache bypass, cache hit, map-reduce). Results are compared with
+handler_baseline.json next to this file; see benchmarks/microbench.py at the repository root
+for the metrics and tolerances.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# The handlers import their neighbours as top-level modules, as in the deployed asset. The shared
+# harness lives in the top-level benchmarks folder, so neither ships in a Lambda zip.
+sys.path[:0] = [os.path.join(HERE, "..", "services"), os.path.join(HERE, "..", "..", "benchmarks")]
+import microbench  # noqa: E402
+
+# The stub serves every catalog model; a fresh model list keeps summary's init from listing them on Bedrock
+os.environ["MODEL_LIST_CACHE"] = os.path.join(tempfile.gettempdir(), "benchmark_foundation_models.json")
+import model_router  # noqa: E402
+with open(model_router.MODEL_LIST_CACHE, "w") as f:
+    json.dump([model_router.base_model_id(model) for model in model_router.MODELS], f)
+import summary  # noqa: E402
+
+BASELINE = os.path.join(HERE, "handler_baseline.json")
+SENTENCE = "The little prince left his asteroid to learn how grown-ups live on the other planets. "
+CONVERSE_RESPONSE = {
+    "output": {"message": {"role": "assistant", "content": [{"text": "1. He travels. 2. He learns."}]}},
+    "usage": {"inputTokens": 420, "outputTokens": 12, "totalTokens": 432},
+    "metrics": {"latencyMs": 0},
+    "stopReason": "end_turn"
+}
+
+
+def event(text: str, points: int = 3, bypass: bool = True, **query):
+    return {
+        "body": json.dumps({"text": text}),
+        "headers": {"x-cache-bypass": "true"} if bypass else {},
+        "queryStringParameters": {"points": str(points), **query}
+    }
+
+
+def cases():
+    client = microbench.stub_client("bedrock-runtime", lambda request: microbench.json_response(CONVERSE_RESPONSE))
+    summary.client = client
+    summary.router.client = client
+
+    text = SENTENCE * 25
+    long_text = SENTENCE * 250
+    request = event(text)
+    cached_request = event(text, bypass=False)
+    map_reduce_request = event(long_text)
+    conversation = summary.get_conversation(text, "3")
+    prompt = json.dumps(conversation)
+    raw_response = json.dumps(CONVERSE_RESPONSE)
+
+    return {
+        "json_parse": lambda: json.loads(request["body"]),
+        "prompt_build": lambda: summary.get_conversation(text, "3"),
+        "cache_key": lambda: summary.response_cache.cache_key(summary.model_id, prompt, summary.inference_config),
+        "response_parse": lambda: json.loads(raw_response)["output"]["message"]["content"][0]["text"],
+        "converse": lambda: summary.converse(conversation),
+        "handler": lambda: summary.handler(request, None),
+        "handler_cache_hit": lambda: summary.handler(cached_request, None),
+        "handler_map_reduce": lambda: summary.handler(map_reduce_request, None)
+    }
+
+
+if __name__ == "__main__":
+    microbench.run(cases(), BASELINE, "Measure per-invocation overhead of the summary handler")
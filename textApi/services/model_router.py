@@ -0,0 +1,206 @@
+"""
+Per-request model routing for converse calls.
+
+Candidates are filtered by context window and output limit, then ordered: short, simple
+requests go to the fastest cheap healthy model, longer ones to the cheapest healthy model of at
+least ROUTER_MIN_QUALITY.
+Health comes from a rolling window of latencies and throttles per model; a model without
+measurements yet is ranked by its typical catalog latency. A throttled call falls through to the
+next candidate. Every decision is logged as a model_route record.
+"""
+
+import bootstrap
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from botocore.exceptions import ClientError
+
+import prompt_cache
+
+CHARS_PER_TOKEN = 4
+AWS_REGION = "us-west-2"
+
+# cost: price relative to Nova Lite, quality: relative capability, higher is better,
+# typicalLatencyMs: p95 assumed for a short summary until the model has been measured
+MODELS = {
+    "us.amazon.nova-lite-v1:0": {"contextTokens": 300_000, "maxOutputTokens": 5_000, "cost": 1, "quality": 2, "typicalLatencyMs": 1_500},
+    "amazon.titan-text-express-v1": {"contextTokens": 8_000, "maxOutputTokens": 8_192, "cost": 3, "quality": 1, "typicalLatencyMs": 3_000},
+    "us.anthropic.claude-3-5-haiku-20241022-v1:0": {"contextTokens": 200_000, "maxOutputTokens": 8_192, "cost": 13, "quality": 3, "typicalLatencyMs": 2_500},
+    "us.anthropic.claude-3-5-sonnet-20241022-v2:0": {"contextTokens": 200_000, "maxOutputTokens": 8_192, "cost": 50, "quality": 4, "typicalLatencyMs": 5_000}
+}
+ROUTER_MODELS = [model for model in os.environ.get("ROUTER_MODELS", ",".join(MODELS)).split(",") if model]
+
+# Requests up to these sizes count as simple and go to the cheapest healthy model
+SIMPLE_INPUT_TOKENS = int(os.environ.get("ROUTER_SIMPLE_INPUT_TOKENS", "2000"))
+SIMPLE_OUTPUT_TOKENS = int(os.environ.get("ROUTER_SIMPLE_OUTPUT_TOKENS", "512"))
+CHEAP_COST = float(os.environ.get("ROUTER_CHEAP_COST", "3"))
+MIN_QUALITY = int(os.environ.get("ROUTER_MIN_QUALITY", "2"))
+# A model above either limit in its rolling window is tried only after the healthy ones
+MAX_P95_MS = float(os.environ.get("ROUTER_MAX_P95_MS", "10000"))
+MAX_THROTTLE_RATE = float(os.environ.get("ROUTER_MAX_THROTTLE_RATE", "0.2"))
+WINDOW_SIZE = int(os.environ.get("ROUTER_WINDOW_SIZE", "100"))
+WINDOW_SECONDS = int(os.environ.get("ROUTER_WINDOW_SECONDS", "300"))
+MODEL_LIST_TTL = int(os.environ.get("MODEL_LIST_TTL_SECONDS", "86400"))
+MODEL_LIST_CACHE = os.environ.get("MODEL_LIST_CACHE", "/tmp/foundation_models.json")
+
+THROTTLING_ERRORS = ("ThrottlingException", "ServiceUnavailableException", "ModelNotReadyException")
+
+
+class ModelStats:
+    """
+    Rolling window of (time, latency, throttled) samples for one model.
+    """
+
+    def __init__(self, size=WINDOW_SIZE, seconds=WINDOW_SECONDS):
+        self.seconds = seconds
+        self.samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, throttled: bool = False):
+        with self._lock:
+            self.samples.append((time.time(), latency_ms, throttled))
+
+    def snapshot(self):
+        cutoff = time.time() - self.seconds
+        with self._lock:
+            samples = [sample for sample in self.samples if sample[0] >= cutoff]
+        latencies = sorted(latency for _, latency, throttled in samples if not throttled)
+        return {
+            "p95Ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else None,
+            "throttleRate": sum(throttled for _, _, throttled in samples) / len(samples) if samples else 0.0,
+            "samples": len(samples)
+        }
+
+
+class ModelRouter:
+
+    def __init__(self, client, models=ROUTER_MODELS, catalog=MODELS):
+        self.client = client
+        self.catalog = catalog
+        self.models = [model for model in models if model in catalog]
+        self.stats = {model: ModelStats() for model in self.models}
+
+    def validate(self, available):
+        """
+        Drop candidates whose base model is not in the available foundation model ids.
+        Call it once during init with available_models(), so no request waits for the listing.
+        """
+        if available is None:
+            return
+        missing = [model for model in self.models if base_model_id(model) not in available]
+        if missing:
+            print(json.dumps({"metric": "model_router_unavailable", "models": missing}))
+        self.models = [model for model in self.models if model not in missing]
+
+    def candidates(self, input_tokens: int, max_tokens: int):
+        """
+        Models that can take the request, best first, with the health snapshot used to order them.
+        """
+        simple = input_tokens <= SIMPLE_INPUT_TOKENS and max_tokens <= SIMPLE_OUTPUT_TOKENS
+        ranked = []
+        for model in self.models:
+            spec = self.catalog[model]
+            if input_tokens + max_tokens > spec["contextTokens"] or max_tokens > spec["maxOutputTokens"]:
+                continue
+            health = self.stats[model].snapshot()
+            measured = health["p95Ms"] is not None
+            unhealthy = health["throttleRate"] > MAX_THROTTLE_RATE or (measured and health["p95Ms"] > MAX_P95_MS)
+            # Unmeasured models must not look faster than every measured one
+            p95 = health["p95Ms"] if measured else spec.get("typicalLatencyMs", float("inf"))
+            if simple:
+                key = (unhealthy, spec["cost"] > CHEAP_COST, p95, spec["cost"])
+            else:
+                key = (unhealthy, spec["quality"] < MIN_QUALITY, spec["cost"], p95)
+            ranked.append((key, model, health))
+        ranked.sort(key=lambda item: item[0])
+        return simple, [(model, health) for _, model, health in ranked]
+
+    def converse(self, messages, inference_config: dict, **kwargs):
+        """
+        Send the conversation to the first candidate that does not throttle.
+        Returns the converse response with the chosen model id added under "modelId".
+        """
+        input_tokens = sum(
+            len(block.get("text", "")) for message in messages for block in message["content"]
+        ) // CHARS_PER_TOKEN
+        max_tokens = inference_config.get("maxTokens", SIMPLE_OUTPUT_TOKENS)
+        simple, candidates = self.candidates(input_tokens, max_tokens)
+        if not candidates:
+            raise ValueError(f"no model takes {input_tokens} input and {max_tokens} output tokens")
+
+        attempts = []
+        for model, health in candidates:
+            started = time.perf_counter()
+            try:
+                response = self.client.converse(
+                    modelId=model,
+                    messages=prompt_cache.for_model(messages, model),
+                    inferenceConfig=inference_config,
+                    **kwargs
+                )
+            except ClientError as e:
+                code = e.response["Error"]["Code"]
+                if code not in THROTTLING_ERRORS:
+                    raise
+                self.stats[model].record(_elapsed_ms(started), throttled=True)
+                attempts.append({"modelId": model, "error": code})
+                continue
+            latency_ms = _elapsed_ms(started)
+            self.stats[model].record(latency_ms)
+            attempts.append({"modelId": model, "latencyMs": latency_ms})
+            self._log(input_tokens, max_tokens, simple, candidates, attempts, model)
+            return {**response, "modelId": model}
+
+        self._log(input_tokens, max_tokens, simple, candidates, attempts, None)
+        raise RuntimeError(f"every candidate model throttled: {', '.join(model for model, _ in candidates)}")
+
+    def _log(self, input_tokens, max_tokens, simple, candidates, attempts, chosen):
+        print(json.dumps({
+            "metric": "model_route",
+            "inputTokens": input_tokens,
+            "maxTokens": max_tokens,
+            "simple": simple,
+            "candidates": [{"modelId": model, **health} for model, health in candidates],
+            "attempts": attempts,
+            "chosen": chosen
+        }))
+
+
+def base_model_id(model_id: str):
+    """
+    Foundation model id behind a cross-region inference profile id such as us.amazon.nova-lite-v1:0.
+    """
+    prefix, _, rest = model_id.partition(".")
+    return rest if prefix in ("us", "eu", "apac", "us-gov") else model_id
+
+
+def available_models():
+    """
+    Ids of the foundation models available in the region, or None when they cannot be listed.
+    The list rarely changes, so it is kept in /tmp for MODEL_LIST_TTL seconds across cold starts.
+    """
+    try:
+        if time.time() - os.path.getmtime(MODEL_LIST_CACHE) < MODEL_LIST_TTL:
+            with open(MODEL_LIST_CACHE) as f:
+                return set(json.load(f))
+    except (OSError, ValueError):
+        pass
+    try:
+        summaries = bootstrap.client("bedrock", AWS_REGION).list_foundation_models()["modelSummaries"]
+    except Exception as e:
+        print(json.dumps({"metric": "model_router_list_failed", "error": str(e)}))
+        return None
+    model_ids = sorted(summary["modelId"] for summary in summaries)
+    try:
+        with open(MODEL_LIST_CACHE, "w") as f:
+            json.dump(model_ids, f)
+    except OSError:
+        pass
+    return set(model_ids)
+
+
+def _elapsed_ms(started: float):
+    return round((time.perf_counter() - started) * 1000, 1)
@@ -0,0 +1,86 @@
+import json
+import os
+
+# Set PROMPT_CACHING=false to send prompts without cache checkpoints
+ENABLED = os.environ.get("PROMPT_CACHING", "true").lower() == "true"
+CHARS_PER_TOKEN = 4
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+# Models that accept cachePoint blocks and the fewest tokens a checkpoint may cover.
+# Prefixes match both foundation model ids and cross-region inference profiles.
+MIN_CACHE_TOKENS = {
+    "amazon.nova-micro": 1000,
+    "amazon.nova-lite": 1000,
+    "amazon.nova-pro": 1000,
+    "amazon.nova-premier": 1000,
+    "anthropic.claude-3-5-haiku": 2048,
+    "anthropic.claude-3-7-sonnet": 1024,
+    "anthropic.claude-sonnet-4": 1024,
+    "anthropic.claude-opus-4": 1024
+}
+
+
+def min_cache_tokens(model_id: str):
+    """
+    Minimum checkpoint size for the model, or None when it does not support prompt caching.
+    """
+    base_id = model_id.split(":")[0].split("/")[-1]
+    for prefix, tokens in MIN_CACHE_TOKENS.items():
+        if prefix in base_id:
+            return tokens
+    return None
+
+
+def content(model_id: str, stable_text: str, variable_text: str):
+    """
+    Message content with the stable text first and the variable text last. A cachePoint goes
+    between them when the model supports caching and the stable text is long enough to be cached,
+    so repeat requests over the same document only process the variable part.
+    """
+    blocks = [{"text": stable_text}]
+    minimum = min_cache_tokens(model_id)
+    if ENABLED and minimum and len(stable_text) // CHARS_PER_TOKEN >= minimum:
+        blocks.append(CACHE_POINT)
+    blocks.append({"text": variable_text})
+    return blocks
+
+
+def for_model(messages, model_id: str):
+    """
+    The messages with the cachePoint blocks the model cannot use removed: all of them for models
+    without prompt caching, and those covering fewer tokens than the model's minimum.
+    """
+    minimum = min_cache_tokens(model_id)
+    adapted = []
+    for message in messages:
+        blocks, covered = [], 0
+        for block in message["content"]:
+            if "cachePoint" in block:
+                if not (ENABLED and minimum and covered // CHARS_PER_TOKEN >= minimum):
+                    continue
+            else:
+                covered += len(block.get("text", ""))
+            blocks.append(block)
+        adapted.append({**message, "content": blocks})
+    return adapted
+
+
+def usage_metrics(usage: dict):
+    return {
+        "inputTokens": usage.get("inputTokens", 0),
+        "outputTokens": usage.get("outputTokens", 0),
+        "cacheReadInputTokens": usage.get("cacheReadInputTokens", 0),
+        "cacheWriteInputTokens": usage.get("cacheWriteInputTokens", 0)
+    }
+
+
+def log_usage(model_id: str, response: dict):
+    """
+    Log token usage, including prompt cache reads and writes, for a converse response.
+    """
+    print(json.dumps({
+        "metric": "converse_usage",
+        "modelId": model_id,
+        "latencyMs": response.get("metrics", {}).get("latencyMs"),
+        **usage_metrics(response.get("usage", {}))
+    }))
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+DEFAULT_TTL = int(os.environ.get("CACHE_TTL_SECONDS", "3600"))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "256"))
+BYPASS_HEADER = "x-cache-bypass"
+# The shared tier is optional: these failures are logged and served as a miss instead of failing the request
+SHARED_ERRORS = (ClientError, BotoCoreError, sqlite3.Error)
+
+
+class ResponseCache:
+    """
+    Two-tier cache for deterministic model responses. The in-memory LRU tier lives at module
+    level, so it survives warm Lambda invocations; the optional shared tier (DynamoDB or
+    SQLite) is shared across containers and runs. Every lookup logs a response_cache record
+    with the running hit rate.
+    """
+
+    def __init__(self, shared=None, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.shared = shared
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._log("memory")
+                return entry[1]
+            self._entries.pop(key, None)
+        value = None
+        if self.shared:
+            try:
+                value = self.shared.get(key)
+            except SHARED_ERRORS as e:
+                self._log_error("get", e)
+        if value is None:
+            self.misses += 1
+            self._log(None)
+            return None
+        self.hits += 1
+        self._log("shared")
+        self._remember(key, value, now + self.ttl)
+        return value
+
+    def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        if self.shared:
+            try:
+                self.shared.set(key, value, expires_at)
+            except SHARED_ERRORS as e:
+                self._log_error("set", e)
+
+    def _log(self, tier):
+        requests = self.hits + self.misses
+        print(json.dumps({
+            "metric": "response_cache",
+            "hit": tier is not None,
+            "tier": tier,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / requests, 3) if requests else 0.0,
+            "sharedErrors": self.errors
+        }))
+
+    def _log_error(self, operation, error):
+        self.errors += 1
+        print(json.dumps({"metric": "response_cache_error", "operation": operation, "error": str(error)}))
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SqliteStore:
+    """
+    Shared tier backed by a local SQLite file, a stand-in for DynamoDB in local runs and tests.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (cache_key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM responses WHERE cache_key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, response, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._connection.commit()
+
+
+class DynamoDBStore:
+    """
+    Shared tier backed by a DynamoDB table with partition key cache_key and TTL attribute expires_at.
+    """
+
+    def __init__(self, table_name: str):
+        import boto3
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    def get(self, key: str):
+        item = self.table.get_item(Key={"cache_key": key}).get("Item")
+        # DynamoDB deletes expired items lazily, so expiry is checked here as well
+        if item and int(item["expires_at"]) > time.time():
+            return item["response"]
+        return None
+
+    def set(self, key: str, value: str, expires_at: float):
+        self.table.put_item(Item={"cache_key": key, "response": value, "expires_at": int(expires_at)})
+
+
+def from_environment():
+    """
+    Cache with DynamoDB (CACHE_TABLE_NAME) or SQLite (CACHE_SQLITE_PATH) as the shared tier, if configured.
+    """
+    shared = None
+    if os.environ.get("CACHE_TABLE_NAME"):
+        shared = DynamoDBStore(os.environ["CACHE_TABLE_NAME"])
+    elif os.environ.get("CACHE_SQLITE_PATH"):
+        shared = SqliteStore(os.environ["CACHE_SQLITE_PATH"])
+    return ResponseCache(shared)
+
+
+def cache_key(model_id: str, prompt: str, config: dict):
+    normalized_prompt = " ".join(prompt.split())
+    payload = json.dumps({"modelId": model_id, "prompt": normalized_prompt, "config": config}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def should_bypass(event):
+    headers = {name.lower(): value for name, value in (event.get("headers") or {}).items()}
+    return headers.get(BYPASS_HEADER, "").lower() in ("1", "true") or "no-cache" in headers.get("cache-control", "").lower()
@@ -1,24 +1,70 @@
-import boto3
+import bootstrap
 import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import model_router
+import prompt_cache
+import response_cache
 
 AWS_REGION = "us-west-2"
-client = boto3.client(service_name="bedrock-runtime", region_name=AWS_REGION)
+client = bootstrap.client("bedrock-runtime", AWS_REGION)
 model_id = "us.amazon.nova-lite-v1:0"
+inference_config = {"maxTokens": 512, "temperature": 0, "topP": 1}
+cache = response_cache.from_environment()
+# With routing on, model_id is only the default for streaming; converse picks a model per request
+MODEL_ROUTING = os.environ.get("MODEL_ROUTING", "true").lower() == "true"
+router = model_router.ModelRouter(client)
+if MODEL_ROUTING:
+    # During init, so the model listing never adds to a request
+    router.validate(model_router.available_models())
+
+# Texts estimated above CHUNK_TOKENS are summarized with map-reduce
+CHUNK_TOKENS = int(os.environ.get("CHUNK_TOKENS", "3000"))
+MAP_CONCURRENCY = int(os.environ.get("MAP_CONCURRENCY", "4"))
+# Upper bounds for the chunkTokens and concurrency query parameters
+MAX_CHUNK_TOKENS = 100_000
+MAX_CONCURRENCY = 16
+CHARS_PER_TOKEN = 4
 
 
+@bootstrap.instrument
 def handler(event, context):
     body = json.loads(event["body"])
     text = body.get("text")
-    points = event["queryStringParameters"]["points"]
+    query = event.get("queryStringParameters") or {}
+    points = query.get("points")
     if text and points:
-        response = client.converse(
-            modelId=model_id,
-            messages=get_conversation(text, points),
-            inferenceConfig={"maxTokens": 512, "temperature": 0, "topP": 1}
-        )
-        result = response["output"]["message"]["content"][0]["text"]
+        try:
+            chunk_tokens = int_parameter(query, "chunkTokens", CHUNK_TOKENS, MAX_CHUNK_TOKENS)
+            concurrency = int_parameter(query, "concurrency", MAP_CONCURRENCY, MAX_CONCURRENCY)
+        except ValueError as e:
+            return {
+                "statusCode": 400,
+                "body": json.dumps({"error": str(e)})
+            }
+        map_reduce = query.get("mode") == "map_reduce" or estimate_tokens(text) > chunk_tokens
+        # Map-reduce output depends on how the text was chunked, so the chunk size is part of the key
+        key_config = {**inference_config, "chunkTokens": chunk_tokens} if map_reduce else inference_config
+        key = response_cache.cache_key(cache_model_id(), json.dumps(get_conversation(text, points)), key_config)
+        bypass = response_cache.should_bypass(event)
+        result = None if bypass else cache.get(key)
+        cache_status = "BYPASS" if bypass else ("HIT" if result is not None else "MISS")
+        if result is None:
+            if map_reduce:
+                result = summarize_map_reduce(
+                    text,
+                    points,
+                    chunk_tokens=chunk_tokens,
+                    concurrency=concurrency
+                )
+            else:
+                result = converse(get_conversation(text, points))
+            cache.set(key, result)
         return {
             "statusCode": 200,
+            "headers": {"X-Cache": cache_status},
             "body": json.dumps({
                 "summary": result
             })
@@ -30,9 +76,104 @@ def handler(event, context):
         })
     }
 
+def cache_model_id():
+    """
+    Model part of the cache key: a routed summary may come from any candidate, so routed and
+    single-model summaries never share an entry.
+    """
+    if MODEL_ROUTING:
+        return "router:" + ",".join(router.models)
+    return model_id
+
+def int_parameter(query: dict, name: str, default: int, maximum: int):
+    """
+    Integer query parameter between 1 and maximum, or default when absent.
+    Raises ValueError with a message for the caller otherwise.
+    """
+    value = query.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if not 1 <= number <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return number
+
+def converse(messages):
+    if MODEL_ROUTING:
+        response = router.converse(messages, inference_config)
+    else:
+        response = client.converse(
+            modelId=model_id,
+            messages=messages,
+            inferenceConfig=inference_config
+        )
+    prompt_cache.log_usage(response.get("modelId", model_id), response)
+    return response["output"]["message"]["content"][0]["text"]
+
+def summarize_map_reduce(text: str, points: str, chunk_tokens: int = CHUNK_TOKENS, concurrency: int = MAP_CONCURRENCY):
+    """
+    Summarize each chunk concurrently, then merge the partial summaries into the requested points.
+    Latency follows the slowest chunk plus one merge call instead of the whole document.
+    """
+    chunks = split_text(text, chunk_tokens)
+    if len(chunks) == 1:
+        return converse(get_conversation(text, points))
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks)))) as executor:
+        partial_summaries = list(executor.map(lambda chunk: converse(get_chunk_conversation(chunk)), chunks))
+    return converse(get_conversation("\n\n".join(partial_summaries), points))
+
+def estimate_tokens(text: str):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def split_text(text: str, chunk_tokens: int = CHUNK_TOKENS):
+    """
+    Pack paragraphs, then sentences, then words into chunks of at most chunk_tokens estimated tokens.
+    """
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    if max_chars < 1:
+        raise ValueError("chunk_tokens must be at least 1")
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            pieces.append(sentence)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 1 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
 def get_conversation(text: str, points: str):
+    # The text is the stable prefix; only the requested number of points varies between calls
+    return [{
+        "role": "user",
+        "content": prompt_cache.content(
+            model_id,
+            f"Text: {text} \n",
+            f"From the text above, summarize the story in {points} points.\n"
+        ),
+    }]
+
+def get_chunk_conversation(text: str):
     user_message = f"""Text: {text} \n
-        From the text above, summarize the story in {points} points.\n
+        The text above is one section of a longer story. Summarize the key events and ideas of this section in a short paragraph.\n
     """
     return [{
         "role": "user",
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+import prompt_cache
+from summary import client, model_id, inference_config, get_conversation
+
+
+def stream_summary(text: str, points: str, metrics: dict = None):
+    """
+    Yield summary text deltas as converse_stream produces them.
+    When the stream ends, time-to-first-token and throughput are written to metrics.
+    """
+    started = time.perf_counter()
+    first_token_at = None
+    usage = {}
+    response = client.converse_stream(
+        modelId=model_id,
+        messages=get_conversation(text, points),
+        inferenceConfig=inference_config
+    )
+    for event in response["stream"]:
+        if "contentBlockDelta" in event:
+            delta = event["contentBlockDelta"]["delta"].get("text")
+            if delta:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                yield delta
+        elif "metadata" in event:
+            usage = event["metadata"].get("usage", {})
+
+    finished = time.perf_counter()
+    output_tokens = usage.get("outputTokens", 0)
+    generation_seconds = finished - (first_token_at or finished)
+    result = {
+        "timeToFirstTokenMs": round(((first_token_at or finished) - started) * 1000, 1),
+        "totalMs": round((finished - started) * 1000, 1),
+        **prompt_cache.usage_metrics(usage),
+        "tokensPerSecond": round(output_tokens / generation_seconds, 1) if generation_seconds else None
+    }
+    print(json.dumps({"metric": "summary_stream", "modelId": model_id, **result}))
+    if metrics is not None:
+        metrics.update(result)
+
+
+async def app(scope, receive, send):
+    """
+    ASGI app that streams the summary as server-sent events. Run it locally with
+    `uvicorn summary_stream:app`, or behind Lambda response streaming through the
+    Lambda Web Adapter. Takes the same body and points query parameter as summary.handler.
+    """
+    if scope["type"] != "http":
+        return
+
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    text = json.loads(body or b"{}").get("text")
+    points = parse_qs(scope.get("query_string", b"").decode()).get("points", [None])[0]
+    if not (text and points):
+        await send({"type": "http.response.start", "status": 400, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps({"error": "text and points required"}).encode()})
+        return
+
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")]
+    })
+    metrics = {}
+    # Each delta is flushed to the client as soon as it is read
+    async for delta in in_thread(stream_summary(text, points, metrics)):
+        await send({"type": "http.response.body", "body": sse("delta", {"text": delta}), "more_body": True})
+    await send({"type": "http.response.body", "body": sse("metrics", metrics)})
+
+
+async def in_thread(iterator):
+    """
+    Iterate a blocking iterator, such as a boto3 event stream, from async code. Each item is read
+    in a worker thread, so the event loop keeps serving other connections while one waits on Bedrock.
+    """
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def sse(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
@@ -0,0 +1,13 @@
+import json
+import os
+import sys
+import tempfile
+
+# The Lambda code imports its neighbours as top-level modules, as it does in the deployed asset
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "services")))
+
+# summary validates the routing candidates during init; a fresh model list keeps that from calling Bedrock
+os.environ["MODEL_LIST_CACHE"] = os.path.join(tempfile.gettempdir(), "textapi_test_foundation_models.json")
+import model_router  # noqa: E402
+with open(model_router.MODEL_LIST_CACHE, "w") as f:
+    json.dump([model_router.base_model_id(model) for model in model_router.MODELS], f)
@@ -0,0 +1,24 @@
+import json
+from types import SimpleNamespace
+
+import bootstrap
+
+
+def test_clients_are_reused_per_service_and_region():
+    first = bootstrap.client("bedrock-runtime", "us-west-2")
+
+    assert bootstrap.client("bedrock-runtime", "us-west-2") is first
+    assert bootstrap.client("bedrock-runtime", "us-east-1") is not first
+
+
+def test_only_the_first_invocation_logs_cold_start(monkeypatch, capsys):
+    monkeypatch.setattr(bootstrap, "_cold", True)
+    handler = bootstrap.instrument(lambda event, context: {"statusCode": 200})
+    context = SimpleNamespace(function_name="summary")
+
+    assert handler({}, context) == {"statusCode": 200}
+    handler({}, context)
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["metric"] for record in records] == ["cold_start"]
+    assert records[0]["function"] == "summary"
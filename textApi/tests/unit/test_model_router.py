@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+import model_router
+import summary
+
+NOVA = "us.amazon.nova-lite-v1:0"
+TITAN = "amazon.titan-text-express-v1"
+HAIKU = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+SONNET = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+RESPONSE = {"output": {"message": {"role": "assistant", "content": [{"text": "summary"}]}}, "usage": {}}
+
+
+class ConverseStub:
+    """
+    converse that throttles the given models and answers for every other one.
+    """
+
+    def __init__(self, throttled=()):
+        self.throttled = set(throttled)
+        self.calls = []
+
+    def converse(self, **kwargs):
+        self.calls.append(kwargs["modelId"])
+        if kwargs["modelId"] in self.throttled:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "Converse")
+        return RESPONSE
+
+
+def ranked(router, input_tokens=100, max_tokens=256):
+    return [model for model, _ in router.candidates(input_tokens, max_tokens)[1]]
+
+
+def messages(text="A short story."):
+    return [{"role": "user", "content": [{"text": text}]}]
+
+
+def test_simple_request_goes_to_the_cheap_fast_model():
+    router = model_router.ModelRouter(ConverseStub())
+
+    assert ranked(router)[0] == NOVA
+
+
+def test_unmeasured_model_is_ranked_by_its_typical_latency():
+    router = model_router.ModelRouter(ConverseStub())
+    # Nova was measured slower than Titan's typical latency, Titan was never called
+    for _ in range(10):
+        router.stats[NOVA].record(4_000)
+
+    assert ranked(router)[:2] == [TITAN, NOVA]
+
+
+def test_model_without_a_typical_latency_is_tried_after_measured_ones():
+    catalog = {NOVA: model_router.MODELS[NOVA], "custom-model": {**model_router.MODELS[NOVA]}}
+    del catalog["custom-model"]["typicalLatencyMs"]
+    router = model_router.ModelRouter(ConverseStub(), models=["custom-model", NOVA], catalog=catalog)
+    router.stats[NOVA].record(9_000)
+
+    assert ranked(router) == [NOVA, "custom-model"]
+
+
+def test_long_request_goes_to_a_model_of_the_minimum_quality():
+    router = model_router.ModelRouter(ConverseStub())
+
+    models = ranked(router, input_tokens=20_000, max_tokens=2_000)
+
+    assert TITAN not in models
+    assert models[0] == NOVA
+
+
+def test_throttled_model_falls_through_to_the_next_candidate():
+    client = ConverseStub(throttled=[NOVA])
+    router = model_router.ModelRouter(client)
+
+    response = router.converse(messages(), {"maxTokens": 256})
+
+    assert response["modelId"] == client.calls[1] != NOVA
+    assert router.stats[NOVA].snapshot()["throttleRate"] == 1.0
+
+
+def test_unavailable_models_are_dropped_by_validation():
+    router = model_router.ModelRouter(ConverseStub())
+
+    router.validate({model_router.base_model_id(NOVA), model_router.base_model_id(HAIKU)})
+
+    assert router.models == [NOVA, HAIKU]
+
+
+def test_summary_validates_its_candidates_during_init():
+    # The test model list holds every catalog model, see conftest.py
+    assert summary.router.models == model_router.ROUTER_MODELS
+
+
+def test_routed_and_single_model_summaries_do_not_share_a_cache_key(monkeypatch):
+    monkeypatch.setattr(summary, "MODEL_ROUTING", True)
+    routed = summary.cache_model_id()
+    monkeypatch.setattr(summary, "MODEL_ROUTING", False)
+
+    assert summary.cache_model_id() == summary.model_id
+    assert routed != summary.model_id
+    assert routed.startswith("router:")
+
+
+def test_changing_the_candidates_changes_the_cache_key(monkeypatch):
+    monkeypatch.setattr(summary, "MODEL_ROUTING", True)
+    before = summary.cache_model_id()
+    monkeypatch.setattr(summary.router, "models", [NOVA, SONNET])
+
+    assert summary.cache_model_id() != before
+
+
+@pytest.mark.parametrize("model_id, base", [(NOVA, "amazon.nova-lite-v1:0"), (TITAN, TITAN)])
+def test_inference_profile_ids_map_to_their_base_model(model_id, base):
+    assert model_router.base_model_id(model_id) == base
+
+
+def test_model_list_is_reused_from_the_cache_file(tmp_path, monkeypatch):
+    cache_file = tmp_path / "models.json"
+    cache_file.write_text(json.dumps([TITAN]))
+    monkeypatch.setattr(model_router, "MODEL_LIST_CACHE", str(cache_file))
+    monkeypatch.setattr(model_router.bootstrap, "client", pytest.fail)
+
+    assert model_router.available_models() == {TITAN}
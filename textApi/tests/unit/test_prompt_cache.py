@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import prompt_cache
+import summary
+
+NOVA = "us.amazon.nova-lite-v1:0"
+HAIKU = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+TITAN = "amazon.titan-text-express-v1"
+LONG_TEXT = "x" * 4 * 1500
+SHORT_TEXT = "x" * 4 * 100
+
+
+@pytest.mark.parametrize("model_id, minimum", [(NOVA, 1000), (HAIKU, 2048), (TITAN, None)])
+def test_minimum_checkpoint_size_follows_the_model(model_id, minimum):
+    assert prompt_cache.min_cache_tokens(model_id) == minimum
+
+
+def test_long_stable_text_gets_a_cache_point_before_the_variable_text():
+    blocks = prompt_cache.content(NOVA, LONG_TEXT, "Summarize in 3 points.")
+
+    assert blocks == [{"text": LONG_TEXT}, prompt_cache.CACHE_POINT, {"text": "Summarize in 3 points."}]
+
+
+@pytest.mark.parametrize("model_id, text", [(NOVA, SHORT_TEXT), (TITAN, LONG_TEXT)])
+def test_no_cache_point_when_it_cannot_be_used(model_id, text):
+    blocks = prompt_cache.content(model_id, text, "Summarize.")
+
+    assert prompt_cache.CACHE_POINT not in blocks
+
+
+def test_cache_point_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(prompt_cache, "ENABLED", False)
+
+    assert prompt_cache.CACHE_POINT not in prompt_cache.content(NOVA, LONG_TEXT, "Summarize.")
+
+
+def test_routed_messages_drop_cache_points_the_model_cannot_take():
+    messages = [{"role": "user", "content": prompt_cache.content(NOVA, LONG_TEXT, "Summarize.")}]
+
+    # Haiku needs 2048 tokens per checkpoint and Titan has no prompt caching
+    for model_id in (HAIKU, TITAN):
+        assert prompt_cache.CACHE_POINT not in prompt_cache.for_model(messages, model_id)[0]["content"]
+    assert prompt_cache.for_model(messages, NOVA) == messages
+
+
+def test_summary_prompt_puts_the_document_before_the_points():
+    conversation = summary.get_conversation(LONG_TEXT, "3")
+
+    blocks = conversation[0]["content"]
+    assert LONG_TEXT in blocks[0]["text"]
+    assert prompt_cache.CACHE_POINT in blocks
+    assert "3" in blocks[-1]["text"]
+
+
+def test_usage_log_includes_cache_reads_and_writes(capsys):
+    prompt_cache.log_usage(NOVA, {"usage": {"inputTokens": 20, "outputTokens": 5, "cacheReadInputTokens": 1500}})
+
+    record = json.loads(capsys.readouterr().out)
+    assert record["cacheReadInputTokens"] == 1500
+    assert record["cacheWriteInputTokens"] == 0
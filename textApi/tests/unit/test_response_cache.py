@@ -0,0 +1,84 @@
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import response_cache
+from response_cache import DynamoDBStore, ResponseCache, SqliteStore
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-west-2")
+    with mock_aws():
+        yield boto3.client("dynamodb")
+
+
+def create_table(dynamodb, name="summaries"):
+    dynamodb.create_table(
+        TableName=name,
+        KeySchema=[{"AttributeName": "cache_key", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "cache_key", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST"
+    )
+
+
+def metrics(output: str, name: str):
+    return [record for record in map(json.loads, output.splitlines()) if record.get("metric") == name]
+
+
+def test_shared_hit_is_kept_in_memory(tmp_path):
+    shared = SqliteStore(str(tmp_path / "cache.sqlite"))
+    ResponseCache(shared).set("key", "summary")
+    cache = ResponseCache(shared)
+
+    assert cache.get("key") == "summary"
+    shared.set("key", "changed", 0)
+
+    assert cache.get("key") == "summary"
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(ttl=-1)
+    cache.set("key", "summary")
+
+    assert cache.get("key") is None
+
+
+def test_dynamodb_round_trip(aws):
+    create_table(aws)
+    ResponseCache(DynamoDBStore("summaries")).set("key", "summary")
+
+    assert ResponseCache(DynamoDBStore("summaries")).get("key") == "summary"
+
+
+def test_dynamodb_failures_are_misses(aws, capsys):
+    # No table was created, so every call fails with ResourceNotFoundException
+    cache = ResponseCache(DynamoDBStore("missing"))
+
+    cache.set("key", "summary")
+    assert cache.get("other") is None
+
+    assert cache.errors == 2
+    assert [error["operation"] for error in metrics(capsys.readouterr().out, "response_cache_error")] == ["set", "get"]
+
+
+def test_lookups_log_the_hit_rate(capsys):
+    cache = ResponseCache()
+    cache.get("key")
+    cache.set("key", "summary")
+    cache.get("key")
+
+    records = metrics(capsys.readouterr().out, "response_cache")
+    assert [record["hit"] for record in records] == [False, True]
+    assert records[-1]["hitRate"] == 0.5
+
+
+def test_cache_key_ignores_whitespace():
+    config = {"maxTokens": 512}
+
+    assert response_cache.cache_key("model", "a  b\n c", config) == response_cache.cache_key("model", "a b c", config)
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+import summary
+
+SENTENCE = "The prince watered his rose every morning before the sun came up. "
+
+
+def event(text: str, **query):
+    return {"body": json.dumps({"text": text}), "queryStringParameters": {"points": "3", **query}}
+
+
+def test_split_text_keeps_chunks_within_the_budget():
+    text = "\n\n".join(SENTENCE * 5 for _ in range(4))
+
+    chunks = summary.split_text(text, chunk_tokens=50)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 50 * summary.CHARS_PER_TOKEN for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+
+def test_split_text_cuts_words_longer_than_a_chunk():
+    chunks = summary.split_text("x" * 30, chunk_tokens=2)
+
+    assert chunks == ["x" * 8, "x" * 8, "x" * 8, "x" * 6]
+
+
+def test_split_text_rejects_empty_chunks():
+    with pytest.raises(ValueError):
+        summary.split_text(SENTENCE, chunk_tokens=0)
+
+
+def test_map_reduce_summarizes_each_chunk_then_merges(monkeypatch):
+    calls = []
+
+    def converse(messages):
+        calls.append(messages[0]["content"][0]["text"])
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(summary, "converse", converse)
+    text = "\n\n".join(f"Part {index}. " + SENTENCE * 3 for index in range(3))
+
+    result = summary.summarize_map_reduce(text, "2", chunk_tokens=60, concurrency=2)
+
+    assert result == f"summary {len(calls)}"
+    assert len(calls) == 4
+    # The merge call sees every partial summary
+    assert all(f"summary {index}" in calls[-1] for index in range(1, 4))
+
+
+@pytest.mark.parametrize("query", [
+    {"chunkTokens": "0"},
+    {"chunkTokens": "-5"},
+    {"chunkTokens": "many"},
+    {"chunkTokens": str(summary.MAX_CHUNK_TOKENS + 1)},
+    {"concurrency": "0"},
+    {"concurrency": "2.5"},
+    {"concurrency": str(summary.MAX_CONCURRENCY + 1)}
+])
+def test_invalid_map_reduce_parameters_are_rejected(query):
+    response = summary.handler(event(SENTENCE, mode="map_reduce", **query), None)
+
+    assert response["statusCode"] == 400
+    assert "must be" in json.loads(response["body"])["error"]
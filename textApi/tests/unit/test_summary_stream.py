@@ -0,0 +1,66 @@
+import asyncio
+import json
+import time
+
+import summary_stream
+
+DELTAS = ["One. ", "Two. ", "Three."]
+
+
+class SlowStreamClient:
+    """
+    converse_stream whose events arrive with a blocking delay, like a boto3 EventStream.
+    """
+
+    def converse_stream(self, **kwargs):
+        def events():
+            for delta in DELTAS:
+                time.sleep(0.1)
+                yield {"contentBlockDelta": {"delta": {"text": delta}}}
+            yield {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 3}}}
+        return {"stream": events()}
+
+
+async def call(app, body: dict, query: bytes):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps(body).encode()}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "query_string": query}, receive, send)
+    return messages
+
+
+def test_stream_sends_each_delta_then_metrics(monkeypatch):
+    monkeypatch.setattr(summary_stream, "client", SlowStreamClient())
+
+    messages = asyncio.run(call(summary_stream.app, {"text": "A story."}, b"points=3"))
+
+    assert messages[0]["status"] == 200
+    bodies = [message["body"].decode() for message in messages[1:]]
+    assert [json.loads(body.split("data: ")[1])["text"] for body in bodies[:-1]] == DELTAS
+    assert bodies[-1].startswith("event: metrics")
+
+
+def test_concurrent_streams_do_not_block_each_other(monkeypatch):
+    monkeypatch.setattr(summary_stream, "client", SlowStreamClient())
+
+    async def both():
+        return await asyncio.gather(*(
+            call(summary_stream.app, {"text": "A story."}, b"points=3") for _ in range(2)
+        ))
+
+    started = time.perf_counter()
+    asyncio.run(both())
+
+    # Served one after the other they would take 2 * 3 * 0.1s
+    assert time.perf_counter() - started < 0.5
+
+
+def test_missing_points_is_rejected():
+    messages = asyncio.run(call(summary_stream.app, {"text": "A story."}, b""))
+
+    assert messages[0]["status"] == 400
@@ -1,8 +1,10 @@
 from aws_cdk import (
     Duration,
+    RemovalPolicy,
     Stack,
     aws_lambda,
     aws_apigateway,
+    aws_dynamodb,
     aws_iam
 )
 from constructs import Construct
@@ -12,19 +14,38 @@ class TextApiStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # Shared tier of the summary response cache, entries expire through DynamoDB TTL
+        cache_table = aws_dynamodb.Table(
+            self, "SummaryCacheTable",
+            partition_key=aws_dynamodb.Attribute(name="cache_key", type=aws_dynamodb.AttributeType.STRING),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
         summary_lambda = aws_lambda.Function(
             self, "SummaryLambda",
             runtime=aws_lambda.Runtime.PYTHON_3_11,
             handler="summary.handler",
             code=aws_lambda.Code.from_asset("services"),
-            timeout=Duration.seconds(30)
+            timeout=Duration.seconds(30),
+            environment={
+                "CACHE_TABLE_NAME": cache_table.table_name
+            }
         )
 
+        cache_table.grant_read_write_data(summary_lambda)
+
         summary_lambda.add_to_role_policy(
             aws_iam.PolicyStatement(
                 effect=aws_iam.Effect.ALLOW,
                 resources=["*"],
-                actions=["bedrock:InvokeModel"]
+                actions=[
+                    "bedrock:InvokeModel",
+                    "bedrock:InvokeModelWithResponseStream",
+                    # The model router checks its candidates against the region's foundation models
+                    "bedrock:ListFoundationModels"
+                ]
             )
         )
 